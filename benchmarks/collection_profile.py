@@ -0,0 +1,147 @@
+"""
+Benchmark the configured Qdrant collection profile against the default
+(float32 in RAM, default HNSW) setup: memory footprint, search latency, and
+recall@k versus exact search.
+
+Memory is measured from Qdrant's segment telemetry (RAM / disk bytes per
+collection) when running against a server. Embedded mode (QDRANT_LOCATION)
+has no telemetry, so only estimated_ram_mb (estimate_ram_bytes, a formula
+over point count and profile, not a measurement) is reported there.
+
+Run from the repo root against a live Qdrant:
+    python -m benchmarks.collection_profile --points 20000 --output profile.json
+    QDRANT_QUANTIZATION=binary QDRANT_ON_DISK_VECTORS=true python -m benchmarks.collection_profile
+"""
+from qdrant_client.models import Distance, VectorParams, PointStruct, SearchParams
+from src.config import get_settings, get_qdrant_client
+from src.services.collection_profile import (
+    VECTOR_SIZE, create_collection, search_params, describe_profile, estimate_ram_bytes,
+)
+import argparse
+import json
+import time
+import numpy as np
+
+BASELINE = 'bench_profile_baseline'
+CANDIDATE = 'bench_profile_candidate'
+
+
+def load_vectors(args) -> np.ndarray:
+    """Sample vectors from the live audit collection, or generate clustered synthetic ones."""
+    if args.from_collection:
+        client = get_qdrant_client()
+        vectors, offset = [], None
+        while len(vectors) < args.points:
+            points, offset = client.scroll(get_settings().qdrant_collection, limit=1000,
+                                           offset=offset, with_vectors=True, with_payload=False)
+            vectors.extend(p.vector for p in points)
+            if offset is None:
+                break
+        return np.asarray(vectors[:args.points], dtype=np.float32)
+    rng = np.random.default_rng(args.seed)
+    centres = rng.normal(size=(64, VECTOR_SIZE)).astype(np.float32)
+    data = centres[rng.integers(0, 64, args.points)] + 0.5 * rng.normal(
+        size=(args.points, VECTOR_SIZE)).astype(np.float32)
+    return data / np.linalg.norm(data, axis=1, keepdims=True)
+
+
+def fill(client, name: str, vectors: np.ndarray):
+    for start in range(0, len(vectors), 512):
+        client.upsert(name, points=[PointStruct(id=start + i, vector=v.tolist())
+                                    for i, v in enumerate(vectors[start:start + 512])])
+    while client.get_collection(name).status != 'green':   # Wait for indexing
+        time.sleep(0.5)
+
+
+def run_queries(client, name: str, queries: np.ndarray, k: int, params) -> tuple:
+    latencies, hits = [], []
+    for q in queries:
+        start = time.perf_counter()
+        res = client.query_points(name, query=q.tolist(), limit=k, search_params=params)
+        latencies.append((time.perf_counter() - start) * 1000)
+        hits.append({p.id for p in res.points})
+    return np.asarray(latencies), hits
+
+
+def measure_footprint(client, name: str) -> dict:
+    """Sum RAM/disk bytes over the collection's segments from server telemetry."""
+    try:
+        telemetry = client.http.service_api.telemetry(details_level=3).result
+    except Exception:                      # Embedded mode: no HTTP API
+        return {}
+    ram = disk = 0
+    for collection in telemetry.collections.collections or []:
+        if getattr(collection, 'id', None) != name:
+            continue
+        for shard in collection.shards or []:
+            for segment in (shard.local.segments or []) if shard.local else []:
+                ram += segment.info.ram_usage_bytes
+                disk += segment.info.disk_usage_bytes
+    return {'measured_ram_mb': round(ram / 2**20, 1), 'measured_disk_mb': round(disk / 2**20, 1)}
+
+
+def summarise(latencies: np.ndarray, hits: list, truth: list, k: int, ram: int,
+              measured: dict) -> dict:
+    recall = np.mean([len(h & t) / k for h, t in zip(hits, truth)])
+    return {
+        **measured,
+        'estimated_ram_mb': round(ram / 2**20, 1),
+        'latency_p50_ms': round(float(np.percentile(latencies, 50)), 3),
+        'latency_p95_ms': round(float(np.percentile(latencies, 95)), 3),
+        f'recall_at_{k}': round(float(recall), 4),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--points', type=int, default=20000)
+    parser.add_argument('--queries', type=int, default=200)
+    parser.add_argument('--k', type=int, default=10)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--from-collection', action='store_true',
+                        help='Sample vectors from the live audit collection')
+    parser.add_argument('--output', help='Write JSON results to this path')
+    args = parser.parse_args()
+
+    settings = get_settings()
+    client = get_qdrant_client()
+    vectors = load_vectors(args)
+    rng = np.random.default_rng(args.seed + 1)
+    queries = vectors[rng.integers(0, len(vectors), args.queries)]
+    queries = queries + 0.05 * rng.normal(size=queries.shape).astype(np.float32)
+
+    for name in (BASELINE, CANDIDATE):
+        client.delete_collection(name)
+    client.create_collection(BASELINE, vectors_config=VectorParams(size=VECTOR_SIZE,
+                                                                   distance=Distance.COSINE))
+    create_collection(client, CANDIDATE)
+    try:
+        fill(client, BASELINE, vectors)
+        fill(client, CANDIDATE, vectors)
+        _, truth = run_queries(client, BASELINE, queries, args.k, SearchParams(exact=True))
+        base_lat, base_hits = run_queries(client, BASELINE, queries, args.k, None)
+        cand_lat, cand_hits = run_queries(client, CANDIDATE, queries, args.k, search_params())
+        profile = describe_profile()
+        results = {
+            'points': len(vectors),
+            'queries': len(queries),
+            'profile': profile,
+            'baseline': summarise(base_lat, base_hits, truth, args.k,
+                                  estimate_ram_bytes(len(vectors)),
+                                  measure_footprint(client, BASELINE)),
+            'candidate': summarise(cand_lat, cand_hits, truth, args.k, estimate_ram_bytes(
+                len(vectors), profile['quantization'], profile['on_disk_vectors'],
+                settings.qdrant_hnsw_m), measure_footprint(client, CANDIDATE)),
+        }
+    finally:
+        for name in (BASELINE, CANDIDATE):
+            client.delete_collection(name)
+
+    print(json.dumps(results, indent=2))
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
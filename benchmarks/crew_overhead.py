@@ -0,0 +1,93 @@
+"""
+Measure what crew construction costs before the first LLM token: module
+import, pool warm-up, and per-run build_audit_crew() from the warm pool,
+compared with the original cold path (fresh agents and a Crew that creates
+its own memory stores on every run). No LLM or Qdrant calls are made.
+
+Run from the repo root:
+    python -m benchmarks.crew_overhead --runs 20 --output crew_overhead.json
+"""
+import argparse
+import json
+import os
+import time
+import numpy as np
+
+# Memory stores build an OpenAI embedder at construction; a placeholder key is enough
+os.environ.setdefault('OPENAI_API_KEY', 'sk-benchmark-placeholder')
+
+
+def timed(fn) -> float:
+    start = time.perf_counter()
+    fn()
+    return (time.perf_counter() - start) * 1000
+
+
+def cold_build(scope: str, quarter: str):
+    """The pre-pool path: new agents and new memory stores for every run."""
+    from crewai import Crew, Process
+    from src.crew.agents import (
+        make_auditor, make_compliance_officer, make_risk_analyst, make_report_writer
+    )
+    from src.crew.tasks import (
+        make_finding_review_task, make_compliance_check_task,
+        make_risk_assessment_task, make_executive_report_task
+    )
+    from src.crew.pool import SEARCH_TOOL_NAME
+    from src.crew.tools import make_search_tool
+    from crewai.tools.base_tool import Tool
+    search_tool = Tool.from_langchain(make_search_tool(scope, quarter))
+    agents = [make_auditor(), make_compliance_officer(), make_risk_analyst(), make_report_writer()]
+    for agent in agents:
+        agent.tools = [search_tool if t.name == SEARCH_TOOL_NAME else t for t in agent.tools]
+    t1 = make_finding_review_task(agents[0], scope, quarter)
+    t2 = make_compliance_check_task(agents[1], scope, finding_task=t1)
+    t3 = make_risk_assessment_task(agents[2], finding_task=t1, compliance_task=t2)
+    t4 = make_executive_report_task(agents[3], finding_task=t1, compliance_task=t2, risk_task=t3)
+    return Crew(agents=agents, tasks=[t1, t2, t3, t4], process=Process.sequential,
+                verbose=False, memory=True, max_rpm=20)
+
+
+def summarise(samples) -> dict:
+    samples = np.asarray(samples)
+    return {
+        'p50_ms': round(float(np.percentile(samples, 50)), 2),
+        'p95_ms': round(float(np.percentile(samples, 95)), 2),
+        'mean_ms': round(float(samples.mean()), 2),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--runs', type=int, default=20)
+    parser.add_argument('--scope', default='APAC')
+    parser.add_argument('--quarter', default='Q3 2025')
+    parser.add_argument('--output', help='Write JSON results to this path')
+    args = parser.parse_args()
+
+    import_ms = timed(lambda: __import__('src.crew.flow'))
+    from src.crew.crew import build_audit_crew
+    from src.crew.pool import crew_pool
+
+    warm_ms = timed(crew_pool.warm)
+    pooled = [timed(lambda: build_audit_crew(args.scope, args.quarter)) for _ in range(args.runs)]
+    cold = [timed(lambda: cold_build(args.scope, args.quarter)) for _ in range(args.runs)]
+
+    results = {
+        'runs': args.runs,
+        'import_ms': round(import_ms, 2),
+        'pool_warm_ms': round(warm_ms, 2),
+        'per_run_pooled': summarise(pooled),
+        'per_run_cold': summarise(cold),
+    }
+    results['per_run_saved_ms'] = round(results['per_run_cold']['p50_ms']
+                                        - results['per_run_pooled']['p50_ms'], 2)
+
+    print(json.dumps(results, indent=2))
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,78 @@
+"""
+Report what importing the API costs, per module, and what each warm-up
+component costs once loaded lazily.
+
+Each measurement runs in a fresh interpreter (`python -X importtime`) so
+earlier imports do not hide later ones. Run from the repo root:
+    python -m benchmarks.import_time --top 25 --output import_time.json
+"""
+import argparse
+import json
+import subprocess
+import sys
+import time
+
+TARGETS = ('src.main', 'src.supervisor.graph', 'src.security.presidio_service', 'src.crew.flow')
+
+
+def import_profile(module: str) -> dict:
+    """Wall time and per-module self/cumulative import cost for `import module`."""
+    start = time.perf_counter()
+    proc = subprocess.run([sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+                          capture_output=True, text=True)
+    wall_ms = (time.perf_counter() - start) * 1000
+    if proc.returncode != 0:
+        return {'error': proc.stderr.strip().splitlines()[-1] if proc.stderr else 'failed'}
+    modules = []
+    for line in proc.stderr.splitlines():
+        # "import time:       self [us] |  cumulative | imported package"
+        if not line.startswith('import time:') or 'imported package' in line:
+            continue
+        self_us, cumulative_us, name = (p.strip() for p in line[len('import time:'):].split('|'))
+        modules.append({'module': name.strip(), 'self_ms': int(self_us) / 1000,
+                        'cumulative_ms': int(cumulative_us) / 1000})
+    return {'wall_ms': round(wall_ms, 1), 'modules': modules}
+
+
+def warmup_profile() -> dict:
+    """Time each warm-up component in a fresh interpreter, after importing src.main."""
+    code = ('import json, time; import src.main; from src.services.warmup import warm_up; '
+            's = time.perf_counter(); status = warm_up(); '
+            'print(json.dumps({"total_seconds": round(time.perf_counter() - s, 3), '
+            '"components": status}))')
+    proc = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True)
+    if proc.returncode != 0:
+        return {'error': proc.stderr.strip().splitlines()[-1] if proc.stderr else 'failed'}
+    return json.loads(proc.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--top', type=int, default=20, help='Slowest modules to list per target')
+    parser.add_argument('--skip-warmup', action='store_true')
+    parser.add_argument('--output', help='Write JSON results to this path')
+    args = parser.parse_args()
+
+    results = {'imports': {}}
+    for target in TARGETS:
+        profile = import_profile(target)
+        if 'modules' in profile:
+            by_module = {m['module']: m for m in profile['modules']}
+            profile = {
+                'wall_ms': profile['wall_ms'],
+                'import_ms': by_module.get(target, {}).get('cumulative_ms'),
+                'slowest': sorted(profile['modules'], key=lambda m: m['self_ms'],
+                                  reverse=True)[:args.top],
+            }
+        results['imports'][target] = profile
+    if not args.skip_warmup:
+        results['warmup'] = warmup_profile()
+
+    print(json.dumps(results, indent=2))
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
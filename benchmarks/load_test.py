@@ -0,0 +1,278 @@
+"""
+Concurrent load test for the API: closed-loop virtual users sending a mix
+of quick questions (/supervisor/invoke and /supervisor/stream), full reviews
+and document uploads, at each concurrency level in turn.
+
+By default the harness starts everything itself: the OpenAI and guardrails
+stubs (benchmarks/stubs.py) and one uvicorn worker of src.main:app with fake
+models, embedded in-memory Qdrant and the event-loop lag monitor enabled.
+With --target it drives an already running API instead (start that with
+LOOP_LAG_MONITOR=true to get loop lag).
+
+Per level and operation it reports throughput, p50/p95/p99 latency and error
+rate; the server's /metrics/loop adds event-loop lag per endpoint. Run from
+the repo root:
+    python -m benchmarks.load_test --concurrency 10 50 200 --duration 30 --output load.json
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import time
+from collections import defaultdict
+from datetime import datetime, timezone
+import httpx
+import numpy as np
+from benchmarks.offline_suite import FINDING_TEMPLATE, QUICK_QUESTIONS, TOPICS, OWNERS, git_commit
+from benchmarks.stubs import free_port
+
+OPERATIONS = ('quick', 'stream', 'review', 'upload')
+DEFAULT_MIX = 'quick=60,stream=20,review=5,upload=15'
+REVIEW_SCOPES = ['Hong Kong', 'Singapore', 'Japan', 'APAC']
+
+
+def parse_mix(text: str) -> dict:
+    mix = {}
+    for part in text.split(','):
+        name, _, weight = part.partition('=')
+        if name.strip() not in OPERATIONS:
+            raise argparse.ArgumentTypeError(f'Unknown operation {name!r}; expected {OPERATIONS}')
+        mix[name.strip()] = float(weight)
+    return {name: weight for name, weight in mix.items() if weight > 0}
+
+
+def upload_body(n: int, findings: int = 12) -> tuple:
+    """A small, unique TXT report, so every upload is actually indexed."""
+    region = ['hk', 'sg', 'jp'][n % 3]
+    text = ''.join(FINDING_TEMPLATE.format(
+        region=region.upper(), n=n * findings + i, quarter='Q3 2025', topic=TOPICS[i % len(TOPICS)],
+        severity=['Critical', 'Significant', 'Moderate'][i % 3], owner=OWNERS[i % len(OWNERS)],
+        phone=f'+852 9{i:03d} {n % 10000:04d}', month=i % 9 + 1, status='Open',
+    ) for i in range(findings))
+    return f'{region}_audit_q3_2025_load{n}.txt', text.encode()
+
+
+class LoadRun:
+    """One concurrency level: closed-loop users for a fixed duration."""
+
+    def __init__(self, client: httpx.AsyncClient, mix: dict, seed: int):
+        self.client = client
+        self.names = list(mix)
+        self.weights = list(mix.values())
+        self.rng = random.Random(seed)
+        self.latencies = defaultdict(list)        # op -> ms, successful requests
+        self.first_event = defaultdict(list)      # stream -> ms to first SSE event
+        self.errors = defaultdict(lambda: defaultdict(int))
+        self.counts = defaultdict(int)
+        self.uploads = 0
+
+    async def quick(self, i: int):
+        resp = await self.client.post('/supervisor/invoke', json={
+            'task': QUICK_QUESTIONS[i % len(QUICK_QUESTIONS)], 'scope': 'Hong Kong',
+            'quarter': 'Q3 2025', 'thread_id': f'load-quick-{i}'})
+        resp.raise_for_status()
+
+    async def stream(self, i: int) -> float:
+        start = time.perf_counter()
+        first = None
+        async with self.client.stream('POST', '/supervisor/stream', json={
+                'task': QUICK_QUESTIONS[i % len(QUICK_QUESTIONS)], 'scope': 'Hong Kong',
+                'quarter': 'Q3 2025', 'thread_id': f'load-stream-{i}'}) as resp:
+            resp.raise_for_status()
+            async for line in resp.aiter_lines():
+                if first is None and line.startswith('data:'):
+                    first = (time.perf_counter() - start) * 1000
+        return first
+
+    async def review(self, i: int):
+        scope = REVIEW_SCOPES[i % len(REVIEW_SCOPES)]
+        resp = await self.client.post('/supervisor/invoke', json={
+            'task': f'Full compliance review for {scope}, Q3 2025', 'scope': scope,
+            'quarter': 'Q3 2025', 'thread_id': f'load-review-{i}'})
+        resp.raise_for_status()
+
+    async def upload(self, i: int):
+        self.uploads += 1
+        filename, body = upload_body(os.getpid() * 100000 + self.uploads)
+        resp = await self.client.post('/documents/upload', files={'file': (filename, body, 'text/plain')})
+        resp.raise_for_status()
+
+    async def user(self, user_id: int, deadline: float, think_ms: float):
+        i = 0
+        while time.perf_counter() < deadline:
+            op = self.rng.choices(self.names, self.weights)[0]
+            start = time.perf_counter()
+            try:
+                first = await getattr(self, op)(user_id * 1000000 + i)
+                self.latencies[op].append((time.perf_counter() - start) * 1000)
+                if first is not None:
+                    self.first_event[op].append(first)
+            except httpx.HTTPStatusError as e:
+                self.errors[op][f'HTTP {e.response.status_code}'] += 1
+            except Exception as e:
+                self.errors[op][type(e).__name__] += 1
+            self.counts[op] += 1
+            i += 1
+            if think_ms:
+                await asyncio.sleep(self.rng.uniform(0, 2 * think_ms) / 1000)
+
+    def report(self, elapsed: float) -> dict:
+        out = {}
+        for op in self.names:
+            count = self.counts[op]
+            errors = sum(self.errors[op].values())
+            entry = {
+                'requests': count,
+                'throughput_rps': round((count - errors) / elapsed, 2),
+                'error_rate': round(errors / count, 4) if count else 0.0,
+                'errors': dict(self.errors[op]),
+                **latency_summary(self.latencies[op]),
+            }
+            if self.first_event[op]:
+                entry['first_event'] = latency_summary(self.first_event[op])
+            out[op] = entry
+        return out
+
+
+def latency_summary(samples) -> dict:
+    if not samples:
+        return {'p50_ms': None, 'p95_ms': None, 'p99_ms': None}
+    values = np.asarray(samples)
+    return {
+        'p50_ms': round(float(np.percentile(values, 50)), 1),
+        'p95_ms': round(float(np.percentile(values, 95)), 1),
+        'p99_ms': round(float(np.percentile(values, 99)), 1),
+        'max_ms': round(float(values.max()), 1),
+    }
+
+
+async def run_level(base_url: str, concurrency: int, args) -> dict:
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(base_url=base_url, timeout=args.timeout, limits=limits) as client:
+        lag_available = (await client.delete('/metrics/loop')).status_code == 200
+        run = LoadRun(client, args.mix, seed=args.seed + concurrency)
+        start = time.perf_counter()
+        deadline = start + args.duration
+        await asyncio.gather(*(run.user(u, deadline, args.think_ms) for u in range(concurrency)))
+        elapsed = time.perf_counter() - start
+        result = {
+            'concurrency': concurrency,
+            'elapsed_seconds': round(elapsed, 2),
+            'total_throughput_rps': round(sum(run.counts.values()) / elapsed, 2),
+            'operations': run.report(elapsed),
+        }
+        if lag_available:
+            result['event_loop'] = (await client.get('/metrics/loop')).json()
+        return result
+
+
+async def seed_corpus(base_url: str, docs: int):
+    async with httpx.AsyncClient(base_url=base_url, timeout=120) as client:
+        for n in range(docs):
+            filename, body = upload_body(n, findings=40)
+            resp = await client.post('/documents/upload', files={'file': (filename, body, 'text/plain')})
+            resp.raise_for_status()
+
+
+def wait_until_ready(base_url: str, timeout: float):
+    """Poll /ready; carry on (with a warning) if components never report ready."""
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            resp = httpx.get(f'{base_url}/ready', timeout=5)
+            if resp.status_code == 200:
+                return resp.json()
+        except httpx.TransportError:
+            pass
+        time.sleep(0.5)
+    try:
+        status = httpx.get(f'{base_url}/ready', timeout=5).json()
+    except Exception as e:
+        raise RuntimeError(f'API at {base_url} did not come up: {e}')
+    print(f'WARNING: API not ready after {timeout}s: {status}', file=sys.stderr)
+    return status
+
+
+def start_local_stack(args) -> tuple:
+    """Stubs plus one API worker as subprocesses; returns (base_url, processes)."""
+    openai_port, guardrails_port, api_port = free_port(), free_port(), free_port()
+    stubs = subprocess.Popen([sys.executable, '-m', 'benchmarks.stubs',
+                              '--openai-port', str(openai_port),
+                              '--guardrails-port', str(guardrails_port),
+                              '--llm-latency-ms', str(args.llm_latency_ms)])
+    base = f'http://127.0.0.1:{openai_port}/v1'
+    env = {
+        **os.environ,
+        'USE_FAKE_MODELS': 'true',
+        'FAKE_LLM_LATENCY_MS': str(args.llm_latency_ms),
+        'QDRANT_LOCATION': ':memory:',
+        'CREW_MEMORY': 'off',
+        'REVIEW_CACHE_ENABLED': 'false',
+        'GUARDRAILS_URL': f'http://127.0.0.1:{guardrails_port}',
+        'OPENAI_API_KEY': 'sk-load-test',
+        'OPENAI_BASE_URL': base,
+        'OPENAI_API_BASE': base,
+        'LOOP_LAG_MONITOR': 'true',
+    }
+    api = subprocess.Popen([sys.executable, '-m', 'uvicorn', 'src.main:app', '--host', '127.0.0.1',
+                            '--port', str(api_port), '--workers', '1', '--log-level', 'warning'],
+                           env=env)
+    return f'http://127.0.0.1:{api_port}', [api, stubs]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--target', help='Base URL of a running API (default: start a local stack)')
+    parser.add_argument('--concurrency', type=int, nargs='+', default=[10, 50, 200])
+    parser.add_argument('--duration', type=float, default=30, help='Seconds per concurrency level')
+    parser.add_argument('--mix', type=parse_mix, default=parse_mix(DEFAULT_MIX),
+                        help=f'Operation weights (default {DEFAULT_MIX})')
+    parser.add_argument('--think-ms', type=float, default=0, help='Mean pause between a user\'s requests')
+    parser.add_argument('--timeout', type=float, default=300, help='Per-request timeout (s)')
+    parser.add_argument('--seed-docs', type=int, default=6, help='Documents uploaded before the first level')
+    parser.add_argument('--llm-latency-ms', type=float, default=200,
+                        help='Simulated model latency of the local stubs')
+    parser.add_argument('--ready-timeout', type=float, default=120)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--output', help='Write JSON results to this path')
+    args = parser.parse_args()
+
+    processes = []
+    base_url = args.target
+    if not base_url:
+        base_url, processes = start_local_stack(args)
+    try:
+        readiness = wait_until_ready(base_url, args.ready_timeout)
+        asyncio.run(seed_corpus(base_url, args.seed_docs))
+        levels = []
+        for concurrency in args.concurrency:
+            print(f'Running {concurrency} users for {args.duration:.0f}s ...', file=sys.stderr)
+            levels.append(asyncio.run(run_level(base_url, concurrency, args)))
+    finally:
+        for proc in processes:
+            proc.terminate()
+            proc.wait(timeout=10)
+
+    results = {
+        'metadata': {
+            'timestamp': datetime.now(timezone.utc).isoformat(),
+            'git_commit': git_commit(),
+            'python': platform.python_version(),
+            'target': args.target or 'local stack (fake models, in-memory Qdrant)',
+            'readiness': readiness,
+            'args': {**vars(args), 'mix': args.mix},
+        },
+        'levels': levels,
+    }
+    print(json.dumps(results, indent=2))
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,298 @@
+"""
+Offline benchmark suite: no OpenAI, Qdrant server or guardrails sidecar.
+
+Chat and embedding models are the deterministic fakes (USE_FAKE_MODELS),
+Qdrant runs embedded in :memory: mode, and guardrails plus the OpenAI API
+used by CrewAI are local stubs (benchmarks/stubs.py). Measures:
+
+    ingestion      chunks/s through index_document and the bulk pipeline
+    presidio       texts/s masked, inline and through anonymize_many_async
+    quick_path     POST /supervisor/invoke latency for quick questions
+    crew           run_audit_flow wall time for one region and the APAC fan-out
+
+Each crew result is checked before its timing counts (report present, APAC
+fanned out, the HK fixture escalated); a failed check fails the section and
+the suite exits non-zero. Results are written as JSON for regression
+tracking. Run from the repo root:
+    python -m benchmarks.offline_suite --output offline_results.json
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import traceback
+from datetime import datetime, timezone
+import numpy as np
+from benchmarks.stubs import free_port, guardrails_app, make_openai_app, serve
+
+REGIONS = {'hk': 'Hong Kong', 'sg': 'Singapore', 'jp': 'Japan'}
+
+FINDING_TEMPLATE = (
+    'Finding {region}-2024-{n:03d}: {topic} control weakness identified during the {quarter} review. '
+    'Severity is {severity}. The owner is {owner}, reachable at {phone}. '
+    'Remediation deadline is 2026-0{month}-15 and the status is {status}. '
+    'The control gap relates to {topic} procedures and must be reported to the regulator if unresolved.\n\n'
+)
+TOPICS = ['trade reconciliation', 'AML monitoring', 'access control', 'vendor risk',
+          'change management', 'data retention', 'business continuity', 'KYC refresh']
+OWNERS = ['John Chan', 'Mary Tan', 'Kenji Sato', 'Priya Nair']
+QUICK_QUESTIONS = [
+    'What is the status of finding HK-2024-003?',
+    'Who owns the AML monitoring finding?',
+    'When is the access control remediation deadline?',
+    'Which findings relate to vendor risk?',
+]
+
+
+def configure_env(openai_port: int, guardrails_port: int, llm_latency_ms: float):
+    """Point every setting at the offline stand-ins; must run before src is imported."""
+    base = f'http://127.0.0.1:{openai_port}/v1'
+    os.environ.update({
+        'USE_FAKE_MODELS': 'true',
+        'FAKE_LLM_LATENCY_MS': str(llm_latency_ms),
+        'QDRANT_LOCATION': ':memory:',
+        'CREW_MEMORY': 'off',
+        'REVIEW_CACHE_ENABLED': 'false',
+        'RETRIEVAL_CACHE_SIZE': '0',
+        'STARTUP_WARMUP': 'false',
+        'GUARDRAILS_URL': f'http://127.0.0.1:{guardrails_port}',
+        'OPENAI_API_KEY': 'sk-offline-benchmark',
+        'OPENAI_BASE_URL': base,
+        'OPENAI_API_BASE': base,           # litellm (CrewAI)
+    })
+
+
+def write_corpus(directory: str, docs_per_region: int, findings_per_doc: int) -> list:
+    """Synthetic TXT audit reports; filenames carry region and quarter like real uploads."""
+    files = []
+    for code in REGIONS:
+        for d in range(docs_per_region):
+            quarter = f'Q{d % 4 + 1} 2025'
+            name = f'{code}_audit_q{d % 4 + 1}_2025_{d}.txt'
+            text = ''.join(FINDING_TEMPLATE.format(
+                region=code.upper(), n=d * findings_per_doc + i, quarter=quarter,
+                topic=TOPICS[i % len(TOPICS)], severity=['Critical', 'Significant', 'Moderate'][i % 3],
+                owner=OWNERS[i % len(OWNERS)], phone=f'+852 9{i:03d} {d:04d}',
+                month=i % 9 + 1, status=['Open', 'In Progress', 'Closed'][i % 3],
+            ) for i in range(findings_per_doc))
+            path = os.path.join(directory, name)
+            with open(path, 'w') as f:
+                f.write(text)
+            files.append((path, name))
+    return files
+
+
+def percentiles(samples_ms) -> dict:
+    samples = np.asarray(samples_ms)
+    return {
+        'n': len(samples),
+        'p50_ms': round(float(np.percentile(samples, 50)), 2),
+        'p95_ms': round(float(np.percentile(samples, 95)), 2),
+        'mean_ms': round(float(samples.mean()), 2),
+    }
+
+
+def guarded(name: str, fn, results: dict):
+    """Run one benchmark; a failure is recorded in the results instead of aborting the suite."""
+    start = time.perf_counter()
+    try:
+        results[name] = fn()
+    except Exception as e:
+        traceback.print_exc()
+        results[name] = {'error': f'{type(e).__name__}: {e}'}
+    results[name]['wall_seconds'] = round(time.perf_counter() - start, 2)
+
+
+def bench_ingestion(files: list) -> dict:
+    from qdrant_client.models import Filter, FieldCondition, MatchValue
+    from src.config import get_settings, get_qdrant_client
+    from src.services.rag_service import index_document
+    from src.services.ingestion_pipeline import create_job, run_ingestion_job
+
+    settings = get_settings()
+    client = get_qdrant_client()
+    half = len(files) // 2
+    sequential, bulk = files[:half], files[half:]
+
+    start = time.perf_counter()
+    chunks = sum(asyncio.run(index_document(path, name)).chunks_added for path, name in sequential)
+    seq_seconds = time.perf_counter() - start
+
+    workdir = tempfile.mkdtemp(prefix='bench-bulk-')
+    bulk_files = [(shutil.copy(path, os.path.join(workdir, name)), name) for path, name in bulk]
+    job = create_job(len(bulk_files))
+    start = time.perf_counter()
+    asyncio.run(run_ingestion_job(job, bulk_files, workdir))
+    bulk_seconds = time.perf_counter() - start
+
+    # Re-indexing an unchanged document should cost parsing only
+    path, name = sequential[0]
+    start = time.perf_counter()
+    asyncio.run(index_document(path, name))
+    reindex_ms = (time.perf_counter() - start) * 1000
+
+    total = client.count(settings.qdrant_collection, exact=True).count
+    hk = client.count(settings.qdrant_collection, exact=True, count_filter=Filter(
+        must=[FieldCondition(key='region', match=MatchValue(value='HK'))])).count
+    return {
+        'index_document': {'files': len(sequential), 'chunks': chunks,
+                           'chunks_per_s': round(chunks / seq_seconds, 1)},
+        'bulk_pipeline': {'files': len(bulk_files), 'status': job.status,
+                          'chunks': job.chunks_upserted,
+                          'chunks_per_s': round(job.chunks_upserted / bulk_seconds, 1)},
+        'reindex_unchanged_ms': round(reindex_ms, 2),
+        'collection_points': total,
+        'hk_points': hk,
+    }
+
+
+def bench_presidio(texts: list) -> dict:
+    from src.security.presidio_service import presidio
+
+    start = time.perf_counter()
+    presidio.warm()
+    warm_ms = (time.perf_counter() - start) * 1000
+    start = time.perf_counter()
+    for text in texts:
+        presidio.anonymize(text)
+    inline_s = time.perf_counter() - start
+    start = time.perf_counter()
+    asyncio.run(presidio.anonymize_many_async(texts))
+    async_s = time.perf_counter() - start
+    return {
+        'mode': presidio.mode,
+        'texts': len(texts),
+        'avg_chars': round(sum(map(len, texts)) / len(texts)),
+        'warm_ms': round(warm_ms, 2),
+        'sync_texts_per_s': round(len(texts) / inline_s, 1),
+        'async_many_texts_per_s': round(len(texts) / async_s, 1),
+    }
+
+
+def bench_quick_path(runs: int) -> dict:
+    import httpx
+    from src.main import app
+
+    async def run() -> list:
+        latencies = []
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url='http://bench') as client:
+            for i in range(runs):
+                body = {'task': QUICK_QUESTIONS[i % len(QUICK_QUESTIONS)], 'scope': 'Hong Kong',
+                        'quarter': 'Q3 2025', 'thread_id': f'bench-quick-{i}'}
+                start = time.perf_counter()
+                resp = await client.post('/supervisor/invoke', json=body, timeout=60)
+                resp.raise_for_status()
+                latencies.append((time.perf_counter() - start) * 1000)
+        return latencies
+
+    run_first = time.perf_counter()
+    latencies = asyncio.run(run())
+    return {'first_call_ms': round(latencies[0], 2), **percentiles(latencies[1:] or latencies),
+            'requests_per_s': round(runs / (time.perf_counter() - run_first), 1)}
+
+
+def expect(condition: bool, message: str):
+    """Sanity check on a benchmarked result (kept under python -O, unlike assert)."""
+    if not condition:
+        raise AssertionError(message)
+
+
+def check_crew_result(scope: str, result: dict):
+    """A timing only counts if the crew really ran: report, fan-out and escalation as expected."""
+    expect(isinstance(result, dict) and result.get('report'), f'{scope}: flow returned no report')
+    expect(result.get('token_usage', {}).get('prompt_tokens', 0) > 0, f'{scope}: no LLM calls were made')
+    if scope == 'APAC':
+        expect(len(result.get('regions', [])) > 1, f'APAC did not fan out: {result.get("regions")}')
+    if scope == 'Hong Kong':
+        # The fake risk register rates HK-2024-001 Critical (score 20)
+        expect(result.get('requires_escalation'), 'Hong Kong review did not escalate')
+
+
+def bench_crew(runs: int) -> dict:
+    from src.crew.flow import run_audit_flow
+
+    out = {}
+    for scope in ('Hong Kong', 'APAC'):
+        samples, escalations = [], 0
+        for _ in range(runs):
+            start = time.perf_counter()
+            result = run_audit_flow(scope=scope, quarter='Q3 2025')
+            elapsed_ms = (time.perf_counter() - start) * 1000
+            check_crew_result(scope, result)
+            samples.append(elapsed_ms)
+            escalations += bool(result.get('requires_escalation'))
+        out[scope] = {**percentiles(samples), 'escalated_runs': escalations,
+                      'regions': result['regions']}
+    return out
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except Exception:
+        return 'unknown'
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--docs-per-region', type=int, default=4)
+    parser.add_argument('--findings-per-doc', type=int, default=40)
+    parser.add_argument('--quick-runs', type=int, default=50)
+    parser.add_argument('--crew-runs', type=int, default=3)
+    parser.add_argument('--llm-latency-ms', type=float, default=0.0,
+                        help='Simulated model latency; 0 isolates orchestration overhead')
+    parser.add_argument('--skip', nargs='*', default=[],
+                        choices=['ingestion', 'presidio', 'quick_path', 'crew'])
+    parser.add_argument('--output', help='Write JSON results to this path')
+    args = parser.parse_args()
+
+    openai_port, guardrails_port = free_port(), free_port()
+    serve(make_openai_app(args.llm_latency_ms), openai_port)
+    serve(guardrails_app, guardrails_port)
+    configure_env(openai_port, guardrails_port, args.llm_latency_ms)
+
+    corpus = tempfile.mkdtemp(prefix='bench-corpus-')
+    files = write_corpus(corpus, args.docs_per_region, args.findings_per_doc)
+    texts = [p for path, _ in files[:3] for p in open(path).read().split('\n\n') if p]
+
+    results = {
+        'metadata': {
+            'timestamp': datetime.now(timezone.utc).isoformat(),
+            'git_commit': git_commit(),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'args': vars(args),
+        },
+    }
+    try:
+        # Ingestion first: the other benchmarks retrieve from the corpus it indexes
+        if 'ingestion' not in args.skip:
+            guarded('ingestion', lambda: bench_ingestion(files), results)
+        if 'presidio' not in args.skip:
+            guarded('presidio', lambda: bench_presidio(texts), results)
+        if 'quick_path' not in args.skip:
+            guarded('quick_path', lambda: bench_quick_path(args.quick_runs), results)
+        if 'crew' not in args.skip:
+            guarded('crew', lambda: bench_crew(args.crew_runs), results)
+    finally:
+        shutil.rmtree(corpus, ignore_errors=True)
+
+    print(json.dumps(results, indent=2))
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+    failed = [name for name, section in results.items() if 'error' in section]
+    if failed:
+        sys.exit(f'Benchmark sections failed: {", ".join(failed)}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,139 @@
+"""
+Local stand-ins for the external services, for offline benchmarks and load
+tests: a guardrails sidecar that passes everything, and an OpenAI-compatible
+endpoint (chat completions, optionally streamed, and embeddings) backed by
+the same deterministic fakes as USE_FAKE_MODELS. CrewAI talks to OpenAI
+through its own client (or litellm) rather than get_llm, so it needs the HTTP
+stand-in (OPENAI_BASE_URL / OPENAI_API_BASE). An agent offered the
+search_audit_findings tool calls it once before answering, so offline crews
+exercise retrieval and the evidence pack.
+
+Run standalone (e.g. for a load test against a separately started API):
+    python -m benchmarks.stubs --openai-port 8901 --guardrails-port 8902
+"""
+import argparse
+import asyncio
+import json
+import socket
+import threading
+import time
+import uuid
+from typing import Optional
+import uvicorn
+from fastapi import FastAPI, Request
+from fastapi.responses import StreamingResponse
+from src.services.fake_models import count_words, fake_embedding, fake_reply
+
+SEARCH_TOOL = 'search_audit_findings'
+SEARCH_QUERY = 'critical and significant audit findings'
+
+guardrails_app = FastAPI(title='Guardrails stub')
+
+
+@guardrails_app.post('/v1/rails/input')
+async def rails_input(body: dict):
+    return {'safe': True, 'reason': None}
+
+
+@guardrails_app.post('/v1/rails/output')
+async def rails_output(body: dict):
+    return {'safe': True, 'filtered_output': body.get('output', '')}
+
+
+def search_call(body: dict) -> Optional[dict]:
+    """A search_audit_findings tool call for an agent's first turn; None once it has a result."""
+    offered = {t.get('function', {}).get('name') for t in body.get('tools') or []}
+    if SEARCH_TOOL not in offered or any(m.get('role') == 'tool' for m in body.get('messages', [])):
+        return None
+    return {'id': f'call_{uuid.uuid4().hex[:12]}', 'type': 'function',
+            'function': {'name': SEARCH_TOOL,
+                         'arguments': json.dumps({'query': SEARCH_QUERY, 'top_k': 6})}}
+
+
+def make_openai_app(latency_ms: float = 0.0) -> FastAPI:
+    """OpenAI-compatible stub; latency_ms simulates model time without blocking the loop."""
+    app = FastAPI(title='OpenAI stub')
+
+    @app.post('/v1/chat/completions')
+    async def chat_completions(request: Request):
+        body = await request.json()
+        prompt = '\n'.join(str(m.get('content') or '') for m in body.get('messages', []))
+        if latency_ms:
+            await asyncio.sleep(latency_ms / 1000)
+        completion_id = f'chatcmpl-{uuid.uuid4().hex[:12]}'
+        model = body.get('model', 'gpt-4o')
+        tool_call = None if body.get('stream') else search_call(body)
+        text = '' if tool_call else fake_reply(prompt)
+        usage = {'prompt_tokens': count_words(prompt), 'completion_tokens': count_words(text)}
+        usage['total_tokens'] = usage['prompt_tokens'] + usage['completion_tokens']
+        if body.get('stream'):
+            def chunks():
+                base = {'id': completion_id, 'object': 'chat.completion.chunk',
+                        'created': int(time.time()), 'model': model}
+                yield f'data: {json.dumps({**base, "choices": [{"index": 0, "delta": {"role": "assistant", "content": text}, "finish_reason": None}]})}\n\n'
+                yield f'data: {json.dumps({**base, "choices": [{"index": 0, "delta": {}, "finish_reason": "stop"}], "usage": usage})}\n\n'
+                yield 'data: [DONE]\n\n'
+            return StreamingResponse(chunks(), media_type='text/event-stream')
+        return {
+            'id': completion_id,
+            'object': 'chat.completion',
+            'created': int(time.time()),
+            'model': model,
+            'choices': [{'index': 0, 'finish_reason': 'tool_calls', 'message': {
+                'role': 'assistant', 'content': None, 'tool_calls': [tool_call]}}]
+            if tool_call else [{'index': 0, 'finish_reason': 'stop',
+                                'message': {'role': 'assistant', 'content': text}}],
+            'usage': usage,
+        }
+
+    @app.post('/v1/embeddings')
+    async def embeddings(body: dict):
+        inputs = body.get('input', [])
+        if isinstance(inputs, (str, int)) or (inputs and isinstance(inputs[0], int)):
+            inputs = [inputs]
+        # langchain-openai may send token ids instead of strings
+        texts = [t if isinstance(t, str) else ' '.join(f't{i}' for i in t) for t in inputs]
+        return {
+            'object': 'list',
+            'model': body.get('model', 'text-embedding-3-small'),
+            'data': [{'object': 'embedding', 'index': i, 'embedding': fake_embedding(t)}
+                     for i, t in enumerate(texts)],
+            'usage': {'prompt_tokens': sum(count_words(t) for t in texts),
+                      'total_tokens': sum(count_words(t) for t in texts)},
+        }
+
+    return app
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def serve(app: FastAPI, port: int) -> uvicorn.Server:
+    """Run app on 127.0.0.1:port in a daemon thread; returns once it accepts connections."""
+    server = uvicorn.Server(uvicorn.Config(app, host='127.0.0.1', port=port, log_level='warning'))
+    threading.Thread(target=server.run, daemon=True).start()
+    deadline = time.time() + 10
+    while not server.started:
+        if time.time() > deadline:
+            raise RuntimeError(f'Stub on port {port} did not start')
+        time.sleep(0.05)
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Serve the OpenAI and guardrails stubs')
+    parser.add_argument('--openai-port', type=int, default=8901)
+    parser.add_argument('--guardrails-port', type=int, default=8902)
+    parser.add_argument('--llm-latency-ms', type=float, default=0.0)
+    args = parser.parse_args()
+    serve(make_openai_app(args.llm_latency_ms), args.openai_port)
+    serve(guardrails_app, args.guardrails_port)
+    print(f'OpenAI stub on :{args.openai_port}, guardrails stub on :{args.guardrails_port}', flush=True)
+    threading.Event().wait()
+
+
+if __name__ == '__main__':
+    main()
@@ -1,12 +1,18 @@
 from fastapi import FastAPI
+from langchain_core.messages import HumanMessage
 from langchain_openai import ChatOpenAI, OpenAIEmbeddings
 from langchain_qdrant import QdrantVectorStore
 from qdrant_client import QdrantClient
-from ragas import evaluate
+from ragas import evaluate, RunConfig
 from ragas.metrics import faithfulness, answer_relevancy, context_precision, context_recall
 from datasets import Dataset
+from retrieval_eval import evaluate_retrieval
+import asyncio
+import hashlib
 import json
+import math
 import os
+import time
 
 app = FastAPI(title='RAGAS Evaluation Service')
 
@@ -14,6 +20,20 @@ QDRANT_HOST = os.getenv('QDRANT_HOST', 'qdrant')
 QDRANT_PORT = int(os.getenv('QDRANT_PORT', 6333))
 COLLECTION = os.getenv('QDRANT_COLLECTION', 'audit_documents')
 OPENAI_KEY = os.getenv('OPENAI_API_KEY', '')
+EVAL_MODEL = os.getenv('EVAL_MODEL', 'gpt-4o-mini')
+EVAL_CONCURRENCY = int(os.getenv('EVAL_CONCURRENCY', 8))            # Answers generated at once
+RAGAS_MAX_WORKERS = int(os.getenv('RAGAS_MAX_WORKERS', 16))         # RAGAS metric calls in flight
+RAGAS_TIMEOUT = int(os.getenv('RAGAS_TIMEOUT', 180))
+CACHE_PATH = os.getenv('EVAL_CACHE_PATH', '/app/cache/eval_cache.json')
+QUESTIONS_PATH = os.getenv('EVAL_QUESTIONS_PATH', '/app/test_questions.json')
+RETRIEVAL_K = 5
+
+ANSWER_PROMPT = 'Answer based on context only.\nContext: {context}\nQuestion: {question}'
+METRICS = [faithfulness, answer_relevancy, context_precision, context_recall]
+METRIC_NAMES = [m.name for m in METRICS]
+# Changing the prompt, retrieval depth or metric set invalidates every cached score
+PROMPT_HASH = hashlib.sha256(
+    f'{ANSWER_PROMPT}|k={RETRIEVAL_K}|{",".join(METRIC_NAMES)}'.encode()).hexdigest()[:16]
 
 
 @app.get('/health')
@@ -21,9 +41,96 @@ def health():
     return {'status': 'ok', 'service': 'ragas-evaluation'}
 
 
+def corpus_version(client: QdrantClient) -> str:
+    """
+    Fingerprint of the indexed corpus. Point IDs are content hashes of the
+    chunks, so any added, changed or removed chunk changes the version.
+    CORPUS_VERSION overrides it (e.g. a release tag).
+    """
+    if os.getenv('CORPUS_VERSION'):
+        return os.environ['CORPUS_VERSION']
+    digest = hashlib.sha256()
+    ids, offset = [], None
+    while True:
+        points, offset = client.scroll(COLLECTION, limit=1000, offset=offset,
+                                       with_payload=False, with_vectors=False)
+        ids.extend(str(p.id) for p in points)
+        if offset is None:
+            break
+    for point_id in sorted(ids):
+        digest.update(point_id.encode())
+    return digest.hexdigest()[:16]
+
+
+def cache_key(item: dict, version: str) -> str:
+    raw = json.dumps([item['question'], item['ground_truth'], version, EVAL_MODEL, PROMPT_HASH])
+    return hashlib.sha256(raw.encode()).hexdigest()
+
+
+def load_cache() -> dict:
+    try:
+        with open(CACHE_PATH) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def save_cache(cache: dict):
+    os.makedirs(os.path.dirname(CACHE_PATH) or '.', exist_ok=True)
+    tmp = f'{CACHE_PATH}.tmp'
+    with open(tmp, 'w') as f:
+        json.dump(cache, f)
+    os.replace(tmp, CACHE_PATH)
+
+
+async def generate_answers(items: list, retriever, llm) -> list:
+    """Retrieve and answer each question, at most EVAL_CONCURRENCY at a time."""
+    sem = asyncio.Semaphore(EVAL_CONCURRENCY)
+
+    async def answer(item: dict) -> dict:
+        async with sem:
+            docs = await retriever.ainvoke(item['question'])
+            contexts = [d.page_content for d in docs]
+            prompt = ANSWER_PROMPT.format(context=chr(10).join(contexts[:3]), question=item['question'])
+            response = await llm.ainvoke([HumanMessage(content=prompt)])
+            return {'answer': response.content, 'contexts': contexts}
+
+    return await asyncio.gather(*(answer(item) for item in items))
+
+
+def score_answers(items: list, answers: list, llm, embeddings) -> list:
+    """Per-question RAGAS scores for the freshly answered questions."""
+    dataset = Dataset.from_dict({
+        'question': [item['question'] for item in items],
+        'answer': [a['answer'] for a in answers],
+        'contexts': [a['contexts'] for a in answers],
+        'ground_truth': [item['ground_truth'] for item in items],
+    })
+    result = evaluate(
+        dataset=dataset,
+        metrics=METRICS,
+        llm=llm,
+        embeddings=embeddings,
+        run_config=RunConfig(max_workers=RAGAS_MAX_WORKERS, timeout=RAGAS_TIMEOUT),
+    )
+    rows = result.to_pandas().to_dict('records')
+    return [{name: row.get(name) for name in METRIC_NAMES} for row in rows]
+
+
+def mean_score(values: list) -> float:
+    valid = [v for v in values if v is not None and not math.isnan(v)]
+    return sum(valid) / len(valid) if valid else 0.0
+
+
 @app.post('/evaluate')
-async def run_evaluation():
-    with open('/app/test_questions.json') as f:
+async def run_evaluation(force: bool = False):
+    """
+    Full RAGAS run. Scores are cached per question by (question, corpus
+    version, model, prompt hash); only new or changed questions are answered
+    and scored. force=true ignores the cache.
+    """
+    start = time.time()
+    with open(QUESTIONS_PATH) as f:
         test_data = json.load(f)
     questions = test_data['questions']
 
@@ -33,34 +140,31 @@ async def run_evaluation():
         store = QdrantVectorStore(
             client=client, collection_name=COLLECTION, embedding=embeddings
         )
-        retriever = store.as_retriever(search_kwargs={'k': 5})
+        retriever = store.as_retriever(search_kwargs={'k': RETRIEVAL_K})
+        version = await asyncio.to_thread(corpus_version, client)
     except Exception as e:
         return {'error': f'Qdrant unavailable: {e}', 'overall_score': 0.0, 'passed_quality_gate': False}
 
-    llm = ChatOpenAI(model='gpt-4o-mini', openai_api_key=OPENAI_KEY)
-
-    # Build RAGAS dataset
-    data = {'question': [], 'answer': [], 'contexts': [], 'ground_truth': []}
-    for item in questions:
-        q = item['question']
-        docs = retriever.invoke(q)
-        contexts = [d.page_content for d in docs]
-        prompt = f'Answer based on context only.\nContext: {chr(10).join(contexts[:3])}\nQuestion: {q}'
-        from langchain_core.messages import HumanMessage
-        response = llm.invoke([HumanMessage(content=prompt)])
-        data['question'].append(q)
-        data['answer'].append(response.content)
-        data['contexts'].append(contexts)
-        data['ground_truth'].append(item['ground_truth'])
-
-    dataset = Dataset.from_dict(data)
-    result = evaluate(
-        dataset=dataset,
-        metrics=[faithfulness, answer_relevancy, context_precision, context_recall],
-        llm=llm,
-        embeddings=embeddings,
-    )
-    scores = result.to_pandas().mean().to_dict()
+    llm = ChatOpenAI(model=EVAL_MODEL, openai_api_key=OPENAI_KEY)
+
+    cache = {} if force else load_cache()
+    keys = [cache_key(item, version) for item in questions]
+    pending = [(key, item) for key, item in zip(keys, questions) if key not in cache]
+    if pending:
+        items = [item for _, item in pending]
+        answers = await generate_answers(items, retriever, llm)
+        # RAGAS drives its own event loop; keep it off this one
+        scores = await asyncio.to_thread(score_answers, items, answers, llm, embeddings)
+        for (key, item), answer, row in zip(pending, answers, scores):
+            if all(v is not None and not math.isnan(v) for v in row.values()):
+                cache[key] = {'question': item['question'], 'answer': answer['answer'], 'scores': row}
+            else:
+                cache.setdefault(key, {'question': item['question'], 'scores': row, 'retry': True})
+    rows = [cache[key]['scores'] for key in keys]
+    # Keep only this run's entries (failed scores are retried next run)
+    save_cache({key: cache[key] for key in keys if not cache[key].get('retry')})
+
+    scores = {name: mean_score([row.get(name) for row in rows]) for name in METRIC_NAMES}
     overall = sum(scores.values()) / len(scores) if scores else 0.0
     return {
         'faithfulness': round(scores.get('faithfulness', 0), 4),
@@ -69,5 +173,29 @@ async def run_evaluation():
         'context_recall': round(scores.get('context_recall', 0), 4),
         'overall_score': round(overall, 4),
         'questions_evaluated': len(questions),
+        'questions_scored': len(pending),
+        'questions_cached': len(questions) - len(pending),
+        'corpus_version': version,
+        'duration_seconds': round(time.time() - start, 1),
         'passed_quality_gate': overall >= 0.7,
     }
+
+
+@app.post('/evaluate/retrieval')
+async def run_retrieval_evaluation(k: int = RETRIEVAL_K, min_recall: float = None):
+    """
+    Retrieval-only gate: recall@k, MRR and nDCG@k against the labelled
+    relevant sources/findings. No LLM calls; finishes in seconds.
+    """
+    start = time.time()
+    with open(QUESTIONS_PATH) as f:
+        questions = json.load(f)['questions']
+    embeddings = OpenAIEmbeddings(model='text-embedding-3-small', openai_api_key=OPENAI_KEY)
+    client = QdrantClient(host=QDRANT_HOST, port=QDRANT_PORT)
+    try:
+        result = await asyncio.to_thread(evaluate_retrieval, questions, client, COLLECTION,
+                                         embeddings, k, min_recall)
+    except Exception as e:
+        return {'error': f'Retrieval evaluation failed: {e}', 'passed_quality_gate': False}
+    result['duration_seconds'] = round(time.time() - start, 2)
+    return result
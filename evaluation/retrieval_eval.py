@@ -0,0 +1,111 @@
+"""
+Retrieval-only quality gate: recall@k, MRR and nDCG@k against the labelled
+relevant sources (and, where given, finding IDs) in test_questions.json.
+
+No LLM calls: the questions are embedded in one batch, Qdrant is queried in
+one batched search, and the metrics are computed with NumPy over the whole
+question set. Cheap enough to run after every ingestion or index-config
+change; the full RAGAS run stays nightly.
+
+    python retrieval_eval.py --k 5          (inside the evaluation container)
+"""
+from typing import List, Optional
+import numpy as np
+
+DEFAULT_MIN_RECALL = 0.8
+
+
+def relevance_tensor(questions: List[dict], hits: List[List[dict]], k: int) -> tuple:
+    """
+    coverage[q, r, l]: retrieved chunk r of question q covers label l, where
+    labels are the question's relevant findings (chunk text mentions the ID,
+    in a relevant source) or, without finding labels, its relevant sources.
+    label_mask[q, l] marks real (non-padding) labels.
+    """
+    labels = [item.get('relevant_findings') or item.get('relevant_sources', []) for item in questions]
+    width = max((len(l) for l in labels), default=0) or 1
+    coverage = np.zeros((len(questions), k, width), dtype=bool)
+    label_mask = np.zeros((len(questions), width), dtype=bool)
+    for q, (item, retrieved) in enumerate(zip(questions, hits)):
+        sources = set(item.get('relevant_sources', []))
+        by_finding = bool(item.get('relevant_findings'))
+        label_mask[q, :len(labels[q])] = True
+        for r, hit in enumerate(retrieved[:k]):
+            if sources and hit.get('source') not in sources:
+                continue
+            for l, label in enumerate(labels[q]):
+                coverage[q, r, l] = label in hit.get('text', '') if by_finding else hit.get('source') == label
+    return coverage, label_mask
+
+
+def retrieval_metrics(coverage: np.ndarray, label_mask: np.ndarray) -> dict:
+    """Per-question and mean recall@k, MRR and nDCG@k (binary relevance)."""
+    n_labels = label_mask.sum(axis=1)
+    labelled = n_labels > 0
+    relevant = coverage.any(axis=2)                                  # (Q, k)
+    k = relevant.shape[1]
+
+    recall = np.where(labelled, coverage.any(axis=1).sum(axis=1) / np.maximum(n_labels, 1), 0.0)
+    first = np.where(relevant.any(axis=1), relevant.argmax(axis=1) + 1, 0)
+    mrr = np.where(first > 0, 1.0 / np.maximum(first, 1), 0.0)
+    discounts = 1.0 / np.log2(np.arange(2, k + 2))
+    dcg = (relevant * discounts).sum(axis=1)
+    ideal = np.cumsum(discounts)[np.clip(np.minimum(n_labels, k) - 1, 0, k - 1)]
+    ndcg = np.where(labelled, dcg / ideal, 0.0)
+
+    def mean(values):
+        return round(float(values[labelled].mean()), 4) if labelled.any() else 0.0
+
+    return {
+        'recall_at_k': mean(recall),
+        'mrr': mean(mrr),
+        'ndcg_at_k': mean(ndcg),
+        'hit_rate': mean(relevant.any(axis=1).astype(float)),
+        'per_question': {'recall': recall.round(4).tolist(), 'mrr': mrr.round(4).tolist(),
+                         'ndcg': ndcg.round(4).tolist()},
+        'questions_labelled': int(labelled.sum()),
+    }
+
+
+def search_all(client, collection: str, vectors: List[List[float]], k: int) -> List[List[dict]]:
+    """One batched Qdrant search for every question."""
+    from qdrant_client.models import SearchRequest
+    results = client.search_batch(collection_name=collection, requests=[
+        SearchRequest(vector=vector, limit=k, with_payload=True) for vector in vectors])
+    return [[{'source': p.payload.get('source'), 'text': p.payload.get('page_content', '')}
+             for p in points] for points in results]
+
+
+def evaluate_retrieval(questions: List[dict], client, collection: str, embeddings, k: int = 5,
+                       min_recall: Optional[float] = None) -> dict:
+    vectors = embeddings.embed_documents([item['question'] for item in questions])
+    hits = search_all(client, collection, vectors, k)
+    metrics = retrieval_metrics(*relevance_tensor(questions, hits, k))
+    metrics['per_question']['question'] = [item['question'] for item in questions]
+    threshold = DEFAULT_MIN_RECALL if min_recall is None else min_recall
+    metrics.update({'k': k, 'questions_evaluated': len(questions),
+                    'min_recall': threshold, 'passed_quality_gate': metrics['recall_at_k'] >= threshold})
+    return metrics
+
+
+if __name__ == '__main__':
+    import argparse
+    import json
+    import sys
+    from main import COLLECTION, OPENAI_KEY, QDRANT_HOST, QDRANT_PORT
+    from langchain_openai import OpenAIEmbeddings
+    from qdrant_client import QdrantClient
+
+    parser = argparse.ArgumentParser(description='Retrieval-only quality gate')
+    parser.add_argument('--k', type=int, default=5)
+    parser.add_argument('--min-recall', type=float, default=DEFAULT_MIN_RECALL)
+    parser.add_argument('--questions', default='test_questions.json')
+    args = parser.parse_args()
+    with open(args.questions) as f:
+        questions = json.load(f)['questions']
+    result = evaluate_retrieval(
+        questions, QdrantClient(host=QDRANT_HOST, port=QDRANT_PORT), COLLECTION,
+        OpenAIEmbeddings(model='text-embedding-3-small', openai_api_key=OPENAI_KEY),
+        k=args.k, min_recall=args.min_recall)
+    print(json.dumps({key: v for key, v in result.items() if key != 'per_question'}, indent=2))
+    sys.exit(0 if result['passed_quality_gate'] else 1)
@@ -1,33 +1,79 @@
 import streamlit as st
+import requests
+import time
 
+API_URL = 'http://api:8000'
 st.title('🤖 Agent Execution Trace')
-st.markdown('See exactly what each agent did — step by step.')
+st.markdown('See exactly what each agent did — step by step, with timings.')
 
-if 'agent_steps' not in st.session_state or not st.session_state.agent_steps:
+thread_id = st.text_input('Thread', value=st.session_state.get('thread_id', ''))
+if not thread_id:
     st.info('No trace available yet. Run a Compliance Review first.')
+    st.stop()
+
+# Incremental polling: only events after the last one seen are fetched
+if st.session_state.get('trace_thread') != thread_id:
+    st.session_state.trace_thread = thread_id
+    st.session_state.trace_events = []
+    st.session_state.trace_after = 0
+
+try:
+    while True:
+        resp = requests.get(f'{API_URL}/threads/{thread_id}/trace',
+                            params={'after': st.session_state.trace_after, 'limit': 200}, timeout=10)
+        if resp.status_code == 404:
+            break
+        page = resp.json()
+        st.session_state.trace_events.extend(page['events'])
+        st.session_state.trace_after = page['next_after']
+        if not page['has_more']:
+            break
+except Exception as e:
+    st.error(f'Trace API unavailable: {e}')
+
+events = st.session_state.trace_events
+if not events:
+    st.info('No trace recorded for this thread yet.')
 else:
-    steps = st.session_state.agent_steps
-    st.markdown(f'### {len(steps)} steps executed')
-
-    # Agent colour coding
-    agent_colors = {
-        'Auditor': '🔵',
-        'Compliance': '🟢',
-        'Risk': '🟠',
-        'Report': '🟣',
-        'Supervisor': '🔴',
-        'classify': '⚪',
-        'quick': '⚪',
+    agent_icons = {
+        'Supervisor': '🔴', 'Crew': '⚫',
+        'Senior Internal Auditor': '🔵', 'Regional Compliance Officer': '🟢',
+        'Risk Analyst': '🟠', 'Chief Report Writer': '🟣',
     }
+    # run_crew spans the crew's own steps, so it is left out of the breakdown
+    steps = [e for e in events if e['kind'] == 'step'
+             or (e['kind'] == 'node' and e['action'] != 'run_crew')]
+    st.markdown(f'### {len(events)} events')
+
+    # Where the time went: per agent and per tool
+    by_agent, by_tool = {}, {}
+    for e in steps:
+        by_agent[e['agent']] = by_agent.get(e['agent'], 0) + e['duration_ms'] / 1000
+        if e.get('tool'):
+            by_tool[e['tool']] = by_tool.get(e['tool'], 0) + e['duration_ms'] / 1000
+    c1, c2 = st.columns(2)
+    with c1:
+        st.markdown('**Seconds by agent**')
+        st.bar_chart(by_agent)
+    with c2:
+        st.markdown('**Seconds by tool step**')
+        if by_tool:
+            st.bar_chart(by_tool)
+        else:
+            st.caption('No tool calls yet')
+
+    for e in events:
+        icon = agent_icons.get(e['agent'], '⚪')
+        scope = f' [{e["scope"]}]' if e.get('scope') else ''
+        tokens = f' · {e["tokens"]} tokens' if e.get('tokens') else ''
+        status = '' if e['status'] == 'ok' else f' · {e["status"].upper()}'
+        with st.expander(f'{e["seq"]}. {icon} {e["agent"]}{scope} — {e["action"]} '
+                         f'({e["duration_ms"] / 1000:.1f}s{tokens}{status})'):
+            st.text(e['output_preview'] or '(no output)')
+
+if st.session_state.get('pending_approval'):
+    st.warning('⏸️ Supervisor paused — waiting for human approval')
 
-    for i, step in enumerate(steps, 1):
-        # Match step to agent
-        icon = '⚪'
-        for key, emoji in agent_colors.items():
-            if key.lower() in step.lower():
-                icon = emoji
-                break
-        st.markdown(f'**{i}.** {icon} {step}')
-
-    if st.session_state.get('pending_approval'):
-        st.warning('⏸️ Supervisor paused — waiting for human approval')
+if st.checkbox('Auto-refresh every 3s'):
+    time.sleep(3)
+    st.rerun()
@@ -80,23 +80,63 @@ if prompt := st.chat_input('Ask a question or submit a review task...'):
         status_ph = st.empty()
         report_ph = st.empty()
         steps_so_far, final_report, needs_approval = [], '', False
+        last_event_id, attempts, done = None, 0, False
 
-        with requests.post(f'{API_URL}/supervisor/stream', json={
-            'task': prompt, 'scope': scope, 'quarter': quarter,
-            'thread_id': st.session_state.thread_id,
-            'require_approval': require_approval
-        }, stream=True, timeout=600) as resp:  # 10min timeout for full crew
-            for line in resp.iter_lines():
-                if line and line.startswith(b'data: '):
-                    data = json.loads(line[6:])
-                    steps_so_far.extend(data.get('steps', []))
-                    if steps_so_far:
-                        status_ph.info('🤖 ' + ' → '.join(steps_so_far[-2:]))
-                    if data.get('report'):
-                        final_report = data['report']
-                        report_ph.markdown(final_report)
-                    if data.get('needs_approval'):
-                        needs_approval = True
+        def read_events(resp):
+            """Yield (id, event, data) from an SSE response."""
+            event_id, event = None, 'message'
+            for line in resp.iter_lines(decode_unicode=True):
+                if not line:
+                    event_id, event = None, 'message'
+                elif line.startswith('id: '):
+                    event_id = int(line[4:])
+                elif line.startswith('event: '):
+                    event = line[7:]
+                elif line.startswith('data: '):
+                    yield event_id, event, json.loads(line[6:])
+
+        # Reconnects resume from the last event seen; the review itself keeps running
+        while not done and attempts < 5:
+            try:
+                if last_event_id is None:
+                    resp = requests.post(f'{API_URL}/supervisor/stream', json={
+                        'task': prompt, 'scope': scope, 'quarter': quarter,
+                        'thread_id': st.session_state.thread_id,
+                        'require_approval': require_approval
+                    }, stream=True, timeout=(10, 120))
+                else:
+                    resp = requests.get(f'{API_URL}/supervisor/stream/{st.session_state.thread_id}',
+                                        headers={'Last-Event-ID': str(last_event_id)},
+                                        stream=True, timeout=(10, 120))
+                with resp:
+                    resp.raise_for_status()
+                    for event_id, event, data in read_events(resp):
+                        if event_id is not None:
+                            last_event_id = event_id
+                        if event == 'step':
+                            steps_so_far.extend(data.get('steps', []))
+                        elif event == 'report':
+                            final_report = data['replace'] if 'replace' in data else final_report + data['append']
+                            report_ph.markdown(final_report)
+                        elif event == 'state':
+                            needs_approval = data.get('needs_approval', needs_approval)
+                        elif event == 'snapshot':
+                            steps_so_far, final_report = data['steps'], data['report']
+                            needs_approval = data.get('needs_approval', needs_approval)
+                            done = data.get('status') != 'running'
+                        elif event == 'done':
+                            done = True
+                            if data.get('error'):
+                                st.error(f'Review failed: {data["error"]}')
+                        if steps_so_far:
+                            status_ph.info('🤖 ' + ' → '.join(steps_so_far[-2:]))
+                    done = done or last_event_id is None
+            except requests.RequestException as e:
+                if last_event_id is None:
+                    st.error(f'Stream failed: {e}')
+                    break
+                attempts += 1
+                status_ph.warning(f'Connection lost — resuming from event {last_event_id}...')
 
         st.session_state.agent_steps = steps_so_far
         if needs_approval:
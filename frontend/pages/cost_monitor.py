@@ -34,11 +34,18 @@ try:
         st.bar_chart(df.set_index('Agent'))
         st.dataframe(df, use_container_width=True)
 
+    if data.get('cost_by_tier'):
+        st.subheader('Cost and Latency by Model Tier')
+        df_tiers = pd.DataFrame.from_dict(data['cost_by_tier'], orient='index')
+        df_tiers.index.name = 'Tier'
+        st.dataframe(df_tiers, use_container_width=True)
+
     if data.get('records'):
         st.subheader('Recent Requests')
         df_records = pd.DataFrame(data['records'])
         if not df_records.empty:
-            cols = ['timestamp', 'agent_name', 'input_tokens', 'output_tokens', 'cost_usd']
+            cols = ['timestamp', 'agent_name', 'tier', 'model', 'input_tokens', 'output_tokens',
+                    'cost_usd', 'latency_ms']
             st.dataframe(df_records[[c for c in cols if c in df_records.columns]],
                          use_container_width=True)
 except Exception as e:
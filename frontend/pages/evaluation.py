@@ -5,10 +5,11 @@ EVAL_URL = 'http://evaluation:8001'
 st.title('📈 RAG Evaluation (RAGAS)')
 st.markdown('Run the RAGAS evaluation suite to measure retrieval and answer quality.')
 
+force = st.checkbox('Re-score all questions (ignore cached scores)')
 if st.button('▶️ Run Evaluation Now', type='primary'):
-    with st.spinner('Running RAGAS evaluation on 20 test questions... (~5 minutes)'):
+    with st.spinner('Running RAGAS evaluation... (seconds if the corpus and questions are unchanged)'):
         try:
-            resp = requests.post(f'{EVAL_URL}/evaluate', timeout=600)
+            resp = requests.post(f'{EVAL_URL}/evaluate', params={'force': force}, timeout=600)
             result = resp.json()
             c1, c2, c3, c4, c5 = st.columns(5)
             c1.metric('Faithfulness',      f'{result.get("faithfulness",0):.3f}')
@@ -20,8 +21,28 @@ if st.button('▶️ Run Evaluation Now', type='primary'):
                 st.success('✅ Quality gate PASSED (score >= 0.7)')
             else:
                 st.error('❌ Quality gate FAILED (score < 0.7) — investigate retrieval')
-            st.markdown(f'Questions evaluated: {result.get("questions_evaluated", 0)}')
+            st.markdown(f'Questions evaluated: {result.get("questions_evaluated", 0)} '
+                        f'({result.get("questions_cached", 0)} from cache, '
+                        f'{result.get("duration_seconds", 0)}s)')
         except Exception as e:
             st.error(f'Evaluation service unavailable: {e}')
 
+st.divider()
+st.subheader('Retrieval-only gate')
+st.markdown('Recall@k, MRR and nDCG against labelled sources — no LLM calls, finishes in seconds.')
+k = st.slider('k', 1, 20, 5)
+if st.button('▶️ Run Retrieval Check'):
+    try:
+        result = requests.post(f'{EVAL_URL}/evaluate/retrieval', params={'k': k}, timeout=60).json()
+        c1, c2, c3 = st.columns(3)
+        c1.metric(f'Recall@{k}', f'{result.get("recall_at_k",0):.3f}')
+        c2.metric('MRR',          f'{result.get("mrr",0):.3f}')
+        c3.metric(f'nDCG@{k}',   f'{result.get("ndcg_at_k",0):.3f}')
+        if result.get('passed_quality_gate'):
+            st.success(f'✅ Retrieval gate PASSED (recall >= {result.get("min_recall")})')
+        else:
+            st.error(result.get('error') or f'❌ Retrieval gate FAILED (recall < {result.get("min_recall")})')
+    except Exception as e:
+        st.error(f'Evaluation service unavailable: {e}')
+
 st.info('The evaluation suite runs automatically on every GitHub push via CI/CD.')
@@ -1,24 +1,46 @@
 import streamlit as st
 import requests
+import json
 
 API_URL = 'http://api:8000'
 st.title('📤 Upload Audit Documents')
-st.markdown('Upload PDF or TXT audit documents. PII is automatically masked during indexing.')
+st.markdown('Upload PDF or TXT audit documents, or a ZIP archive of them. '
+            'PII is automatically masked during indexing.')
 
-files = st.file_uploader('Choose files', type=['pdf', 'txt'], accept_multiple_files=True)
+files = st.file_uploader('Choose files', type=['pdf', 'txt', 'zip'], accept_multiple_files=True)
 if files and st.button('Upload and Index', type='primary'):
-    for f in files:
-        with st.spinner(f'Indexing {f.name}...'):
-            ext = f.name.split('.')[-1]
-            mime = 'application/pdf' if ext == 'pdf' else 'text/plain'
-            resp = requests.post(
-                f'{API_URL}/documents/upload',
-                files={'file': (f.name, f.getvalue(), mime)}
-            )
-            if resp.status_code == 200:
-                d = resp.json()
-                st.success(f'✅ {f.name}: {d["chunks_indexed"]} chunks indexed (PII masked)')
-            else:
-                st.error(f'❌ {f.name}: {resp.text}')
+    # One bulk job for the whole selection instead of one request per file
+    mimes = {'pdf': 'application/pdf', 'txt': 'text/plain', 'zip': 'application/zip'}
+    payload = [('files', (f.name, f.getvalue(), mimes[f.name.split('.')[-1].lower()]))
+               for f in files]
+    resp = requests.post(f'{API_URL}/documents/bulk', files=payload)
+    if resp.status_code != 200:
+        st.error(f'❌ Upload failed: {resp.text}')
+    else:
+        job = resp.json()
+        st.caption(f'Job {job["job_id"][:8]}... — {len(job["files"])} documents queued')
+        bar = st.progress(0.0, text='Parsing...')
+        stats_ph = st.empty()
+        progress = {}
+        with requests.get(f'{API_URL}/documents/jobs/{job["job_id"]}/events',
+                          stream=True, timeout=3600) as events:
+            for line in events.iter_lines():
+                if line and line.startswith(b'data: '):
+                    progress = json.loads(line[6:])
+                    parsed = progress['files_parsed'] / max(progress['files_total'], 1)
+                    to_embed = progress['chunks_parsed'] - progress['chunks_unchanged']
+                    stored = progress['chunks_upserted'] / max(to_embed, 1) if to_embed else parsed
+                    bar.progress(min(0.5 * parsed + 0.5 * stored, 1.0),
+                                 text=f'{progress["files_parsed"]}/{progress["files_total"]} '
+                                      f'documents parsed — {progress["chunks_upserted"]} chunks indexed')
+                    stats_ph.caption(
+                        f'masked {progress["chunks_masked"]} · embedded {progress["chunks_embedded"]} · '
+                        f'unchanged {progress["chunks_unchanged"]} · removed {progress["chunks_removed"]} · '
+                        f'{progress["elapsed_seconds"]}s')
+        if progress.get('status') == 'completed':
+            st.success(f'✅ {progress["files_parsed"]} documents: {progress["chunks_upserted"]} '
+                       f'chunks indexed, {progress["chunks_unchanged"]} unchanged (PII masked)')
+        for err in progress.get('errors', []):
+            st.error(f'❌ {err}')
 
 st.info('📌 PII (names, phone numbers, emails) is automatically masked before storing.')
@@ -1,6 +1,6 @@
 from pydantic_settings import BaseSettings
 from functools import lru_cache
-from typing import Union
+from typing import Dict, List, Optional, Tuple, Union
 
 
 class Settings(BaseSettings):
@@ -8,27 +8,139 @@ class Settings(BaseSettings):
     openai_api_key: str = ''
     openai_model: str = 'gpt-4o-mini'
     openai_embedding_model: str = 'text-embedding-3-small'
+    embedding_cache_size: int = 10000      # Cached vectors (~6 KB each); 0 disables
+
+    # Offline stand-ins (benchmarks / load tests): deterministic fake chat and embedding models
+    use_fake_models: bool = False
+    fake_llm_latency_ms: float = 0.0       # Simulated per-call LLM latency
 
     # Local model (Ollama)
-    use_local_models: bool = False
+    use_local_models: bool = False         # Routes every caller to the 'local' tier
     local_model_name: str = 'llama3.2'
     ollama_base_url: str = 'http://ollama:11434'
 
+    # Model tiering: each LLM caller (route) maps to a tier, each tier to 'provider/model'
+    # ({openai_model} / {local_model_name} expand from the settings above).
+    # E.g. MODEL_ROUTES='{"classify_task": "local", "report_writer": "strong"}'
+    model_tiers: Dict[str, str] = {
+        'local': 'ollama/{local_model_name}',
+        'standard': 'openai/{openai_model}',
+        'strong': 'openai/gpt-4o',
+    }
+    model_routes: Dict[str, str] = {
+        'classify_task': 'standard',
+        'quick_rag': 'standard',
+        'check_hkma_compliance': 'standard',
+        'check_mas_compliance': 'standard',
+        'assess_risk_severity': 'standard',
+        'search_audit_findings': 'standard',   # Sizes the agents' search context (no LLM call)
+        'auditor': 'standard',
+        'compliance_officer': 'standard',
+        'risk_analyst': 'standard',
+        'report_writer': 'standard',
+    }
+    default_model_tier: str = 'standard'   # Routes missing from model_routes
+    model_pricing: Dict[str, List[float]] = {   # USD per 1K tokens: [input, output]
+        'gpt-4o-mini': [0.00015, 0.0006],
+        'gpt-4o': [0.0025, 0.01],
+        'llama3.2': [0.0, 0.0],
+    }
+
     # Qdrant
     qdrant_host: str = 'qdrant'
     qdrant_port: int = 6333
     qdrant_collection: str = 'audit_documents'
+    qdrant_location: str = ''              # ':memory:' or a local path: embedded Qdrant, no server
+
+    # Qdrant collection profile (applied at creation; migrate with
+    # `python -m src.services.collection_profile --migrate`)
+    qdrant_quantization: str = 'none'          # none / scalar / binary
+    qdrant_quantization_always_ram: bool = True
+    qdrant_on_disk_vectors: bool = False       # Keep float32 originals on disk
+    qdrant_hnsw_m: int = 16
+    qdrant_hnsw_ef_construct: int = 100
+    qdrant_search_ef: int = 128                # Search-time HNSW ef
+    qdrant_rescore: bool = True                # Rescore quantized hits with originals
+    qdrant_oversampling: float = 2.0           # Candidates fetched before rescoring
+
+    # Retrieval post-processing
+    rag_fetch_k: int = 20                  # Candidates fetched (with vectors) before MMR
+    rag_mmr_lambda: float = 0.7            # 1.0 = pure relevance, 0.0 = pure diversity
+    rag_context_tokens: int = 1500         # Context token budget per RAG call
+    rag_context_tokens_by_model: Dict[str, int] = {'llama3.2': 1000}   # Per-model overrides
+
+    # Quick path: retrieve for the question while classify_task's LLM call runs;
+    # reused by quick_rag, discarded for full reviews
+    speculative_retrieval: bool = True
+    speculative_retrieval_workers: int = 4
+    speculative_retrieval_ttl_seconds: int = 300   # Unclaimed results (run failed before quick_rag) dropped
+
+    # Bulk ingestion pipeline
+    ingest_parse_workers: int = 2          # Process pool size for PDF/TXT parsing
+    ingest_mask_batch: int = 32            # Chunks per Presidio masking batch
+    ingest_embed_concurrency: int = 4      # Embedding requests in flight
+    ingest_upsert_batch: int = 256         # Points per Qdrant upsert
+    ingest_queue_size: int = 8             # Bounded queue depth between stages
+    ingest_max_upload_bytes: int = 2 * 1024 ** 3   # Per bulk upload, after unzipping
+    ingest_max_files: int = 10000          # Documents per bulk upload (archive members included)
+    ingest_job_ttl_seconds: int = 3600     # Finished jobs stay pollable this long
 
     # Redis
     redis_url: str = 'redis://redis:6379'
 
+    # Startup: heavy components load lazily; warm-up preloads them (see /ready)
+    startup_warmup: bool = True
+    startup_warmup_components: List[str] = ['presidio', 'supervisor_graph', 'crew']
+
+    # Crew construction and memory
+    crew_review_workers: int = 4           # Crew reviews running at once (per API process)
+    pending_report_timeout_seconds: int = 1800   # Approval waits this long for an escalated run's report
+    pending_report_ttl_seconds: int = 24 * 3600  # Finished, never-approved reports dropped after this
+    crew_fanout_enabled: bool = True       # Split 'APAC' reviews into parallel regional crews
+    crew_fanout_workers: int = 3           # Regional crews running at once
+    crew_memory: str = 'short_term'        # off / short_term (per run, in-process) / qdrant
+    crew_memory_collection: str = 'crew_memory'
+    crew_memory_max_items: int = 200       # short_term: memories kept per run
+    crew_memory_max_points: int = 20000    # qdrant: oldest memories pruned beyond this
+    crew_memory_ttl_days: int = 30         # qdrant: memories older than this are pruned
+    evidence_pack_enabled: bool = True     # Prefetch the scope's chunks per run; agent searches in-process
+    evidence_pack_max_chunks: int = 5000   # Larger scopes search Qdrant (~6 KB per chunk in RAM)
+
+    # Review result cache (task outputs + per-finding tool calls)
+    review_cache_enabled: bool = True
+    review_cache_ttl_seconds: int = 7 * 24 * 3600
+
+    # Supervisor event streams (SSE)
+    stream_heartbeat_seconds: float = 15.0 # Heartbeat interval on idle streams
+    stream_buffer_events: int = 1000       # Events kept per thread for Last-Event-ID resume
+    stream_buffer_ttl_seconds: int = 3600  # Finished runs' buffers kept this long
+    stream_workers: int = 8                # Streamed runs executing at once; later ones queue
+
+    # Agent trace store (/threads/{id}/trace)
+    trace_max_events: int = 2000           # Per thread; oldest dropped first
+    trace_max_threads: int = 500           # Least recently active threads evicted beyond this
+    trace_preview_chars: int = 200
+
+    # Batch reviews
+    batch_review_concurrency: int = 4      # Max batch items in flight (capped by crew_review_workers)
+    batch_ttl_seconds: int = 24 * 3600     # Finished batches stay pollable this long
+    retrieval_cache_size: int = 512        # Cached retrieve_context() results shared across reviews
+    retrieval_cache_ttl_seconds: int = 900
+
     # Security
+    pii_mode: str = 'inline'               # inline / process (worker process pool)
+    pii_workers: int = 2                   # Worker processes (each loads the spaCy model)
+    pii_batch_size: int = 8                # Texts per worker round trip
+    pii_batch_wait_ms: int = 5             # Max wait to fill a batch
     guardrails_url: str = 'http://guardrails:8080'
     use_guardrails: bool = True
 
     # Services
     evaluation_service_url: str = 'http://evaluation:8001'
+    escalation_webhook_url: str = ''       # POSTed when a review escalates (optional)
     cost_tracking_enabled: bool = True
+    loop_lag_monitor: bool = False         # Per-endpoint event-loop lag at /metrics/loop (load tests)
+    loop_lag_interval_ms: int = 20
 
     class Config:
         env_file = '.env'
@@ -40,33 +152,102 @@ def get_settings() -> Settings:
     return Settings()
 
 
-def get_llm(temperature: float = 0):
+def _tier_model(tier: str) -> Tuple[str, str]:
+    """(provider, model) serving a tier; a bare model name means OpenAI."""
+    settings = get_settings()
+    if tier not in settings.model_tiers:
+        raise ValueError(f'Unknown model tier {tier!r}')
+    spec = settings.model_tiers[tier].format(openai_model=settings.openai_model,
+                                             local_model_name=settings.local_model_name)
+    provider, _, model = spec.partition('/')
+    return (provider, model) if model else ('openai', provider)
+
+
+def resolve_model(route: Optional[str] = None) -> Tuple[str, str, str]:
+    """(tier, provider, model) for an LLM caller, per MODEL_ROUTES and MODEL_TIERS."""
+    settings = get_settings()
+    tier = ('local' if settings.use_local_models
+            else settings.model_routes.get(route, settings.default_model_tier))
+    return (tier, *_tier_model(tier))
+
+
+def crew_model(route: str) -> str:
+    """Model string for a CrewAI agent ('provider/model'; CrewAI instantiates it)."""
+    _, provider, model = resolve_model(route)
+    return f'{provider}/{model}'
+
+
+def tier_for_model(model: str) -> str:
+    """The tier serving a model name (as reported by the provider), else 'unrouted'."""
+    name = model.split('/', 1)[-1]
+    return next((tier for tier in get_settings().model_tiers
+                 if _tier_model(tier)[1] == name), 'unrouted')
+
+
+def get_llm(temperature: float = 0, route: Optional[str] = None):
     """
-    Model factory: returns OpenAI or Ollama LLM based on USE_LOCAL_MODELS.
-    All agents and tools use this function — switching the flag switches everything.
+    Model factory: the LLM for a caller (route), e.g. 'classify_task' or
+    'check_hkma_compliance', per the MODEL_ROUTES -> MODEL_TIERS table.
+    USE_LOCAL_MODELS routes everything to the local tier; USE_FAKE_MODELS
+    returns a deterministic offline model instead. Each call's tokens, cost
+    and latency are recorded per tier in the cost tracker.
     """
+    from src.services.cost_tracker import TierUsageCallback
     settings = get_settings()
-    if settings.use_local_models:
+    tier, provider, model = resolve_model(route)
+    callbacks = ([TierUsageCallback(route or 'default', tier, model)]
+                 if settings.cost_tracking_enabled else [])
+    if settings.use_fake_models:
+        from src.services.fake_models import FakeChatModel
+        return FakeChatModel(latency_ms=settings.fake_llm_latency_ms, callbacks=callbacks)
+    if provider == 'ollama':
         from langchain_ollama import ChatOllama
         return ChatOllama(
-            model=settings.local_model_name,
+            model=model,
             temperature=temperature,
             base_url=settings.ollama_base_url,
+            callbacks=callbacks,
         )
     else:
         from langchain_openai import ChatOpenAI
         return ChatOpenAI(
-            model=settings.openai_model,
+            model=model,
             temperature=temperature,
             openai_api_key=settings.openai_api_key,
+            callbacks=callbacks,
         )
 
 
+@lru_cache()
 def get_embeddings():
-    """Embeddings: always use OpenAI (Ollama embeddings are lower quality)."""
+    """
+    Embeddings: always use OpenAI (Ollama embeddings are lower quality).
+    One shared client per process, behind an LRU cache (EMBEDDING_CACHE_SIZE=0 disables it).
+    """
+    settings = get_settings()
+    if settings.use_fake_models:
+        from src.services.fake_models import FakeEmbeddings
+        embeddings = FakeEmbeddings()
+    else:
+        from langchain_openai import OpenAIEmbeddings
+        embeddings = OpenAIEmbeddings(
+            model=settings.openai_embedding_model,
+            openai_api_key=settings.openai_api_key,
+        )
+    if settings.embedding_cache_size <= 0:
+        return embeddings
+    from src.services.embedding_cache import CachedEmbeddings
+    return CachedEmbeddings(embeddings, settings.openai_embedding_model,
+                            settings.embedding_cache_size)
+
+
+@lru_cache()
+def get_qdrant_client():
+    """Shared Qdrant client — one connection pool per process (or an embedded QDRANT_LOCATION)."""
     settings = get_settings()
-    from langchain_openai import OpenAIEmbeddings
-    return OpenAIEmbeddings(
-        model=settings.openai_embedding_model,
-        openai_api_key=settings.openai_api_key,
-    )
+    from qdrant_client import QdrantClient
+    if settings.qdrant_location == ':memory:':
+        return QdrantClient(location=':memory:')
+    if settings.qdrant_location:
+        return QdrantClient(path=settings.qdrant_location)
+    return QdrantClient(host=settings.qdrant_host, port=settings.qdrant_port)
@@ -1,37 +1,233 @@
-from crewai import Crew, Process
-from src.crew.agents import (
-    make_auditor, make_compliance_officer, make_risk_analyst, make_report_writer
-)
+from crewai import Crew, Process, Task
+from crewai.tasks.task_output import TaskOutput
+from functools import lru_cache
+from typing import Callable, Dict, List, Optional, Tuple
+from src.crew.pool import crew_pool
 from src.crew.tasks import (
     make_finding_review_task, make_compliance_check_task,
     make_risk_assessment_task, make_executive_report_task
 )
+from src.crew.outputs import RiskRegister
+from src.crew.tools import make_search_tool
+from src.config import get_settings, tier_for_model
+from src.services.cost_tracker import cost_tracker, estimate_cost
+from src.services.review_cache import review_cache, stable_hash
+from src.services.retrieval import corpus_version
+from src.services.trace_store import trace_store
+import logging
+import time
+
+logger = logging.getLogger(__name__)
+
+# Stable names for the four tasks, in execution order (cache keys, hand-offs)
+TASK_NAMES = ('findings', 'compliance', 'risk', 'report')
+
+
+def task_config_hash(task: Task) -> str:
+    """Hash of everything that shapes a task's output besides its inputs."""
+    agent = task.agent
+    schema = task.output_pydantic.model_json_schema() if task.output_pydantic else None
+    return stable_hash(
+        task.description, task.expected_output, schema,
+        agent.role, agent.goal, agent.backstory,
+        str(getattr(agent.llm, 'model', agent.llm)),
+        sorted(t.name for t in agent.tools or []),
+    )
+
+
+def make_review_tasks(agents: Dict[str, object], scope: str, quarter: str,
+                      on_risk_register: Optional[Callable] = None) -> List[Task]:
+    """The four tasks, in TASK_NAMES order, with their context chain."""
+    t1 = make_finding_review_task(agents['auditor'], scope, quarter)
+    t2 = make_compliance_check_task(agents['compliance_officer'], scope, finding_task=t1)
+    t3 = make_risk_assessment_task(agents['risk_analyst'], finding_task=t1, compliance_task=t2,
+                                   on_register=on_risk_register)
+    t4 = make_executive_report_task(agents['report_writer'], finding_task=t1,
+                                     compliance_task=t2, risk_task=t3)
+    return [t1, t2, t3, t4]
 
 
-def build_audit_crew(scope: str = 'APAC', quarter: str = 'Q3 2025') -> Crew:
+@lru_cache(maxsize=64)
+def template_task_hashes(scope: str, quarter: str) -> Dict[str, str]:
+    """Config hash per task, from tasks over the agent templates (no crew built)."""
+    tasks = make_review_tasks(crew_pool.templates(), scope, quarter)
+    return {name: task_config_hash(task) for name, task in zip(TASK_NAMES, tasks)}
+
+
+def review_task_keys(scope: str, quarter: str) -> Dict[str, str]:
+    """
+    Cache key per task: scope, quarter and corpus version, chained through
+    each task's config hash so a change upstream invalidates everything after.
+    """
+    keys, upstream = {}, stable_hash(scope, quarter, corpus_version(scope, quarter))
+    for name, config_hash in template_task_hashes(scope, quarter).items():
+        upstream = stable_hash(upstream, name, config_hash)
+        keys[name] = upstream
+    return keys
+
+
+def build_audit_crew(scope: str = 'APAC', quarter: str = 'Q3 2025',
+                     on_risk_register: Optional[Callable] = None,
+                     cached_outputs: Optional[Dict[str, dict]] = None,
+                     include_report: bool = True, trace_id: Optional[str] = None,
+                     evidence=None) -> Crew:
     """
     Assemble the 4-agent audit crew with sequential task execution.
     Task hand-offs: Auditor → Compliance Officer → Risk Analyst → Report Writer
     Each agent reads the previous agent's output via context=[previous_task].
+    on_risk_register is called with the RiskRegister as soon as t3 finishes,
+    while the Report Writer is still running.
+    cached_outputs maps TASK_NAMES to {'raw': ...} results from the review
+    cache: those tasks are not run, and their cached output is handed to
+    the downstream tasks as context. include_report=False stops after the
+    risk register (the map step of a regional fan-out). Steps and tasks are
+    recorded in the trace of thread trace_id. evidence is the run's
+    LazyEvidencePack, which answers agent searches in-process.
     """
-    # Instantiate agents
-    auditor = make_auditor()
-    compliance_officer = make_compliance_officer()
-    risk_analyst = make_risk_analyst()
-    report_writer = make_report_writer()
+    # Clone the warm agent templates; their document searches are filtered to scope/quarter
+    agents = crew_pool.agents(make_search_tool(scope, quarter, evidence))
+    auditor = agents['auditor']
+    compliance_officer = agents['compliance_officer']
+    risk_analyst = agents['risk_analyst']
+    report_writer = agents['report_writer']
+    tracer = trace_store.crew_tracer(trace_id, scope)
+    for agent in agents.values():          # Per-agent, so each step knows whose it is
+        agent.step_callback = tracer.step_callback(agent.role)
 
     # Instantiate tasks with context chain
-    t1 = make_finding_review_task(auditor, scope, quarter)
-    t2 = make_compliance_check_task(compliance_officer, scope, finding_task=t1)
-    t3 = make_risk_assessment_task(risk_analyst, finding_task=t1, compliance_task=t2)
-    t4 = make_executive_report_task(report_writer, finding_task=t1,
-                                     compliance_task=t2, risk_task=t3)
+    tasks = make_review_tasks(agents, scope, quarter, on_risk_register)
+    if not include_report:
+        tasks = tasks[:-1]
+    cached_outputs = cached_outputs or {}
+    for name, task in zip(TASK_NAMES, tasks):
+        if name in cached_outputs:
+            # Downstream context is read from task.output, so a cached output stands in
+            task.output = TaskOutput(description=task.description, agent=task.agent.role,
+                                     raw=cached_outputs[name]['raw'])
 
     return Crew(
-        agents=[auditor, compliance_officer, risk_analyst, report_writer],
-        tasks=[t1, t2, t3, t4],
+        agents=[auditor, compliance_officer, risk_analyst, report_writer][:len(tasks)],
+        tasks=[t for name, t in zip(TASK_NAMES, tasks) if name not in cached_outputs],
         process=Process.sequential,        # Tasks run in order: t1 → t2 → t3 → t4
         verbose=True,
-        memory=True,                       # Crew-level shared memory
+        task_callback=tracer.task_callback,
+        **crew_pool.memory(),              # Crew memory per CREW_MEMORY (off / short_term / qdrant)
         max_rpm=20,                        # Rate limit to avoid API throttling
     )
+
+
+def record_agent_usage(agent, thread_id: Optional[str] = None) -> float:
+    """
+    Record one per-run agent's LLM usage under its model tier (CrewAI calls
+    bypass get_llm) and return its cost, priced at the agent's own model.
+    """
+    llm = agent.llm
+    if hasattr(llm, 'get_token_usage_summary'):
+        metrics = llm.get_token_usage_summary()
+    else:
+        metrics = agent._token_process.get_summary()
+    model = (llm if isinstance(llm, str) else getattr(llm, 'model', None)) or ''
+    prompt_tokens, completion_tokens = metrics.prompt_tokens or 0, metrics.completion_tokens or 0
+    if not get_settings().cost_tracking_enabled or not metrics.successful_requests:
+        return estimate_cost(prompt_tokens, completion_tokens, model)
+    return cost_tracker.record(thread_id or '', agent.role, prompt_tokens, completion_tokens,
+                               model=model.split('/', 1)[-1], tier=tier_for_model(model),
+                               calls=metrics.successful_requests)
+
+
+def add_token_usage(usage: Optional[dict], crew: Crew, result, trace_id: Optional[str] = None):
+    """
+    Record a crew run's LLM usage per agent and accumulate it into usage
+    (prompt/completion tokens, and cost_usd priced per agent model; agents
+    are per-run clones, so their counters cover this run only).
+    """
+    metrics = getattr(result, 'token_usage', None)
+    if metrics is None:
+        return
+    try:
+        cost = sum(record_agent_usage(agent, trace_id) for agent in crew.agents)
+    except Exception as e:                 # Fall back to default pricing of the totals
+        logger.debug(f'Per-agent crew pricing failed: {e}')
+        cost = estimate_cost(metrics.prompt_tokens or 0, metrics.completion_tokens or 0)
+    if usage is None:
+        return
+    usage['prompt_tokens'] = usage.get('prompt_tokens', 0) + (metrics.prompt_tokens or 0)
+    usage['completion_tokens'] = usage.get('completion_tokens', 0) + (metrics.completion_tokens or 0)
+    usage['cost_usd'] = usage.get('cost_usd', 0.0) + cost
+
+
+def record_crew_run(trace_id: Optional[str], scope: str, tasks: List[str], result, start: float):
+    """Trace one crew kickoff with its wall time and total tokens."""
+    metrics = getattr(result, 'token_usage', None)
+    trace_store.record(trace_id, 'crew', 'Crew', f'ran {", ".join(tasks)}', scope=scope,
+                       duration_ms=round((time.perf_counter() - start) * 1000, 2),
+                       tokens=getattr(metrics, 'total_tokens', None))
+
+
+def run_review_crew(scope: str, quarter: str, on_risk_register: Optional[Callable] = None,
+                    include_report: bool = True, usage: Optional[dict] = None,
+                    trace_id: Optional[str] = None,
+                    evidence=None) -> Tuple[Dict[str, dict], List[str]]:
+    """
+    Run the crew for scope/quarter through the review cache: the longest
+    cached prefix of task outputs is reused and only the remaining tasks run.
+    Returns ({task name: {'raw', 'pydantic'}}, names of the cached tasks);
+    tokens spent are added to usage.
+    """
+    names = TASK_NAMES if include_report else TASK_NAMES[:-1]
+    keys = review_task_keys(scope, quarter)
+    cached = {}
+    for name in names:
+        hit = review_cache.get(keys[name])
+        if hit is None:
+            break
+        cached[name] = hit
+    if 'risk' in cached and on_risk_register:
+        register = cached['risk'].get('pydantic')
+        on_risk_register(RiskRegister(**register) if register else None)
+
+    outputs = dict(cached)
+    pending = [name for name in names if name not in cached]
+    if pending:
+        if cached:
+            logger.info(f'Review cache hit for {scope} {list(cached)} — running {pending}')
+        # Built once, only when something has to run
+        crew = build_audit_crew(scope=scope, quarter=quarter, on_risk_register=on_risk_register,
+                                cached_outputs=cached, include_report=include_report,
+                                trace_id=trace_id, evidence=evidence)
+        start = time.perf_counter()
+        result = crew.kickoff()
+        add_token_usage(usage, crew, result, trace_id)
+        record_crew_run(trace_id, scope, pending, result, start)
+        for name, task_output in zip(pending, result.tasks_output):
+            pydantic = task_output.pydantic
+            outputs[name] = {'raw': task_output.raw,
+                             'pydantic': pydantic.model_dump() if pydantic else None}
+            review_cache.set(keys[name], outputs[name])
+    else:
+        logger.info(f'Review cache hit for all {scope} tasks — crew not run')
+        trace_store.record(trace_id, 'crew', 'Crew', 'all tasks cached', scope=scope)
+    return outputs, list(cached)
+
+
+def write_merged_report(scope: str, quarter: str, inputs: Dict[str, dict],
+                        usage: Optional[dict] = None, trace_id: Optional[str] = None) -> dict:
+    """
+    Reduce step of a regional fan-out: run only the Report Writer over the
+    merged findings/compliance/risk tables. Cached by inputs and task config.
+    """
+    key = stable_hash('merged_report', scope, quarter,
+                      [inputs[name]['raw'] for name in TASK_NAMES[:-1]],
+                      template_task_hashes(scope, quarter)['report'])
+    hit = review_cache.get(key)
+    if hit is not None:
+        logger.info(f'Review cache hit for merged {scope} report')
+        return hit
+    crew = build_audit_crew(scope=scope, quarter=quarter, cached_outputs=inputs, trace_id=trace_id)
+    start = time.perf_counter()
+    result = crew.kickoff()
+    add_token_usage(usage, crew, result, trace_id)
+    record_crew_run(trace_id, scope, ['report'], result, start)
+    record = {'raw': result.tasks_output[-1].raw, 'pydantic': None}
+    review_cache.set(key, record)
+    return record
@@ -1,59 +1,152 @@
-from crewai.flow.flow import Flow, start, listen, router
-from src.crew.crew import build_audit_crew
+from crewai.flow.flow import Flow, start, listen, or_, router
+from concurrent.futures import ThreadPoolExecutor
+from src.config import get_settings
+from src.crew.crew import run_review_crew, write_merged_report
+from src.crew.outputs import ComplianceMap, FindingTable, RiskRegister
+from src.services.evidence_pack import LazyEvidencePack
+from src.services.retrieval import split_scope
+from typing import Callable, Dict, List, Optional, Tuple
 import logging
 
 logger = logging.getLogger(__name__)
 
 
+def merge_outputs(regions: List[str], parts: List[dict], model) -> dict:
+    """
+    Merge one task's regional outputs. Structured outputs are merged via
+    model.merge(); raw text from regions whose output did not parse is
+    appended under a region heading so nothing is lost.
+    """
+    merged = model.merge([model(**p['pydantic']) for p in parts if p.get('pydantic')])
+    unparsed = [f'[{region}]\n{p["raw"]}' for region, p in zip(regions, parts)
+                if not p.get('pydantic')]
+    return {'raw': '\n\n'.join([merged.compact()] + unparsed), 'pydantic': merged.model_dump()}
+
+
 class AuditComplianceFlow(Flow):
     """
     Production CrewAI Flow wrapping the 4-agent audit crew.
     Adds event-driven orchestration and severity-based routing.
     """
 
-    def __init__(self, scope: str = 'APAC', quarter: str = 'Q3 2025'):
+    def __init__(self, scope: str = 'APAC', quarter: str = 'Q3 2025',
+                 on_escalation: Optional[Callable[[dict], None]] = None,
+                 trace_id: Optional[str] = None):
         super().__init__()
         self.scope = scope
         self.quarter = quarter
+        self.on_escalation = on_escalation
+        self.trace_id = trace_id            # Thread whose trace records the crews' steps
+        self.evidence = None                # Run-scoped LazyEvidencePack (set in begin_review)
 
     @start()
     def begin_review(self):
-        """Entry point: initialise the flow state."""
+        """Entry point: initialise the flow state; the scope's evidence loads on the first search."""
         logger.info(f'Starting audit review: {self.scope} {self.quarter}')
+        # Covers the regional crews of a fan-out too (their scopes are subsets)
+        if get_settings().evidence_pack_enabled:
+            self.evidence = LazyEvidencePack(self.scope, self.quarter)
         self.state['scope'] = self.scope
         self.state['quarter'] = self.quarter
         self.state['severity_level'] = 'standard'
         self.state['requires_escalation'] = False
+        self.state['token_usage'] = {'prompt_tokens': 0, 'completion_tokens': 0, 'cost_usd': 0.0}
         return 'review_started'
 
-    @listen('review_started')
+    @listen(begin_review)
     def run_crew(self):
         """
         Run the 4-agent crew. This is the main work step.
         The crew runs sequentially: Auditor → Compliance → Risk → Report Writer.
+        Multi-jurisdiction scopes fan out into parallel regional crews.
+        Task outputs cached for this scope/quarter/corpus version are reused.
         """
         logger.info('Launching CrewAI specialist team...')
-        crew = build_audit_crew(
-            scope=self.state['scope'],
-            quarter=self.state['quarter']
-        )
-        result = crew.kickoff()
-        self.state['crew_report'] = result.raw
-
-        # Determine severity level from the report content
-        report_lower = result.raw.lower()
-        if 'critical' in report_lower or 'immediate escalation' in report_lower:
-            self.state['severity_level'] = 'critical'
-            self.state['requires_escalation'] = True
+        scope, quarter = self.state['scope'], self.state['quarter']
+        regions = split_scope(scope) if get_settings().crew_fanout_enabled else [scope]
+        if len(regions) > 1:
+            outputs, cached = self.fan_out(regions, quarter)
         else:
-            self.state['severity_level'] = 'standard'
+            outputs, cached = run_review_crew(scope, quarter, on_risk_register=self.assess_severity,
+                                              usage=self.state['token_usage'], trace_id=self.trace_id,
+                                              evidence=self.evidence)
+        self.state['cached_tasks'] = cached
+        if self.evidence is not None:
+            self.state['evidence_pack'] = self.evidence.stats()
+            logger.info(f'Evidence pack usage: {self.state["evidence_pack"]}')
+
+        self.state['crew_report'] = outputs['report']['raw']
+        # Structured hand-offs (FindingTable / ComplianceMap / RiskRegister)
+        for key, name in (('finding_table', 'findings'), ('compliance_map', 'compliance'),
+                          ('risk_register', 'risk')):
+            if outputs[name].get('pydantic') is not None:
+                self.state[key] = outputs[name]['pydantic']
+        return self.state['crew_report']
+
+    def fan_out(self, regions: List[str], quarter: str) -> Tuple[Dict[str, dict], List[str]]:
+        """
+        Map: findings, compliance and risk for each region in a bounded thread
+        pool (crews wait on the LLM, so threads overlap them well).
+        Reduce: merge the regional tables, set severity from the merged risk
+        register, and have the Report Writer produce one report.
+        """
+        self.state['regions'] = regions
+        workers = max(1, min(get_settings().crew_fanout_workers, len(regions)))
+        logger.info(f'Fanning out {self.state["scope"]} review over {regions} ({workers} workers)')
+        usages = [{} for _ in regions]
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='crew-region') as pool:
+            results = list(pool.map(
+                lambda region, usage: run_review_crew(region, quarter, include_report=False,
+                                                      usage=usage, trace_id=self.trace_id,
+                                                      evidence=self.evidence),
+                regions, usages))
+        for usage in usages:
+            for key, tokens in usage.items():
+                self.state['token_usage'][key] += tokens
+
+        region_outputs = [outputs for outputs, _ in results]
+        merged = {name: merge_outputs(regions, [o[name] for o in region_outputs], model)
+                  for name, model in (('findings', FindingTable), ('compliance', ComplianceMap),
+                                      ('risk', RiskRegister))}
+        # A region whose register could not be parsed escalates, as in a single-crew review
+        parsed = all(o['risk'].get('pydantic') for o in region_outputs)
+        self.assess_severity(RiskRegister(**merged['risk']['pydantic']) if parsed else None)
 
-        return result
+        merged['report'] = write_merged_report(self.state['scope'], quarter, merged,
+                                               usage=self.state['token_usage'],
+                                               trace_id=self.trace_id)
+        cached = [f'{region}:{name}' for region, (_, names) in zip(regions, results) for name in names]
+        return merged, cached
+
+    def assess_severity(self, register: Optional[RiskRegister]):
+        """
+        Risk task callback: set severity from the structured risk register as
+        soon as t3 completes, and fire on_escalation while the Report Writer
+        is still running. A missing register escalates, to stay on the safe side.
+        """
+        if register is None:
+            logger.warning('Risk register could not be parsed — escalating for human review')
+            critical, reason = [], 'risk register unavailable'
+        else:
+            critical = register.escalations()
+            reason = f'{len(critical)} critical risk(s)' if critical else ''
+            self.state['risk_register'] = register.model_dump()
+        escalate = register is None or bool(critical)
+        self.state['severity_level'] = 'critical' if escalate else 'standard'
+        self.state['requires_escalation'] = escalate
+        if escalate and self.on_escalation:
+            self.on_escalation({
+                'scope': self.state['scope'],
+                'quarter': self.state['quarter'],
+                'reason': reason,
+                'critical_risks': [r.model_dump() for r in critical],
+                'risk_register': self.state.get('risk_register'),
+            })
 
     @router('run_crew')
     def check_severity(self):
         """
-        Conditional route based on severity detected in the crew report.
+        Conditional route based on the severity set from the risk register.
         Critical findings require CAE escalation; standard goes direct.
         """
         if self.state.get('requires_escalation'):
@@ -80,7 +173,7 @@ class AuditComplianceFlow(Flow):
         self.state['final_report'] = self.state['crew_report']
         return 'finalised'
 
-    @listen('finalised')
+    @listen(or_(escalate_to_cae, standard_finalise))
     def complete(self):
         """Return the final report and escalation flag."""
         return {
@@ -88,11 +181,24 @@ class AuditComplianceFlow(Flow):
             'requires_escalation': self.state.get('requires_escalation', False),
             'scope': self.state['scope'],
             'quarter': self.state['quarter'],
+            'finding_table': self.state.get('finding_table'),
+            'compliance_map': self.state.get('compliance_map'),
+            'risk_register': self.state.get('risk_register'),
+            'cached_tasks': self.state.get('cached_tasks', []),
+            'regions': self.state.get('regions', [self.state['scope']]),
+            'token_usage': self.state.get('token_usage', {}),
         }
 
 
-def run_audit_flow(scope: str = 'APAC', quarter: str = 'Q3 2025') -> dict:
-    """Run the full audit compliance flow. Returns the final report dict."""
-    flow = AuditComplianceFlow(scope=scope, quarter=quarter)
+def run_audit_flow(scope: str = 'APAC', quarter: str = 'Q3 2025',
+                   on_escalation: Optional[Callable[[dict], None]] = None,
+                   trace_id: Optional[str] = None) -> dict:
+    """
+    Run the full audit compliance flow. Returns the final report dict.
+    on_escalation fires as soon as the risk register shows critical risks;
+    agent steps are recorded in the trace of thread trace_id.
+    """
+    flow = AuditComplianceFlow(scope=scope, quarter=quarter, on_escalation=on_escalation,
+                               trace_id=trace_id)
     result = flow.kickoff()
     return result if isinstance(result, dict) else flow.state
@@ -0,0 +1,217 @@
+"""
+Crew memory backends, selected by CREW_MEMORY:
+
+  off         no crew memory, so nothing is embedded or stored per step
+  short_term  short-term and entity memory in per-run, in-process stores
+              capped at CREW_MEMORY_MAX_ITEMS; nothing is persisted
+  qdrant      short-term, entity and long-term memory persisted in the
+              CREW_MEMORY_COLLECTION collection, pruned by age and size
+
+Every store embeds through get_embeddings() (the shared, cached client used
+for the audit collection) instead of CrewAI's own embedder and local files.
+The store classes implement CrewAI's storage interface (save/search/reset,
+and save/load for long-term memory).
+"""
+from collections import deque
+from qdrant_client import QdrantClient
+from qdrant_client.models import (
+    FieldCondition, Filter, FilterSelector, MatchValue, OrderBy, PayloadSchemaType,
+    PointIdsList, PointStruct, Range,
+)
+from typing import List, Optional
+from src.config import get_settings, get_embeddings, get_qdrant_client
+from src.services.collection_profile import create_collection, search_params
+import hashlib
+import logging
+import threading
+import time
+import uuid
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+MEMORY_MODES = ('off', 'short_term', 'qdrant')
+PRUNE_EVERY = 50                       # Saves between retention passes
+
+
+def memory_mode() -> str:
+    mode = get_settings().crew_memory.strip().lower()
+    if mode not in MEMORY_MODES:
+        logger.warning(f'Unknown CREW_MEMORY={mode!r}, crew memory disabled')
+        return 'off'
+    return mode
+
+
+class LocalMemoryStorage:
+    """Bounded in-process vector store; the oldest memories drop out first."""
+
+    def __init__(self, max_items: int):
+        self.items = deque(maxlen=max_items)       # (vector, text, metadata)
+        self._lock = threading.Lock()
+
+    def save(self, value, metadata: Optional[dict] = None, **kwargs):
+        text = str(value)
+        vector = np.asarray(get_embeddings().embed_documents([text])[0], dtype=np.float32)
+        with self._lock:
+            self.items.append((vector / (np.linalg.norm(vector) or 1.0), text, metadata or {}))
+
+    def search(self, query: str, limit: int = 3, score_threshold: float = 0.35, **kwargs) -> List[dict]:
+        with self._lock:
+            items = list(self.items)
+        if not items:
+            return []
+        q = np.asarray(get_embeddings().embed_query(query), dtype=np.float32)
+        scores = np.stack([v for v, _, _ in items]) @ (q / (np.linalg.norm(q) or 1.0))
+        return [{'context': items[i][1], 'metadata': items[i][2], 'score': float(scores[i])}
+                for i in np.argsort(-scores)[:limit] if scores[i] >= score_threshold]
+
+    def reset(self):
+        with self._lock:
+            self.items.clear()
+
+
+class NullLongTermStorage:
+    """Long-term memory that keeps nothing (short_term mode)."""
+
+    def save(self, *args, **kwargs):
+        pass
+
+    def load(self, task_description: str, latest_n: int) -> List[dict]:
+        return []
+
+    def reset(self):
+        pass
+
+
+def kind_filter(kind: str, **fields) -> Filter:
+    return Filter(must=[FieldCondition(key=k, match=MatchValue(value=v))
+                        for k, v in {'kind': kind, **fields}.items()])
+
+
+def ensure_memory_collection(client: QdrantClient):
+    """Create the crew memory collection (same vector profile as the audit collection)."""
+    name = get_settings().crew_memory_collection
+    try:
+        schema = client.get_collection(name).payload_schema or {}
+    except Exception:
+        create_collection(client, name)
+        schema = {}
+    for field_name, field_schema in (('kind', PayloadSchemaType.KEYWORD),
+                                     ('task_hash', PayloadSchemaType.KEYWORD),
+                                     ('created_at', PayloadSchemaType.FLOAT)):
+        if field_name not in schema:
+            client.create_payload_index(collection_name=name, field_name=field_name,
+                                        field_schema=field_schema)
+
+
+def prune_memory(client: QdrantClient) -> int:
+    """Apply retention: drop memories past the TTL, then the oldest beyond the size cap."""
+    settings = get_settings()
+    name = settings.crew_memory_collection
+    cutoff = time.time() - settings.crew_memory_ttl_days * 86400
+    client.delete(name, points_selector=FilterSelector(filter=Filter(must=[
+        FieldCondition(key='created_at', range=Range(lt=cutoff))])))
+    excess = client.count(name, exact=True).count - settings.crew_memory_max_points
+    if excess <= 0:
+        return 0
+    oldest, _ = client.scroll(name, limit=excess, with_payload=False, with_vectors=False,
+                              order_by=OrderBy(key='created_at', direction='asc'))
+    client.delete(name, points_selector=PointIdsList(points=[p.id for p in oldest]))
+    return len(oldest)
+
+
+class QdrantMemoryStorage:
+    """Short-term or entity memory persisted in the crew memory collection."""
+
+    _saves = 0
+    _saves_lock = threading.Lock()
+
+    def __init__(self, kind: str):
+        self.kind = kind
+        self.collection = get_settings().crew_memory_collection
+
+    def _upsert(self, text: str, payload: dict):
+        client = get_qdrant_client()
+        client.upsert(self.collection, points=[PointStruct(
+            id=str(uuid.uuid4()),
+            vector=get_embeddings().embed_documents([text])[0],
+            payload={'kind': self.kind, 'text': text, 'created_at': time.time(), **payload},
+        )])
+        with QdrantMemoryStorage._saves_lock:
+            QdrantMemoryStorage._saves += 1
+            due = QdrantMemoryStorage._saves % PRUNE_EVERY == 0
+        if due:
+            pruned = prune_memory(client)
+            if pruned:
+                logger.info(f'Crew memory: pruned {pruned} oldest memories')
+
+    def save(self, value, metadata: Optional[dict] = None, **kwargs):
+        self._upsert(str(value), {'metadata': metadata or {}})
+
+    def search(self, query: str, limit: int = 3, score_threshold: float = 0.35, **kwargs) -> List[dict]:
+        hits = get_qdrant_client().search(
+            collection_name=self.collection,
+            query_vector=get_embeddings().embed_query(query),
+            query_filter=kind_filter(self.kind),
+            search_params=search_params(),
+            limit=limit, score_threshold=score_threshold, with_payload=True,
+        )
+        return [{'context': h.payload.get('text', ''), 'metadata': h.payload.get('metadata', {}),
+                 'score': h.score} for h in hits]
+
+    def reset(self):
+        get_qdrant_client().delete(self.collection,
+                                   points_selector=FilterSelector(filter=kind_filter(self.kind)))
+
+
+class QdrantLongTermStorage(QdrantMemoryStorage):
+    """Long-term memory (per-task quality scores and suggestions), keyed by task description."""
+
+    def __init__(self):
+        super().__init__('long_term')
+
+    @staticmethod
+    def task_hash(task_description: str) -> str:
+        return hashlib.sha256(task_description.encode('utf-8')).hexdigest()
+
+    def save(self, task_description: str, metadata: dict, datetime: str, score: float):
+        self._upsert(task_description, {'task_hash': self.task_hash(task_description),
+                                        'metadata': metadata, 'datetime': datetime, 'score': score})
+
+    def load(self, task_description: str, latest_n: int) -> List[dict]:
+        points, _ = get_qdrant_client().scroll(
+            self.collection, limit=latest_n, with_payload=True, with_vectors=False,
+            scroll_filter=kind_filter(self.kind, task_hash=self.task_hash(task_description)),
+            order_by=OrderBy(key='created_at', direction='desc'),
+        )
+        return [{'metadata': p.payload.get('metadata', {}), 'datetime': p.payload.get('datetime'),
+                 'score': p.payload.get('score')} for p in points]
+
+
+def build_memory(shared: Optional[dict] = None) -> dict:
+    """
+    Crew(...) keyword arguments for the configured memory mode. qdrant-mode
+    stores are process-wide, so pass the dict returned by the first call
+    back in as shared; short_term stores are always new (run-scoped).
+    """
+    mode = memory_mode()
+    if mode == 'off':
+        return {'memory': False}
+    from crewai.memory import EntityMemory, LongTermMemory, ShortTermMemory
+    if mode == 'short_term':
+        max_items = get_settings().crew_memory_max_items
+        return {
+            'memory': True,
+            'short_term_memory': ShortTermMemory(storage=LocalMemoryStorage(max_items)),
+            'entity_memory': EntityMemory(storage=LocalMemoryStorage(max_items)),
+            'long_term_memory': LongTermMemory(storage=NullLongTermStorage()),
+        }
+    if shared:
+        return shared
+    ensure_memory_collection(get_qdrant_client())
+    return {
+        'memory': True,
+        'short_term_memory': ShortTermMemory(storage=QdrantMemoryStorage('short_term')),
+        'entity_memory': EntityMemory(storage=QdrantMemoryStorage('entity')),
+        'long_term_memory': LongTermMemory(storage=QdrantLongTermStorage()),
+    }
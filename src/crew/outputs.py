@@ -0,0 +1,137 @@
+"""
+Structured task outputs for the audit crew.
+
+Each analysis task returns one of these models (Task.output_pydantic), and
+compact_handoff() replaces the task's raw text with a pipe-delimited table,
+so downstream tasks receive a few hundred tokens instead of a transcript.
+"""
+from pydantic import BaseModel, Field
+from typing import List, Optional
+
+CRITICAL_SCORE = 17            # Risk matrix: 17-25 = Critical
+
+
+def _row(*cells) -> str:
+    return ' | '.join('-' if c is None or c == '' else str(c) for c in cells)
+
+
+class Finding(BaseModel):
+    finding_id: str
+    severity: str                              # Critical / Significant / Moderate / Low
+    title: str
+    owner: Optional[str] = None
+    deadline: Optional[str] = None             # YYYY-MM-DD
+    status: str = 'Open'                       # Open / In Progress / Closed
+    overdue: bool = False
+    gaps: List[str] = Field(default_factory=list)   # Missing attributes, evidence gaps
+
+
+class FindingTable(BaseModel):
+    findings: List[Finding] = Field(default_factory=list)
+
+    @classmethod
+    def merge(cls, tables: List['FindingTable']) -> 'FindingTable':
+        """Union of regional tables; a finding seen by several regions is kept once."""
+        seen = {}
+        for table in tables:
+            for f in table.findings:
+                seen.setdefault(f.finding_id, f)
+        return cls(findings=list(seen.values()))
+
+    def compact(self) -> str:
+        lines = ['FINDINGS: ID | Severity | Title | Owner | Deadline | Status | Overdue | Gaps']
+        lines += [_row(f.finding_id, f.severity, f.title, f.owner, f.deadline, f.status,
+                       'yes' if f.overdue else 'no', '; '.join(f.gaps))
+                  for f in self.findings]
+        return '\n'.join(lines)
+
+
+class ComplianceItem(BaseModel):
+    finding_id: str
+    regulation: str                            # e.g. 'HKMA SPM TM-G-1'
+    section: Optional[str] = None
+    status: str                                # COMPLIANT / NON-COMPLIANT / NEEDS REVIEW
+    required_action: Optional[str] = None
+    reportable: bool = False
+
+
+class ComplianceMap(BaseModel):
+    items: List[ComplianceItem] = Field(default_factory=list)
+    conclusions: str = ''
+
+    @classmethod
+    def merge(cls, maps: List['ComplianceMap']) -> 'ComplianceMap':
+        seen = {}
+        for m in maps:
+            for i in m.items:
+                seen.setdefault((i.finding_id, i.regulation), i)
+        return cls(items=list(seen.values()),
+                   conclusions=' '.join(m.conclusions for m in maps if m.conclusions))
+
+    def compact(self) -> str:
+        lines = ['COMPLIANCE: ID | Regulation | Section | Status | Required Action | Reportable']
+        lines += [_row(i.finding_id, i.regulation, i.section, i.status, i.required_action,
+                       'yes' if i.reportable else 'no')
+                  for i in self.items]
+        if self.conclusions:
+            lines.append(f'Conclusions: {self.conclusions}')
+        return '\n'.join(lines)
+
+
+class RiskItem(BaseModel):
+    finding_id: str
+    likelihood: int = Field(ge=1, le=5)
+    impact: int = Field(ge=1, le=5)
+    risk_score: int = Field(ge=1, le=25)       # likelihood x impact
+    rating: str                                # Low / Medium / High / Critical
+    priority_rank: int = Field(ge=1)
+    escalate: bool = False
+
+
+class RiskRegister(BaseModel):
+    risks: List[RiskItem] = Field(default_factory=list)
+
+    @classmethod
+    def merge(cls, registers: List['RiskRegister']) -> 'RiskRegister':
+        """
+        Combine regional registers: a finding scored by several regions keeps
+        its highest score, and priority is re-ranked across the whole set.
+        """
+        best = {}
+        for register in registers:
+            for r in register.risks:
+                if r.finding_id not in best or r.risk_score > best[r.finding_id].risk_score:
+                    best[r.finding_id] = r
+        ranked = sorted(best.values(), key=lambda r: (-r.risk_score, r.priority_rank))
+        return cls(risks=[r.model_copy(update={'priority_rank': rank})
+                          for rank, r in enumerate(ranked, 1)])
+
+    def escalations(self) -> List[RiskItem]:
+        """
+        Risks in the Critical band (rated Critical or scored 17-25), highest
+        priority first. The analyst's per-item escalate flag marks its top
+        risks and is reported, but does not on its own trigger CAE escalation.
+        """
+        return sorted((r for r in self.risks
+                       if r.rating.strip().lower() == 'critical' or r.risk_score >= CRITICAL_SCORE),
+                      key=lambda r: r.priority_rank)
+
+    def requires_escalation(self) -> bool:
+        return bool(self.escalations())
+
+    def compact(self) -> str:
+        lines = ['RISK REGISTER: ID | L | I | Score | Rating | Rank | Escalate']
+        lines += [_row(r.finding_id, r.likelihood, r.impact, r.risk_score, r.rating,
+                       r.priority_rank, 'yes' if r.escalate else 'no')
+                  for r in sorted(self.risks, key=lambda r: r.priority_rank)]
+        return '\n'.join(lines)
+
+
+def compact_handoff(output) -> None:
+    """
+    Task callback: swap the raw LLM text for the compact serialisation of the
+    structured output. CrewAI builds downstream context from TaskOutput.raw,
+    so later tasks receive the table rather than the full transcript.
+    """
+    if getattr(output, 'pydantic', None) is not None and hasattr(output.pydantic, 'compact'):
+        output.raw = output.pydantic.compact()
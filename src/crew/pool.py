@@ -0,0 +1,101 @@
+"""
+Warm crew factory.
+
+Agent definitions (prompts, LLM, executor settings) are validated once per
+process and cloned per run with Agent.copy(): each clone gets its own token
+counter, RPM controller and executor, and an LLM copy that shares the
+template's HTTP client but not its usage counters, so concurrent runs never
+mix token usage or rate limits. Only the scope-bound search tool differs
+between runs. Persistent crew memory stores (CREW_MEMORY=qdrant) are
+likewise created once and shared by every crew; see src/crew/memory.py.
+"""
+from crewai import Agent
+from crewai.tools.base_tool import Tool
+from typing import Dict, Optional
+from src.crew.agents import (
+    make_auditor, make_compliance_officer, make_risk_analyst, make_report_writer
+)
+from src.crew.memory import build_memory, memory_mode
+import copy
+import logging
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+AGENT_NAMES = ('auditor', 'compliance_officer', 'risk_analyst', 'report_writer')
+SEARCH_TOOL_NAME = 'search_audit_findings'
+
+
+def fresh_llm(llm):
+    """A per-run copy of an agent's LLM: same client and settings, zeroed usage counters."""
+    if isinstance(llm, str) or llm is None:
+        return llm
+    clone = llm.model_copy() if hasattr(llm, 'model_copy') else copy.copy(llm)
+    usage = getattr(llm, '_token_usage', None)
+    if isinstance(usage, dict):            # Shallow copies would share this dict
+        clone._token_usage = dict.fromkeys(usage, 0)
+    return clone
+
+
+def clone_agent(template: Agent, tools: Optional[list] = None) -> Agent:
+    """An independent per-run agent: no LLM, usage or rate-limit state shared with the template."""
+    clone = template.copy()
+    clone.llm = fresh_llm(template.llm)
+    if tools is not None:
+        clone.tools = tools
+    return clone
+
+
+class CrewPool:
+    """Process-wide agent templates and memory backends, built on first use."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._templates: Optional[Dict[str, Agent]] = None
+        self._memory: Optional[dict] = None
+        self.warm_seconds = 0.0
+
+    def warm(self):
+        """Build agent templates and memory stores (idempotent, thread-safe)."""
+        if self._templates is not None:
+            return
+        with self._lock:
+            if self._templates is not None:
+                return
+            start = time.perf_counter()
+            self._memory = build_memory() if memory_mode() == 'qdrant' else None
+            self._templates = dict(zip(AGENT_NAMES, (
+                make_auditor(), make_compliance_officer(), make_risk_analyst(), make_report_writer(),
+            )))
+            self.warm_seconds = time.perf_counter() - start
+            logger.info(f'Crew pool warmed in {self.warm_seconds:.2f}s')
+
+    def agents(self, search_tool=None) -> Dict[str, Agent]:
+        """Per-run agent clones; search_tool replaces the unscoped default search."""
+        self.warm()
+        scoped = Tool.from_langchain(search_tool) if search_tool is not None else None
+        clones = {}
+        for name, template in self._templates.items():
+            tools = [scoped if scoped and t.name == SEARCH_TOOL_NAME else t
+                     for t in template.tools]
+            clones[name] = clone_agent(template, tools)
+        return clones
+
+    def templates(self) -> Dict[str, Agent]:
+        """The shared agent templates themselves (read-only: for hashing task configs)."""
+        self.warm()
+        return self._templates
+
+    def memory(self) -> dict:
+        """Crew(...) memory arguments: shared persistent stores, or fresh run-scoped ones."""
+        self.warm()
+        return build_memory(shared=self._memory)
+
+    @property
+    def is_warm(self) -> bool:
+        return self._templates is not None
+
+
+# Module-level singleton, warmed at API startup (see src/services/warmup.py)
+crew_pool = CrewPool()
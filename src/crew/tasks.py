@@ -1,5 +1,6 @@
 from crewai import Task
-from typing import Optional
+from typing import Callable, Optional
+from src.crew.outputs import FindingTable, ComplianceMap, RiskRegister, compact_handoff
 
 
 def make_finding_review_task(agent, scope: str = 'APAC', quarter: str = 'Q3 2025') -> Task:
@@ -27,6 +28,8 @@ def make_finding_review_task(agent, scope: str = 'APAC', quarter: str = 'Q3 2025
             'Deadline, Status, and a clear list of gaps (missing attributes or overdue items).'
         ),
         agent=agent,
+        output_pydantic=FindingTable,
+        callback=compact_handoff,          # Hand off the table, not the transcript
     )
 
 
@@ -55,11 +58,20 @@ def make_compliance_check_task(agent, scope: str = 'APAC', finding_task: Optiona
         ),
         agent=agent,
         context=[finding_task] if finding_task else [],
+        output_pydantic=ComplianceMap,
+        callback=compact_handoff,
     )
 
 
 def make_risk_assessment_task(agent, finding_task: Optional[Task] = None,
-                               compliance_task: Optional[Task] = None) -> Task:
+                               compliance_task: Optional[Task] = None,
+                               on_register: Optional[Callable] = None) -> Task:
+    """on_register(RiskRegister | None) is called the moment the task completes."""
+    def on_complete(output):
+        compact_handoff(output)
+        if on_register:
+            on_register(output.pydantic)
+
     return Task(
         description="""
         Perform a quantitative risk assessment of all findings using the
@@ -82,6 +94,8 @@ def make_risk_assessment_task(agent, finding_task: Optional[Task] = None,
         ),
         agent=agent,
         context=[t for t in [finding_task, compliance_task] if t],
+        output_pydantic=RiskRegister,
+        callback=on_complete,
     )
 
 
@@ -93,7 +107,8 @@ def make_executive_report_task(agent, finding_task=None,
         executive compliance report suitable for the Chief Audit Executive
         and the Board Audit Committee.
 
-        Use the outputs from ALL three previous agents.
+        Use the outputs from ALL three previous agents, provided as compact
+        tables (findings, compliance map, risk register).
 
         Report structure (mandatory):
         # AUDIT COMPLIANCE REVIEW — [SCOPE] [QUARTER]
@@ -1,7 +1,9 @@
 from langchain_core.tools import tool
-from src.config import get_settings, get_embeddings, get_llm
+from src.config import get_settings, get_llm, get_embeddings, resolve_model
 from src.security.presidio_service import presidio
-from qdrant_client import QdrantClient
+from src.services.retrieval import retrieve_context, normalise_quarter, scope_region
+from src.services.context_packer import pack_context
+from src.services.review_cache import review_cache
 from datetime import datetime
 import logging
 
@@ -9,37 +11,61 @@ logger = logging.getLogger(__name__)
 settings = get_settings()
 
 
-def get_qdrant():
-    return QdrantClient(host=settings.qdrant_host, port=settings.qdrant_port)
-
-
-@tool
-def search_audit_findings(query: str, top_k: int = 6) -> str:
+def make_search_tool(scope: str = 'APAC', quarter: str = '', evidence=None):
+    """
+    Build the search_audit_findings tool bound to a review's scope and
+    quarter, so every agent search is filtered to the relevant region/period.
+    Searches are answered from the run's EvidencePack when it covers them.
+    """
+    region, period = scope_region(scope), normalise_quarter(quarter)
+
+    @tool
+    def search_audit_findings(query: str, top_k: int = 6) -> str:
+        """
+        Search the audit document database for findings, observations,
+        and recommendations. Use for: retrieving specific findings,
+        comparing findings across regions, or finding evidence.
+        """
+        try:
+            results = None
+            if evidence is not None:
+                # Already-masked chunks from the run's in-memory pack
+                results = evidence.search(get_embeddings().embed_query(query), region, period,
+                                          k=top_k)
+            if results is None:
+                results = retrieve_context(query, scope=scope, quarter=quarter, k=top_k)
+                for hit in results:
+                    # Mask PII in retrieved content before returning
+                    hit.text = presidio.anonymize(hit.text)
+            if not results:
+                return 'No relevant findings found in the audit database.'
+            packed = pack_context(results, model=resolve_model('search_audit_findings')[2])
+            logger.info(f'search_audit_findings: {packed.summary()}')
+            output = []
+            for i, (hit, text) in enumerate(packed.sections, 1):
+                output.append(f'[{i}] {hit.source} (score: {hit.score:.3f})\n    {text}')
+            return '\n'.join(output)
+        except Exception as e:
+            return f'Search failed: {str(e)}'
+
+    return search_audit_findings
+
+
+# Unscoped default (searches every region and quarter)
+search_audit_findings = make_search_tool()
+
+
+def _cached_llm_call(tool_name: str, prompt: str) -> str:
     """
-    Search the audit document database for findings, observations,
-    and recommendations. Use for: retrieving specific findings,
-    comparing findings across regions, or finding evidence.
+    Run a per-finding LLM check through the review cache: an unchanged
+    finding re-checked in a later review is answered without an LLM call.
     """
-    try:
-        client = get_qdrant()
-        embeddings = get_embeddings()
-        vector = embeddings.embed_query(query)
-        results = client.search(
-            collection_name=settings.qdrant_collection,
-            query_vector=vector, limit=top_k, with_payload=True
-        )
-        if not results:
-            return 'No relevant findings found in the audit database.'
-        output = []
-        for i, hit in enumerate(results, 1):
-            src = hit.payload.get('source', 'Unknown')
-            content = hit.payload.get('page_content', '')[:700]
-            # Mask PII in retrieved content before returning
-            masked = presidio.anonymize(content)
-            output.append(f'[{i}] {src} (score: {hit.score:.3f})\n    {masked}')
-        return '\n'.join(output)
-    except Exception as e:
-        return f'Search failed: {str(e)}'
+    def compute() -> str:
+        from langchain_core.messages import HumanMessage
+        llm = get_llm(temperature=0, route=tool_name)
+        return llm.invoke([HumanMessage(content=prompt)]).content
+    _, _, model = resolve_model(tool_name)
+    return review_cache.cached_call(tool_name, prompt, model, compute)
 
 
 @tool
@@ -50,7 +76,6 @@ def check_hkma_compliance(finding_description: str) -> str:
     AML/CFT guidelines, and Technology Risk Management guidelines.
     Use for: verifying Hong Kong regulatory alignment.
     """
-    llm = get_llm(temperature=0)
     prompt = f"""As an expert in HKMA regulation, analyse this finding:
     {finding_description}
 
@@ -65,9 +90,7 @@ def check_hkma_compliance(finding_description: str) -> str:
     2. Regulatory reference (exact section)
     3. Compliance status: COMPLIANT / NON-COMPLIANT / NEEDS REVIEW
     4. Required remediation under HKMA rules"""
-    from langchain_core.messages import HumanMessage
-    response = llm.invoke([HumanMessage(content=prompt)])
-    return response.content
+    return _cached_llm_call('check_hkma_compliance', prompt)
 
 
 @tool
@@ -77,7 +100,6 @@ def check_mas_compliance(finding_description: str) -> str:
     References: MAS Notices, Technology Risk Management Guidelines (TRMG).
     Use for: Singapore regulatory alignment checks.
     """
-    llm = get_llm(temperature=0)
     prompt = f"""As an expert in MAS regulation, analyse this finding:
     {finding_description}
 
@@ -92,9 +114,7 @@ def check_mas_compliance(finding_description: str) -> str:
     2. MAS Notice/section reference
     3. Compliance status: COMPLIANT / NON-COMPLIANT / NEEDS REVIEW
     4. Required remediation under MAS rules"""
-    from langchain_core.messages import HumanMessage
-    response = llm.invoke([HumanMessage(content=prompt)])
-    return response.content
+    return _cached_llm_call('check_mas_compliance', prompt)
 
 
 @tool
@@ -104,7 +124,6 @@ def assess_risk_severity(finding: str, context: str = '') -> str:
     risk matrix (likelihood x impact). Returns severity rating and
     priority ranking.
     """
-    llm = get_llm(temperature=0)
     prompt = f"""Perform a structured risk assessment for this finding:
     Finding: {finding}
     Context: {context or 'No additional context'}
@@ -123,9 +142,7 @@ def assess_risk_severity(finding: str, context: str = '') -> str:
     - Risk score and rating (Low/Medium/High/Critical)
     - Business areas affected
     - Priority rank among peers (1=highest priority)"""
-    from langchain_core.messages import HumanMessage
-    response = llm.invoke([HumanMessage(content=prompt)])
-    return response.content
+    return _cached_llm_call('assess_risk_severity', prompt)
 
 
 @tool
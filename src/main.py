@@ -1,15 +1,23 @@
 import logging
 import uuid
+import asyncio
 import os
+import shutil
 import tempfile
-from fastapi import FastAPI, HTTPException, UploadFile, File
-from fastapi.responses import StreamingResponse
-from langchain_core.messages import HumanMessage
-from src.supervisor.graph import supervisor_graph
-from src.models import ReviewRequest, ReviewResponse, ApprovalRequest, UploadResponse
-from src.services.cost_tracker import CostTracker
+import zipfile
+from typing import List, Optional
+from fastapi import FastAPI, Header, HTTPException, UploadFile, File
+from fastapi.responses import JSONResponse, StreamingResponse
+from src.supervisor.graph import get_supervisor_graph
+from src.supervisor.state import new_review_state
+from src.models import (
+    ReviewRequest, ReviewResponse, ApprovalRequest, UploadResponse, BulkUploadResponse,
+    BatchReviewRequest, BatchReviewResponse,
+)
+from src.services.cost_tracker import cost_tracker
 from src.security.presidio_service import presidio
 from src.security.guardrails_client import guardrails
+from src.config import get_settings
 import json
 
 logging.basicConfig(level=logging.INFO)
@@ -21,12 +29,42 @@ app = FastAPI(
     version='1.0.0'
 )
 
-cost_tracker = CostTracker()
+loop_monitor = None
+if get_settings().loop_lag_monitor:
+    from src.services.loop_monitor import LoopLagMiddleware, LoopLagMonitor
+    loop_monitor = LoopLagMonitor(get_settings().loop_lag_interval_ms)
+    app.add_middleware(LoopLagMiddleware, monitor=loop_monitor)
+
+UPLOAD_BLOCK_BYTES = 1024 * 1024
+SSE_HEADERS = {'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}   # No proxy buffering
+
+# Background jobs (ingestion, batches): the loop keeps only weak references to tasks
+_background_tasks: set = set()
+
+
+def _spawn(coro) -> asyncio.Task:
+    task = asyncio.create_task(coro)
+    _background_tasks.add(task)
+    task.add_done_callback(_background_tasks.discard)
+    return task
+
+
+@app.on_event('startup')
+async def start_warm_up():
+    """Preload heavy components off the event loop; /ready reports when they are loaded."""
+    if get_settings().startup_warmup:
+        from src.services.warmup import warm_up
+        asyncio.get_running_loop().run_in_executor(None, warm_up)
+
+
+@app.on_event('shutdown')
+def stop_pii_workers():
+    """PII_MODE=process: stop the masking worker processes with the app."""
+    presidio.shutdown()
 
 
 @app.get('/health')
 def health():
-    from src.config import get_settings
     s = get_settings()
     return {
         'status': 'ok',
@@ -35,6 +73,14 @@ def health():
     }
 
 
+@app.get('/ready')
+def ready():
+    """Readiness probe: 503 until the warm-up components are loaded."""
+    from src.services.warmup import readiness
+    status = readiness()
+    return JSONResponse(status_code=200 if status['ready'] else 503, content=status)
+
+
 @app.post('/supervisor/invoke', response_model=ReviewResponse)
 async def invoke_supervisor(request: ReviewRequest):
     """
@@ -51,28 +97,12 @@ async def invoke_supervisor(request: ReviewRequest):
             detail=f'Input blocked by guardrails: {guard_result["blocked_reason"]}')
 
     # Step 2: Presidio PII mask user input
-    safe_task = presidio.anonymize(request.task)
+    safe_task = await presidio.anonymize_async(request.task)
 
     config = {'configurable': {'thread_id': thread_id}}
-    initial_state = {
-        'messages': [HumanMessage(content=safe_task)],
-        'task_type': '',
-        'scope': request.scope,
-        'quarter': request.quarter,
-        'quick_answer': '',
-        'crew_report': '',
-        'requires_escalation': False,
-        'needs_human_approval': False,
-        'approval_granted': False,
-        'final_report': '',
-        'steps_taken': [],
-        'agent_steps': [],
-        'total_cost_usd': 0.0,
-        'total_tokens': 0,
-        'thread_id': thread_id,
-    }
+    initial_state = new_review_state(safe_task, request.scope, request.quarter, thread_id)
     try:
-        result = supervisor_graph.invoke(initial_state, config)
+        result = get_supervisor_graph().invoke(initial_state, config)
 
         # Step 3: Guardrails output check
         final = result.get('final_report', '')
@@ -95,33 +125,73 @@ async def invoke_supervisor(request: ReviewRequest):
 
 
 @app.post('/supervisor/stream')
-async def stream_supervisor(request: ReviewRequest):
-    """Stream supervisor execution steps as Server-Sent Events."""
+async def stream_supervisor(request: ReviewRequest,
+                            last_event_id: Optional[str] = Header(None, alias='Last-Event-ID')):
+    """
+    Stream supervisor execution as delta-encoded Server-Sent Events; the
+    run's thread id (generated if omitted) is in the X-Thread-ID header.
+    The run continues if the client disconnects; reconnect with Last-Event-ID
+    (here or on GET /supervisor/stream/{thread_id}) to receive what was missed.
+    """
+    from src.services.event_stream import event_logs, sse_events, start_stream
     thread_id = request.thread_id or str(uuid.uuid4())
-    safe_task = presidio.anonymize(request.task)
+    if last_event_id and thread_id in event_logs:
+        return _resume_stream(event_logs[thread_id], last_event_id)
+    safe_task = await presidio.anonymize_async(request.task)
     config = {'configurable': {'thread_id': thread_id}}
-    initial_state = {
-        'messages': [HumanMessage(content=safe_task)],
-        'task_type': '', 'scope': request.scope, 'quarter': request.quarter,
-        'quick_answer': '', 'crew_report': '', 'requires_escalation': False,
-        'needs_human_approval': False, 'approval_granted': False,
-        'final_report': '', 'steps_taken': [], 'agent_steps': [],
-        'total_cost_usd': 0.0, 'total_tokens': 0, 'thread_id': thread_id,
-    }
+    initial_state = new_review_state(safe_task, request.scope, request.quarter, thread_id)
+    try:
+        log = start_stream(initial_state, config)
+    except ValueError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    return StreamingResponse(sse_events(log), media_type='text/event-stream',
+                             headers={**SSE_HEADERS, 'X-Thread-ID': thread_id})
 
-    def event_gen():
-        for chunk in supervisor_graph.stream(initial_state, config, stream_mode='updates'):
-            for node_name, node_output in chunk.items():
-                event = {
-                    'node': node_name,
-                    'steps': node_output.get('steps_taken', []),
-                    'report': node_output.get('final_report', ''),
-                    'needs_approval': node_output.get('needs_human_approval', False),
-                    'requires_escalation': node_output.get('requires_escalation', False),
-                }
-                yield f'data: {json.dumps(event)}\n\n'
 
-    return StreamingResponse(event_gen(), media_type='text/event-stream')
+@app.get('/supervisor/stream/{thread_id}')
+async def resume_supervisor_stream(thread_id: str,
+                                   last_event_id: Optional[str] = Header(None, alias='Last-Event-ID')):
+    """Resume (or replay) a thread's event stream after Last-Event-ID."""
+    from src.services.event_stream import event_logs
+    if thread_id not in event_logs:
+        raise HTTPException(status_code=404, detail='No streamed run for this thread')
+    return _resume_stream(event_logs[thread_id], last_event_id or '0')
+
+
+def _resume_stream(log, last_event_id: str) -> StreamingResponse:
+    from src.services.event_stream import sse_events
+    try:
+        last = int(last_event_id)
+    except ValueError:
+        raise HTTPException(status_code=400, detail='Last-Event-ID must be an integer')
+    return StreamingResponse(sse_events(log, last), media_type='text/event-stream',
+                             headers={**SSE_HEADERS, 'X-Thread-ID': log.thread_id})
+
+
+@app.post('/supervisor/batch', response_model=BatchReviewResponse)
+async def batch_review(request: BatchReviewRequest):
+    """
+    Run full reviews for many (scope, quarter) pairs as one background batch
+    with bounded concurrency. Poll /supervisor/batch/{batch_id} for per-item
+    status and aggregate cost; escalated items are approved per thread_id.
+    """
+    from src.services.batch_review import create_batch, run_batch
+    if not request.items:
+        raise HTTPException(status_code=400, detail='No review items')
+    job = create_batch([(i.scope, i.quarter) for i in request.items], request.max_concurrency)
+    _spawn(run_batch(job))
+    return BatchReviewResponse(
+        batch_id=job.batch_id, status=job.status, concurrency=job.concurrency,
+        thread_ids={f'{i.scope} | {i.quarter}': i.thread_id for i in job.items},
+    )
+
+
+@app.get('/supervisor/batch/{batch_id}')
+def get_batch_review(batch_id: str):
+    from src.services.batch_review import batches
+    if batch_id not in batches:
+        raise HTTPException(status_code=404, detail='Unknown batch')
+    return batches[batch_id].snapshot()
 
 
 @app.post('/supervisor/approve')
@@ -129,10 +199,11 @@ async def approve_report(request: ApprovalRequest):
     """Resume paused supervisor after human approval/rejection."""
     config = {'configurable': {'thread_id': request.thread_id}}
     try:
-        result = supervisor_graph.invoke(
-            None, config, command={'resume': request.decision}
+        # May wait for a Report Writer still drafting: off the event loop
+        result = await asyncio.to_thread(
+            get_supervisor_graph().invoke, None, config, command={'resume': request.decision}
         )
-        final = presidio.anonymize(result.get('final_report', ''))
+        final = await presidio.anonymize_async(result.get('final_report', ''))
         return {
             'status': 'resumed',
             'decision': request.decision,
@@ -140,6 +211,9 @@ async def approve_report(request: ApprovalRequest):
             'notes': request.notes,
             'report': final,
         }
+    except TimeoutError:
+        raise HTTPException(status_code=504,
+                            detail='The Report Writer is still drafting — retry the approval later')
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -149,17 +223,148 @@ async def upload_document(file: UploadFile = File(...)):
     from src.services.rag_service import index_document
     if not file.filename.endswith(('.pdf', '.txt')):
         raise HTTPException(status_code=400, detail='PDF or TXT files only')
+    # Spool to disk in fixed-size blocks so the upload never sits in memory whole
     with tempfile.NamedTemporaryFile(delete=False, suffix=os.path.splitext(file.filename)[1]) as tmp:
-        content = await file.read()
-        tmp.write(content)
+        while block := await file.read(UPLOAD_BLOCK_BYTES):
+            tmp.write(block)
         tmp_path = tmp.name
     try:
-        chunks = await index_document(tmp_path, file.filename)
-        return UploadResponse(filename=file.filename, chunks_indexed=chunks, status='indexed')
+        result = await index_document(tmp_path, file.filename)
+        return UploadResponse(
+            filename=file.filename,
+            chunks_indexed=result.chunks_indexed,
+            status='indexed' if result.chunks_added or result.chunks_removed else 'unchanged',
+            chunks_added=result.chunks_added,
+            chunks_removed=result.chunks_removed,
+            chunks_unchanged=result.chunks_unchanged,
+        )
     finally:
         os.unlink(tmp_path)
 
 
+async def _spool_upload(file: UploadFile, path: str, limit=None):
+    with open(path, 'wb') as out:
+        while block := await file.read(UPLOAD_BLOCK_BYTES):
+            if limit is not None:
+                limit.add_bytes(len(block))
+            out.write(block)
+
+
+@app.post('/documents/bulk', response_model=BulkUploadResponse)
+async def bulk_upload_documents(files: List[UploadFile] = File(...)):
+    """
+    Ingest many documents (PDF/TXT files and/or .zip archives of them) as one
+    background job. Poll /documents/jobs/{job_id} or stream its /events.
+    """
+    from src.services.ingestion_pipeline import (
+        UploadLimit, UploadTooLarge, create_job, extract_archive, run_ingestion_job,
+        safe_member_name,
+    )
+    settings = get_settings()
+    limit = UploadLimit(settings.ingest_max_upload_bytes, settings.ingest_max_files)
+    workdir = tempfile.mkdtemp(prefix='bulk_ingest_')
+    docs = {}   # filename -> spooled path (later duplicates win)
+    try:
+        for i, upload in enumerate(files):
+            name = upload.filename or ''
+            if name.lower().endswith('.zip'):
+                archive = os.path.join(workdir, f'archive_{i}.zip')
+                await _spool_upload(upload, archive)
+                # Decompression is CPU and disk bound: off the event loop
+                await asyncio.to_thread(extract_archive, archive, workdir, docs, limit)
+                os.unlink(archive)
+            elif safe_member_name(name):
+                limit.add_file()
+                path = os.path.join(workdir, f'{limit.files}_{os.path.basename(name)}')
+                await _spool_upload(upload, path, limit)
+                docs[os.path.basename(name)] = path
+            else:
+                raise HTTPException(status_code=400,
+                    detail=f'{name}: PDF, TXT or ZIP files only')
+    except HTTPException:
+        shutil.rmtree(workdir, ignore_errors=True)
+        raise
+    except UploadTooLarge as e:
+        shutil.rmtree(workdir, ignore_errors=True)
+        raise HTTPException(status_code=413, detail=str(e))
+    except zipfile.BadZipFile as e:
+        shutil.rmtree(workdir, ignore_errors=True)
+        raise HTTPException(status_code=400, detail=f'Invalid archive: {e}')
+    if not docs:
+        shutil.rmtree(workdir, ignore_errors=True)
+        raise HTTPException(status_code=400, detail='No PDF or TXT documents found')
+
+    job = create_job(files_total=len(docs))
+    _spawn(run_ingestion_job(job, [(path, name) for name, path in docs.items()], workdir))
+    return BulkUploadResponse(job_id=job.job_id, files=list(docs), status=job.status)
+
+
+@app.get('/documents/jobs/{job_id}')
+def get_ingestion_job(job_id: str):
+    from src.services.ingestion_pipeline import jobs
+    if job_id not in jobs:
+        raise HTTPException(status_code=404, detail='Unknown ingestion job')
+    return jobs[job_id].snapshot()
+
+
+@app.get('/documents/jobs/{job_id}/events')
+async def stream_ingestion_job(job_id: str):
+    """Stream bulk ingestion progress as Server-Sent Events until the job ends."""
+    from src.services.ingestion_pipeline import jobs
+    if job_id not in jobs:
+        raise HTTPException(status_code=404, detail='Unknown ingestion job')
+    job = jobs[job_id]
+
+    async def event_gen():
+        last = None
+        while True:
+            snap = job.snapshot()
+            progress = {k: v for k, v in snap.items() if k != 'elapsed_seconds'}
+            if progress != last:
+                last = progress
+                yield f'data: {json.dumps(snap)}\n\n'
+            if job.status in ('completed', 'failed'):
+                return
+            await asyncio.sleep(0.5)
+
+    return StreamingResponse(event_gen(), media_type='text/event-stream')
+
+
+@app.get('/threads/{thread_id}/trace')
+def get_thread_trace(thread_id: str, after: int = 0, limit: int = 100):
+    """
+    Agent trace for a thread (nodes, agent steps, tool calls, tasks), oldest
+    first. Poll with after=next_after to receive only new events.
+    """
+    from src.services.trace_store import trace_store
+    page = trace_store.page(thread_id, after=after, limit=max(1, min(limit, 500)))
+    if page is None:
+        raise HTTPException(status_code=404, detail='No trace for this thread')
+    return page
+
+
+@app.get('/metrics/pii')
+def get_pii_metrics():
+    """PII masking mode, plus worker queue depth and batch stats in process mode."""
+    return presidio.metrics()
+
+
+@app.get('/metrics/loop')
+def get_loop_metrics():
+    """Event-loop lag overall and per endpoint (LOOP_LAG_MONITOR=true)."""
+    if loop_monitor is None:
+        raise HTTPException(status_code=404, detail='Loop lag monitor disabled (LOOP_LAG_MONITOR)')
+    return loop_monitor.metrics()
+
+
+@app.delete('/metrics/loop')
+def reset_loop_metrics():
+    if loop_monitor is None:
+        raise HTTPException(status_code=404, detail='Loop lag monitor disabled (LOOP_LAG_MONITOR)')
+    loop_monitor.reset()
+    return {'status': 'reset'}
+
+
 @app.get('/costs/summary')
 def get_cost_summary():
     return cost_tracker.get_summary()
@@ -7,10 +7,27 @@ class ReviewRequest(BaseModel):
     task: str                          # The compliance review task description
     scope: str = 'APAC'               # Geographic scope
     quarter: str = 'Q3 2025'          # Review period
-    thread_id: str = 'default'
+    thread_id: Optional[str] = None    # A new thread (uuid) when omitted
     require_approval: bool = True
 
 
+class BatchReviewItem(BaseModel):
+    scope: str = 'APAC'
+    quarter: str = 'Q3 2025'
+
+
+class BatchReviewRequest(BaseModel):
+    items: List[BatchReviewItem]       # (scope, quarter) pairs; duplicates run once
+    max_concurrency: Optional[int] = None   # Capped by BATCH_REVIEW_CONCURRENCY
+
+
+class BatchReviewResponse(BaseModel):
+    batch_id: str
+    status: str
+    concurrency: int
+    thread_ids: Dict[str, str]         # 'scope | quarter' -> thread_id (for approvals)
+
+
 class AgentStep(BaseModel):
     agent: str                         # Which agent ran
     action: str                        # What it did
@@ -42,6 +59,15 @@ class UploadResponse(BaseModel):
     filename: str
     chunks_indexed: int
     status: str
+    chunks_added: int = 0             # New/changed chunks embedded on this upload
+    chunks_removed: int = 0           # Stale chunks deleted from the index
+    chunks_unchanged: int = 0         # Chunks skipped (already indexed)
+
+
+class BulkUploadResponse(BaseModel):
+    job_id: str
+    files: List[str]                   # Documents accepted into the job
+    status: str
 
 
 class EvaluationResult(BaseModel):
@@ -0,0 +1,174 @@
+"""
+Process pool for Presidio PII masking (PII_MODE=process).
+
+Presidio analysis is CPU-bound, so under concurrency it serialises on the GIL
+when run inline. Here each worker process loads the analyzer once (pool
+initializer) and masks whole batches. Async callers enqueue single texts; a
+dispatcher groups whatever is queued (up to PII_BATCH_SIZE, waiting at most
+PII_BATCH_WAIT_MS for more) into one worker round trip, with at most two
+batches in flight per worker.
+"""
+import asyncio
+import logging
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Optional
+
+logger = logging.getLogger(__name__)
+
+_worker = None   # PresidioService inside a worker process
+
+
+def _init_worker():
+    global _worker
+    from src.security.presidio_service import PresidioService
+    _worker = PresidioService(mode='inline')
+    _worker.warm()
+
+
+def _anonymize_batch(texts: List[str]) -> List[str]:
+    return [_worker.anonymize(text) for text in texts]
+
+
+def _analyze_batch(texts: List[str]) -> list:
+    results = [_worker.analyze(text) for text in texts]
+    for found in results:
+        for r in found:
+            r.analysis_explanation = None      # Recognizer internals: not needed, not worth pickling
+    return results
+
+
+def _ping() -> int:
+    return os.getpid()
+
+
+class PIIWorkerPool:
+    """Pre-started worker processes plus an asyncio batching front end."""
+
+    def __init__(self, workers: int, batch_size: int, batch_wait_ms: int):
+        self.workers = max(1, workers)
+        self.batch_size = max(1, batch_size)
+        self.batch_wait = batch_wait_ms / 1000
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._queue: Optional[asyncio.Queue] = None
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._dispatcher: Optional[asyncio.Task] = None
+        # Metrics
+        self.max_queue_depth = 0
+        self.in_flight_batches = 0
+        self.batches = 0
+        self.texts = 0
+        self.worker_seconds = 0.0
+
+    def executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            with self._lock:
+                if self._executor is None:
+                    # spawn: never fork a process that is running the event loop and threads
+                    self._executor = ProcessPoolExecutor(
+                        max_workers=self.workers,
+                        mp_context=multiprocessing.get_context('spawn'),
+                        initializer=_init_worker,
+                    )
+        return self._executor
+
+    def start(self):
+        """Start every worker and wait until each has loaded its models."""
+        executor = self.executor()
+        pids = {f.result() for f in [executor.submit(_ping) for _ in range(self.workers)]}
+        logger.info(f'PII worker pool ready: {len(pids)} process(es)')
+
+    @property
+    def is_started(self) -> bool:
+        return self._executor is not None
+
+    def anonymize_sync(self, texts: List[str]) -> List[str]:
+        """Blocking call for worker threads; the GIL is released while the pool works."""
+        return self.executor().submit(_anonymize_batch, texts).result()
+
+    def analyze_sync(self, texts: List[str]) -> list:
+        """RecognizerResult lists, detected in a worker (the API process never loads spaCy)."""
+        return self.executor().submit(_analyze_batch, texts).result()
+
+    def shutdown(self):
+        """Stop the dispatcher and the worker processes (app shutdown)."""
+        if self._dispatcher is not None:
+            self._dispatcher.cancel()
+            self._dispatcher = None
+        self._loop = None
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False, cancel_futures=True)
+                self._executor = None
+        logger.info('PII worker pool shut down')
+
+    async def anonymize(self, text: str) -> str:
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            if self._loop is None or self._loop.is_closed():
+                self._bind(loop)
+            else:
+                # A second event loop (e.g. a flow's own loop): skip the shared queue
+                return (await loop.run_in_executor(self.executor(), _anonymize_batch, [text]))[0]
+        future = loop.create_future()
+        self._queue.put_nowait((text, future))
+        self.max_queue_depth = max(self.max_queue_depth, self._queue.qsize())
+        return await future
+
+    def _bind(self, loop: asyncio.AbstractEventLoop):
+        self._loop = loop
+        self._queue = asyncio.Queue()
+        self._slots = asyncio.Semaphore(2 * self.workers)
+        self._dispatcher = loop.create_task(self._dispatch())
+
+    async def _dispatch(self):
+        while True:
+            batch = [await self._queue.get()]
+            deadline = time.monotonic() + self.batch_wait
+            while len(batch) < self.batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), remaining))
+                except asyncio.TimeoutError:
+                    break
+            await self._slots.acquire()      # Backpressure: queue grows, workers don't
+            asyncio.get_running_loop().create_task(self._run_batch(batch))
+
+    async def _run_batch(self, batch: list):
+        self.in_flight_batches += 1
+        start = time.perf_counter()
+        try:
+            results = await asyncio.get_running_loop().run_in_executor(
+                self.executor(), _anonymize_batch, [text for text, _ in batch])
+            for (_, future), masked in zip(batch, results):
+                if not future.done():
+                    future.set_result(masked)
+        except Exception as e:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+        finally:
+            self.in_flight_batches -= 1
+            self.batches += 1
+            self.texts += len(batch)
+            self.worker_seconds += time.perf_counter() - start
+            self._slots.release()
+
+    def metrics(self) -> dict:
+        return {
+            'workers': self.workers,
+            'queue_depth': self._queue.qsize() if self._queue else 0,
+            'max_queue_depth': self.max_queue_depth,
+            'in_flight_batches': self.in_flight_batches,
+            'batches': self.batches,
+            'texts_masked': self.texts,
+            'avg_batch_size': round(self.texts / self.batches, 2) if self.batches else 0.0,
+            'avg_batch_ms': round(1000 * self.worker_seconds / self.batches, 2) if self.batches else 0.0,
+        }
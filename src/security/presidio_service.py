@@ -1,26 +1,35 @@
-from presidio_analyzer import AnalyzerEngine, PatternRecognizer, Pattern
-from presidio_anonymizer import AnonymizerEngine
-from presidio_anonymizer.entities import OperatorConfig
-from typing import List
+from typing import List, Optional
+from src.config import get_settings
+import asyncio
 import logging
 import re
+import threading
 
 logger = logging.getLogger(__name__)
 
+# Hong Kong Identity Card numbers (A123456(7) pattern): (name, regex, score)
+HKID_PATTERNS = [
+    ('HKID', r'[A-Z]{1,2}[0-9]{6}\([0-9A]\)', 0.8),
+    ('HKID_short', r'[A-Z][0-9]{6}', 0.4),
+]
 
-class HKIDRecognizer(PatternRecognizer):
-    """Custom recogniser for Hong Kong Identity Card numbers (A123456(7) pattern)."""
-    PATTERNS = [
-        Pattern('HKID', r'[A-Z]{1,2}[0-9]{6}\([0-9A]\)', 0.8),
-        Pattern('HKID_short', r'[A-Z][0-9]{6}', 0.4),
-    ]
 
-    def __init__(self):
-        super().__init__(supported_entity='HKID', patterns=self.PATTERNS)
+def make_hkid_recognizer():
+    """Custom recogniser for Hong Kong Identity Card numbers."""
+    from presidio_analyzer import PatternRecognizer, Pattern
+    return PatternRecognizer(supported_entity='HKID',
+                             patterns=[Pattern(*p) for p in HKID_PATTERNS])
 
 
 class PresidioService:
-    """PII detection and anonymisation for banking-grade AI pipelines."""
+    """
+    PII detection and anonymisation for banking-grade AI pipelines.
+    The engines (and the spaCy model behind them) load on first use, or
+    up front via warm(); importing this module is cheap.
+    mode 'inline' masks in the calling thread; 'process' sends masking and
+    detection (analyze(), has_pii()) to a pool of worker processes
+    (src/security/pii_workers.py), so the API process never loads spaCy.
+    """
 
     # Entities to detect and mask
     TARGET_ENTITIES = [
@@ -29,16 +38,81 @@ class PresidioService:
         'DATE_TIME', 'URL', 'HKID',
     ]
 
-    def __init__(self):
-        self.analyzer = AnalyzerEngine()
-        self.analyzer.registry.add_recognizer(HKIDRecognizer())
-        self.anonymizer = AnonymizerEngine()
-        logger.info('Presidio PII service initialised')
+    def __init__(self, mode: Optional[str] = None):
+        self.mode = (mode or get_settings().pii_mode).strip().lower()
+        self._analyzer = None
+        self._anonymizer = None
+        self._operators = None
+        self._pool = None
+        self._lock = threading.Lock()
+
+    @property
+    def pool(self):
+        """Worker process pool (process mode), created on first use."""
+        if self._pool is None:
+            with self._lock:
+                if self._pool is None:
+                    from src.security.pii_workers import PIIWorkerPool
+                    settings = get_settings()
+                    self._pool = PIIWorkerPool(settings.pii_workers, settings.pii_batch_size,
+                                               settings.pii_batch_wait_ms)
+        return self._pool
+
+    def warm(self):
+        """Load what masking needs: the worker processes, or the local engines."""
+        if self.mode == 'process':
+            self.pool.start()
+        else:
+            self._load_engines()
+
+    def _load_engines(self):
+        """Load the analyzer (spaCy model) and anonymizer; idempotent and thread-safe."""
+        if self._analyzer is not None:
+            return
+        with self._lock:
+            if self._analyzer is not None:
+                return
+            from presidio_analyzer import AnalyzerEngine
+            from presidio_anonymizer import AnonymizerEngine
+            from presidio_anonymizer.entities import OperatorConfig
+            analyzer = AnalyzerEngine()
+            analyzer.registry.add_recognizer(make_hkid_recognizer())
+            self._anonymizer = AnonymizerEngine()
+            self._operators = {
+                'DEFAULT': OperatorConfig('replace', {'new_value': '<REDACTED>'}),
+                'PERSON': OperatorConfig('replace', {'new_value': '<PERSON>'}),
+                'PHONE_NUMBER': OperatorConfig('replace', {'new_value': '<PHONE_NUMBER>'}),
+                'EMAIL_ADDRESS': OperatorConfig('replace', {'new_value': '<EMAIL_ADDRESS>'}),
+                'CREDIT_CARD': OperatorConfig('replace', {'new_value': '<CREDIT_CARD>'}),
+                'IBAN_CODE': OperatorConfig('replace', {'new_value': '<IBAN_CODE>'}),
+                'HKID': OperatorConfig('replace', {'new_value': '<HKID>'}),
+            }
+            self._analyzer = analyzer              # Set last: marks the service ready
+            logger.info('Presidio PII service initialised')
+
+    @property
+    def is_ready(self) -> bool:
+        if self.mode == 'process':
+            return self._pool is not None and self._pool.is_started
+        return self._analyzer is not None
+
+    @property
+    def analyzer(self):
+        self._load_engines()
+        return self._analyzer
+
+    @property
+    def anonymizer(self):
+        self._load_engines()
+        return self._anonymizer
 
     def analyze(self, text: str) -> list:
         """Detect PII entities in text. Returns list of RecognizerResult."""
+        if self.mode == 'process':
+            return self.pool.analyze_sync([text])[0]
+        analyzer = self.analyzer       # Load failures propagate: never skip masking silently
         try:
-            return self.analyzer.analyze(
+            return analyzer.analyze(
                 text=text,
                 language='en',
                 entities=self.TARGET_ENTITIES,
@@ -53,28 +127,45 @@ class PresidioService:
         Example: 'Contact Li Wei at +852-9876-5432'
               -> 'Contact <PERSON> at <PHONE_NUMBER>'
         """
+        if self.mode == 'process':
+            return self.pool.anonymize_sync([text])[0]
+        results = self.analyze(text)
         try:
-            results = self.analyze(text)
             if not results:
                 return text
             anonymized = self.anonymizer.anonymize(
                 text=text,
                 analyzer_results=results,
-                operators={
-                    'DEFAULT': OperatorConfig('replace', {'new_value': '<REDACTED>'}),
-                    'PERSON': OperatorConfig('replace', {'new_value': '<PERSON>'}),
-                    'PHONE_NUMBER': OperatorConfig('replace', {'new_value': '<PHONE_NUMBER>'}),
-                    'EMAIL_ADDRESS': OperatorConfig('replace', {'new_value': '<EMAIL_ADDRESS>'}),
-                    'CREDIT_CARD': OperatorConfig('replace', {'new_value': '<CREDIT_CARD>'}),
-                    'IBAN_CODE': OperatorConfig('replace', {'new_value': '<IBAN_CODE>'}),
-                    'HKID': OperatorConfig('replace', {'new_value': '<HKID>'}),
-                }
+                operators=self._operators,
             )
             return anonymized.text
         except Exception as e:
             logger.warning(f'Presidio anonymize failed: {e}. Returning original.')
             return text
 
+    async def anonymize_async(self, text: str) -> str:
+        """anonymize() without blocking the event loop (queued and batched in process mode)."""
+        if self.mode == 'process':
+            return await self.pool.anonymize(text)
+        return await asyncio.to_thread(self.anonymize, text)
+
+    async def anonymize_many_async(self, texts: List[str]) -> List[str]:
+        if self.mode == 'process':
+            return list(await asyncio.gather(*(self.pool.anonymize(t) for t in texts)))
+        return await asyncio.to_thread(lambda: [self.anonymize(t) for t in texts])
+
+    def shutdown(self):
+        """Stop the worker processes, if any were started."""
+        if self._pool is not None:
+            self._pool.shutdown()
+
+    def metrics(self) -> dict:
+        """Masking mode and, in process mode, worker queue metrics."""
+        data = {'mode': self.mode, 'ready': self.is_ready}
+        if self.mode == 'process' and self._pool is not None:
+            data.update(self._pool.metrics())
+        return data
+
     def has_pii(self, text: str) -> bool:
         """Quick check: does this text contain any PII? Used for audit logging."""
         return len(self.analyze(text)) > 0
@@ -87,5 +178,5 @@ class PresidioService:
         return dict(counts)
 
 
-# Module-level singleton — initialised once, reused across requests
+# Module-level singleton — engines load on first use (or warm()), reused across requests
 presidio = PresidioService()
@@ -0,0 +1,134 @@
+"""
+Batch reviews: the same full review over many (scope, quarter) pairs, as
+at quarter end.
+
+Items run through the supervisor graph with at most `concurrency` in
+flight. Members of a batch share work through the process-wide caches
+(retrieval results, embeddings, per-finding tool calls and task outputs),
+so overlapping reviews, such as an APAC fan-out and a Hong Kong review of
+the same quarter, retrieve and score each finding once. Duplicate pairs
+run once.
+"""
+import asyncio
+import logging
+import time
+import uuid
+from dataclasses import dataclass, field, asdict
+from typing import Dict, List, Optional, Tuple
+from src.config import get_settings
+from src.supervisor.state import new_review_state
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class BatchItem:
+    scope: str
+    quarter: str
+    thread_id: str
+    status: str = 'queued'             # queued / running / completed / awaiting_approval / failed
+    report: str = ''
+    requires_human_approval: bool = False
+    total_cost_usd: float = 0.0
+    total_tokens: int = 0
+    steps: List[str] = field(default_factory=list)
+    error: str = ''
+    duration_seconds: float = 0.0
+
+
+@dataclass
+class BatchJob:
+    batch_id: str
+    items: List[BatchItem]
+    concurrency: int
+    status: str = 'queued'             # queued / running / completed
+    started_at: float = field(default_factory=time.time)
+    finished_at: Optional[float] = None
+
+    def snapshot(self) -> dict:
+        end = self.finished_at or time.time()
+        counts: Dict[str, int] = {}
+        for item in self.items:
+            counts[item.status] = counts.get(item.status, 0) + 1
+        return {
+            'batch_id': self.batch_id,
+            'status': self.status,
+            'concurrency': self.concurrency,
+            'items': [asdict(item) for item in self.items],
+            'item_counts': counts,
+            'total_cost_usd': round(sum(i.total_cost_usd for i in self.items), 6),
+            'total_tokens': sum(i.total_tokens for i in self.items),
+            'elapsed_seconds': round(end - self.started_at, 2),
+        }
+
+
+# In-process batch registry (batch_id -> BatchJob)
+batches: Dict[str, BatchJob] = {}
+
+
+def _prune_batches():
+    ttl = get_settings().batch_ttl_seconds
+    now = time.time()
+    for batch_id, job in list(batches.items()):
+        if job.finished_at and now - job.finished_at > ttl:
+            batches.pop(batch_id, None)
+
+
+def create_batch(pairs: List[Tuple[str, str]], max_concurrency: Optional[int] = None) -> BatchJob:
+    _prune_batches()
+    settings = get_settings()
+    limit = min(settings.batch_review_concurrency, settings.crew_review_workers)
+    batch_id = str(uuid.uuid4())
+    unique = list(dict.fromkeys((scope.strip(), quarter.strip()) for scope, quarter in pairs))
+    job = BatchJob(
+        batch_id=batch_id,
+        items=[BatchItem(scope=scope, quarter=quarter, thread_id=f'{batch_id}-{i}')
+               for i, (scope, quarter) in enumerate(unique)],
+        concurrency=max(1, min(max_concurrency or limit, limit)),
+    )
+    batches[batch_id] = job
+    return job
+
+
+async def _run_item(item: BatchItem, semaphore: asyncio.Semaphore):
+    from src.supervisor.graph import get_supervisor_graph
+    from src.security.guardrails_client import guardrails
+    async with semaphore:
+        item.status = 'running'
+        start = time.time()
+        try:
+            state = new_review_state(
+                f'Full compliance review for {item.scope}, {item.quarter}',
+                item.scope, item.quarter, item.thread_id, task_type='full_review')
+            config = {'configurable': {'thread_id': item.thread_id}}
+            result = await asyncio.to_thread(get_supervisor_graph().invoke, state, config)
+            report = result.get('final_report') or result.get('crew_report', '')
+            guard_out = await guardrails.validate_output(report)
+            item.report = guard_out.get('response', report)
+            item.requires_human_approval = result.get('needs_human_approval', False)
+            item.total_cost_usd = result.get('total_cost_usd', 0.0)
+            item.total_tokens = result.get('total_tokens', 0)
+            item.steps = result.get('steps_taken', [])
+            # Escalated items wait at the approval gate; resume via /supervisor/approve
+            item.status = ('awaiting_approval' if item.requires_human_approval
+                           and not result.get('final_report') else 'completed')
+        except Exception as e:
+            logger.error(f'Batch review {item.scope} {item.quarter} failed: {e}')
+            item.status = 'failed'
+            item.error = str(e)
+        finally:
+            item.duration_seconds = round(time.time() - start, 2)
+
+
+async def run_batch(job: BatchJob):
+    """Run every item of the batch, at most job.concurrency at a time."""
+    job.status = 'running'
+    semaphore = asyncio.Semaphore(job.concurrency)
+    try:
+        await asyncio.gather(*(_run_item(item, semaphore) for item in job.items))
+    finally:
+        job.status = 'completed'
+        job.finished_at = time.time()
+        snap = job.snapshot()
+        logger.info(f'Batch review {job.batch_id} finished: {snap["item_counts"]}, '
+                    f'${snap["total_cost_usd"]:.4f}, {snap["elapsed_seconds"]}s')
@@ -0,0 +1,129 @@
+"""
+Collection profile for the audit collection: quantization, on-disk vectors
+and HNSW tuning, driven by the qdrant_* settings.
+
+Migrate an existing collection to the configured profile with:
+    python -m src.services.collection_profile --migrate
+"""
+from qdrant_client import QdrantClient
+from qdrant_client.models import (
+    Distance, VectorParams, VectorParamsDiff, HnswConfigDiff, SearchParams,
+    QuantizationSearchParams, ScalarQuantization, ScalarQuantizationConfig,
+    ScalarType, BinaryQuantization, BinaryQuantizationConfig, Disabled,
+)
+from typing import Optional
+from src.config import get_settings, get_qdrant_client
+import argparse
+import json
+import logging
+
+logger = logging.getLogger(__name__)
+
+VECTOR_SIZE = 1536             # text-embedding-3-small
+QUANTIZATION_MODES = ('none', 'scalar', 'binary')
+
+
+def _mode() -> str:
+    mode = get_settings().qdrant_quantization.lower()
+    if mode not in QUANTIZATION_MODES:
+        raise ValueError(f'qdrant_quantization must be one of {QUANTIZATION_MODES}, got {mode!r}')
+    return mode
+
+
+def vectors_config() -> VectorParams:
+    settings = get_settings()
+    return VectorParams(size=VECTOR_SIZE, distance=Distance.COSINE,
+                        on_disk=settings.qdrant_on_disk_vectors)
+
+
+def hnsw_config() -> HnswConfigDiff:
+    settings = get_settings()
+    return HnswConfigDiff(m=settings.qdrant_hnsw_m,
+                          ef_construct=settings.qdrant_hnsw_ef_construct)
+
+
+def quantization_config():
+    """Quantization config for the configured mode (None when disabled)."""
+    settings = get_settings()
+    mode = _mode()
+    if mode == 'scalar':
+        return ScalarQuantization(scalar=ScalarQuantizationConfig(
+            type=ScalarType.INT8, quantile=0.99,
+            always_ram=settings.qdrant_quantization_always_ram))
+    if mode == 'binary':
+        return BinaryQuantization(binary=BinaryQuantizationConfig(
+            always_ram=settings.qdrant_quantization_always_ram))
+    return None
+
+
+def search_params() -> SearchParams:
+    """Search-time params: HNSW ef, plus rescoring/oversampling when quantized."""
+    settings = get_settings()
+    quantization = None
+    if _mode() != 'none':
+        quantization = QuantizationSearchParams(
+            rescore=settings.qdrant_rescore, oversampling=settings.qdrant_oversampling)
+    return SearchParams(hnsw_ef=settings.qdrant_search_ef, quantization=quantization)
+
+
+def create_collection(client: QdrantClient, collection_name: str):
+    client.create_collection(
+        collection_name=collection_name,
+        vectors_config=vectors_config(),
+        hnsw_config=hnsw_config(),
+        quantization_config=quantization_config(),
+    )
+
+
+def migrate_collection(client: Optional[QdrantClient] = None,
+                       collection_name: Optional[str] = None):
+    """
+    Apply the configured profile to an existing collection in place.
+    Qdrant rebuilds indexes/quantized vectors in the background; points and
+    payloads are untouched.
+    """
+    client = client or get_qdrant_client()
+    collection_name = collection_name or get_settings().qdrant_collection
+    client.update_collection(
+        collection_name=collection_name,
+        vectors_config={'': VectorParamsDiff(on_disk=get_settings().qdrant_on_disk_vectors)},
+        hnsw_config=hnsw_config(),
+        quantization_config=quantization_config() or Disabled.DISABLED,
+    )
+    logger.info(f'Collection {collection_name} migrated to profile: {describe_profile()}')
+
+
+def describe_profile() -> dict:
+    settings = get_settings()
+    return {
+        'quantization': _mode(),
+        'on_disk_vectors': settings.qdrant_on_disk_vectors,
+        'hnsw_m': settings.qdrant_hnsw_m,
+        'hnsw_ef_construct': settings.qdrant_hnsw_ef_construct,
+        'search_ef': settings.qdrant_search_ef,
+        'rescore': settings.qdrant_rescore,
+        'oversampling': settings.qdrant_oversampling,
+    }
+
+
+def estimate_ram_bytes(points: int, quantization: str = 'none', on_disk: bool = False,
+                       m: int = 16, dim: int = VECTOR_SIZE) -> int:
+    """
+    Rough resident-memory estimate: float32 originals (unless on disk),
+    quantized copies, and the HNSW level-0 link lists (2*m links x 4 bytes).
+    """
+    originals = 0 if on_disk else points * dim * 4
+    quantized = {'none': 0, 'scalar': points * dim, 'binary': points * dim // 8}[quantization]
+    graph = points * m * 2 * 4
+    return originals + quantized + graph
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Audit collection profile')
+    parser.add_argument('--migrate', action='store_true',
+                        help='Apply the configured profile to the existing collection')
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+    if args.migrate:
+        migrate_collection()
+    print(json.dumps(describe_profile(), indent=2))
@@ -0,0 +1,94 @@
+"""
+Token-budgeted context packing for RAG prompts.
+
+Chunks are taken in score order and packed sentence-by-sentence until the
+budget is spent, so prompts never end mid-sentence and low-relevance text
+is what gets dropped.
+"""
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import List, Optional, Tuple
+import re
+import tiktoken
+from src.config import get_settings, resolve_model
+from src.services.diversify import RetrievedChunk
+
+SECTION_OVERHEAD_TOKENS = 12   # Per-chunk header the caller adds ('[1] source (score: ...)')
+_SENTENCE_END = re.compile(r'(?:[.!?](?=\s)|\n)\s*')
+
+
+@dataclass
+class PackedContext:
+    sections: List[Tuple[RetrievedChunk, str]] = field(default_factory=list)
+    budget_tokens: int = 0
+    tokens_used: int = 0               # Packed text plus per-section overhead
+    tokens_packed: int = 0             # Packed text only
+    tokens_candidate: int = 0          # Tokens in all candidate chunks
+
+    @property
+    def tokens_saved(self) -> int:
+        return max(self.tokens_candidate - self.tokens_packed, 0)
+
+    def summary(self) -> str:
+        return (f'{self.tokens_used}/{self.budget_tokens} context tokens, '
+                f'{self.tokens_saved} saved, {len(self.sections)} chunks')
+
+
+def current_model_name(route: Optional[str] = None) -> str:
+    """Model serving a route (see MODEL_ROUTES); the default tier's model without one."""
+    return resolve_model(route)[2]
+
+
+def context_budget(model: Optional[str] = None) -> int:
+    """Context token budget for a model (rag_context_tokens_by_model, else the default)."""
+    settings = get_settings()
+    model = model or current_model_name()
+    return settings.rag_context_tokens_by_model.get(model, settings.rag_context_tokens)
+
+
+@lru_cache(maxsize=8)
+def _encoding(model: str):
+    try:
+        return tiktoken.encoding_for_model(model)
+    except KeyError:
+        return tiktoken.get_encoding('cl100k_base')   # Non-OpenAI models: close enough
+
+
+def count_tokens(text: str, model: Optional[str] = None) -> int:
+    return len(_encoding(model or current_model_name()).encode(text))
+
+
+def split_sentences(text: str) -> List[str]:
+    """Split into sentences/lines, keeping trailing whitespace so joins preserve layout."""
+    pieces, start = [], 0
+    for match in _SENTENCE_END.finditer(text):
+        pieces.append(text[start:match.end()])
+        start = match.end()
+    pieces.append(text[start:])
+    return [p for p in pieces if p.strip()]
+
+
+def pack_context(chunks: List[RetrievedChunk], budget_tokens: Optional[int] = None,
+                 model: Optional[str] = None) -> PackedContext:
+    """
+    Fit the highest-scoring chunks into budget_tokens. Each chunk contributes
+    its leading whole sentences that still fit; chunks whose first sentence
+    does not fit are skipped in favour of later (shorter) ones.
+    """
+    budget = context_budget(model) if budget_tokens is None else budget_tokens
+    packed = PackedContext(budget_tokens=budget)
+    for chunk in sorted(chunks, key=lambda c: c.score, reverse=True):
+        packed.tokens_candidate += count_tokens(chunk.text, model)
+        remaining = budget - packed.tokens_used - SECTION_OVERHEAD_TOKENS
+        kept, used = [], 0
+        for sentence in split_sentences(chunk.text):
+            cost = count_tokens(sentence, model)
+            if used + cost > remaining:
+                break
+            kept.append(sentence)
+            used += cost
+        if kept:
+            packed.sections.append((chunk, ''.join(kept).strip()))
+            packed.tokens_packed += used
+            packed.tokens_used += used + SECTION_OVERHEAD_TOKENS
+    return packed
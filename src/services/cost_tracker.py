@@ -1,13 +1,28 @@
 import logging
+import threading
+import time
+from collections import deque
 from dataclasses import dataclass, field
-from typing import Dict, List
+from typing import Deque, Dict, List, Optional
 from datetime import datetime
+from langchain_core.callbacks import BaseCallbackHandler
+from src.config import get_settings
 
 logger = logging.getLogger(__name__)
 
-# OpenAI pricing (gpt-4o-mini, per 1M tokens)
+# OpenAI pricing (gpt-4o-mini, per 1K tokens); other models: MODEL_PRICING
 COST_PER_1K_INPUT = 0.000150
 COST_PER_1K_OUTPUT = 0.000600
+LATENCY_SAMPLES = 1000                     # Per tier, for p50/p95
+
+
+def estimate_cost(input_tokens: int, output_tokens: int, model: Optional[str] = None) -> float:
+    price_in, price_out = COST_PER_1K_INPUT, COST_PER_1K_OUTPUT
+    if model:
+        pricing = get_settings().model_pricing
+        price_in, price_out = pricing.get(model.split('/', 1)[-1], (price_in, price_out))
+    return (input_tokens * price_in / 1000
+            + output_tokens * price_out / 1000)
 
 
 @dataclass
@@ -17,36 +32,123 @@ class RequestCost:
     input_tokens: int
     output_tokens: int
     cost_usd: float
+    model: str = ''
+    tier: str = ''
+    latency_ms: float = 0.0
     timestamp: str = field(default_factory=lambda: datetime.now().isoformat())
 
 
+@dataclass
+class TierUsage:
+    model: str
+    calls: int = 0
+    input_tokens: int = 0
+    output_tokens: int = 0
+    cost_usd: float = 0.0
+    latencies_ms: Deque[float] = field(default_factory=lambda: deque(maxlen=LATENCY_SAMPLES))
+
+    def summary(self) -> dict:
+        latencies = sorted(self.latencies_ms)
+        pct = (lambda q: round(latencies[min(int(q * len(latencies)), len(latencies) - 1)], 1)
+               if latencies else 0.0)
+        return {
+            'model': self.model, 'calls': self.calls,
+            'input_tokens': self.input_tokens, 'output_tokens': self.output_tokens,
+            'cost_usd': round(self.cost_usd, 6),
+            'latency_p50_ms': pct(0.5), 'latency_p95_ms': pct(0.95),
+        }
+
+
 class CostTracker:
-    """Tracks per-agent, per-request token usage and cost."""
+    """Tracks per-agent and per-model-tier token usage, cost and latency."""
 
     def __init__(self):
         self._records: List[RequestCost] = []
+        self._tiers: Dict[str, TierUsage] = {}
+        self._lock = threading.Lock()
 
     def record(self, thread_id: str, agent_name: str,
-                input_tokens: int, output_tokens: int) -> float:
-        cost = (input_tokens * COST_PER_1K_INPUT / 1000
-                + output_tokens * COST_PER_1K_OUTPUT / 1000)
-        self._records.append(RequestCost(
-            thread_id=thread_id, agent_name=agent_name,
-            input_tokens=input_tokens, output_tokens=output_tokens, cost_usd=cost
-        ))
+                input_tokens: int, output_tokens: int, model: Optional[str] = None,
+                tier: str = '', latency_ms: Optional[float] = None, calls: int = 1) -> float:
+        """Record calls LLM calls' usage; latency_ms (per call) is None when not measured."""
+        cost = estimate_cost(input_tokens, output_tokens, model)
+        with self._lock:
+            self._records.append(RequestCost(
+                thread_id=thread_id, agent_name=agent_name,
+                input_tokens=input_tokens, output_tokens=output_tokens, cost_usd=cost,
+                model=model or '', tier=tier, latency_ms=round(latency_ms or 0.0, 1)
+            ))
+            if tier:
+                usage = self._tiers.setdefault(tier, TierUsage(model=model or ''))
+                usage.calls += calls
+                usage.input_tokens += input_tokens
+                usage.output_tokens += output_tokens
+                usage.cost_usd += cost
+                if latency_ms is not None:
+                    usage.latencies_ms.append(latency_ms)
         return cost
 
     def get_summary(self) -> dict:
-        total_cost = sum(r.cost_usd for r in self._records)
+        with self._lock:
+            records = list(self._records)
+            tiers = {k: v.summary() for k, v in self._tiers.items()}
+        total_cost = sum(r.cost_usd for r in records)
         by_agent: Dict[str, float] = {}
-        for r in self._records:
+        for r in records:
             by_agent[r.agent_name] = by_agent.get(r.agent_name, 0) + r.cost_usd
         return {
             'total_cost_usd': round(total_cost, 6),
-            'total_requests': len(self._records),
+            'total_requests': len(records),
             'cost_by_agent': {k: round(v, 6) for k, v in by_agent.items()},
-            'records': [r.__dict__ for r in self._records[-20:]],  # Last 20
+            'cost_by_tier': tiers,
+            'records': [r.__dict__ for r in records[-20:]],  # Last 20
         }
 
     def reset(self):
-        self._records.clear()
+        with self._lock:
+            self._records.clear()
+            self._tiers.clear()
+
+
+def _usage_tokens(response) -> tuple:
+    """(input, output) tokens of a LangChain LLMResult, from usage_metadata or llm_output."""
+    for generations in response.generations:
+        for generation in generations:
+            usage = getattr(getattr(generation, 'message', None), 'usage_metadata', None)
+            if usage:
+                return usage.get('input_tokens', 0), usage.get('output_tokens', 0)
+    usage = (response.llm_output or {}).get('token_usage') or {}
+    return usage.get('prompt_tokens', 0), usage.get('completion_tokens', 0)
+
+
+class TierUsageCallback(BaseCallbackHandler):
+    """Attached by get_llm(): records each call's tokens, cost and latency under its tier."""
+
+    def __init__(self, route: str, tier: str, model: str):
+        self.route = route
+        self.tier = tier
+        self.model = model
+        self._started: Dict = {}
+
+    def on_chat_model_start(self, serialized, messages, *, run_id, **kwargs):
+        self._started[run_id] = time.perf_counter()
+
+    def on_llm_start(self, serialized, prompts, *, run_id, **kwargs):
+        self._started[run_id] = time.perf_counter()
+
+    def on_llm_end(self, response, *, run_id, **kwargs):
+        started = self._started.pop(run_id, None)
+        latency_ms = (time.perf_counter() - started) * 1000 if started else 0.0
+        try:
+            input_tokens, output_tokens = _usage_tokens(response)
+            cost_tracker.record('', self.route, input_tokens, output_tokens, model=self.model,
+                                tier=self.tier, latency_ms=latency_ms)
+        except Exception as e:             # Accounting must never fail a call
+            logger.debug(f'Cost tracking failed for {self.route}: {e}')
+
+    def on_llm_error(self, error, *, run_id, **kwargs):
+        self._started.pop(run_id, None)
+
+
+# Module-level singleton: the API's /costs endpoints and every LLM caller share it
+cost_tracker = CostTracker()
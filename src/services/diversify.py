@@ -0,0 +1,99 @@
+"""
+Post-retrieval diversification: maximal-marginal-relevance selection over
+candidate vectors, and merging of overlapping adjacent chunks.
+Pure NumPy — no Qdrant or LLM dependencies.
+"""
+from dataclasses import dataclass
+from typing import List
+import numpy as np
+
+MIN_OVERLAP_CHARS = 20         # Shorter suffix/prefix matches are coincidence
+
+
+@dataclass
+class RetrievedChunk:
+    text: str
+    source: str
+    score: float
+    page: int = 0
+    chunk_index: int = -1      # -1 = position unknown (never merged)
+
+
+def _normalise(m: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(m, axis=-1, keepdims=True)
+    return m / np.where(norms == 0, 1, norms)
+
+
+def mmr_select(query: np.ndarray, candidates: np.ndarray, k: int,
+               lambda_mult: float = 0.7) -> List[int]:
+    """
+    Pick k candidate indices maximising
+        lambda * sim(query, c) - (1 - lambda) * max sim(c, already selected)
+    The candidate-candidate similarity matrix is computed once; each step
+    is a vectorised update of the running max-redundancy vector.
+    """
+    n = len(candidates)
+    if n == 0 or k <= 0:
+        return []
+    cand = _normalise(np.asarray(candidates, dtype=np.float32))
+    relevance = cand @ _normalise(np.asarray(query, dtype=np.float32))
+    pairwise = cand @ cand.T
+    redundancy = np.full(n, -np.inf, dtype=np.float32)
+    available = np.ones(n, dtype=bool)
+    selected: List[int] = []
+    for _ in range(min(k, n)):
+        scores = lambda_mult * relevance - (1 - lambda_mult) * np.where(
+            np.isinf(redundancy), 0, redundancy)
+        scores[~available] = -np.inf
+        best = int(np.argmax(scores))
+        selected.append(best)
+        available[best] = False
+        redundancy = np.maximum(redundancy, pairwise[best])
+    return selected
+
+
+def overlap_length(left: str, right: str, max_overlap: int = 400) -> int:
+    """Length of the longest suffix of left that is also a prefix of right."""
+    for size in range(min(len(left), len(right), max_overlap), MIN_OVERLAP_CHARS - 1, -1):
+        if left.endswith(right[:size]):
+            return size
+    return 0
+
+
+def merge_adjacent(chunks: List[RetrievedChunk]) -> List[RetrievedChunk]:
+    """
+    Merge selected chunks that are consecutive in the same source page,
+    stripping the splitter overlap so shared text appears once. Exact
+    duplicate texts are dropped. Rank order of first appearance is kept.
+    """
+    unique, seen = [], set()
+    for chunk in chunks:
+        if chunk.text not in seen:
+            seen.add(chunk.text)
+            unique.append(chunk)
+    position = {(c.source, c.page, c.chunk_index): c for c in unique if c.chunk_index >= 0}
+
+    merged, absorbed = [], set()
+    for chunk in unique:
+        if id(chunk) in absorbed:
+            continue
+        if chunk.chunk_index < 0:
+            merged.append(chunk)
+            continue
+        start = chunk.chunk_index
+        while (chunk.source, chunk.page, start - 1) in position:
+            start -= 1
+        run, idx = [], start
+        while (chunk.source, chunk.page, idx) in position:
+            run.append(position[(chunk.source, chunk.page, idx)])
+            idx += 1
+        text = run[0].text
+        for nxt in run[1:]:
+            shared = overlap_length(text, nxt.text)
+            text += nxt.text[shared:] if shared else '\n' + nxt.text
+        absorbed.update(id(c) for c in run)
+        merged.append(RetrievedChunk(
+            text=text, source=chunk.source, score=max(c.score for c in run),
+            page=chunk.page, chunk_index=start,
+        ))
+    return merged
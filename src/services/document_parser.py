@@ -0,0 +1,130 @@
+"""
+Document parsing and chunking. Kept free of Presidio, Qdrant and embedding
+imports so it can run cheaply inside ingestion worker processes.
+"""
+from langchain_community.document_loaders import PyPDFLoader
+from langchain_core.documents import Document
+from langchain_text_splitters import RecursiveCharacterTextSplitter
+from typing import Iterator, List, Optional
+import hashlib
+import re
+import uuid
+
+# Fixed namespace so the same (source, content) always maps to the same point ID
+CHUNK_ID_NAMESPACE = uuid.UUID('6f1c2b9e-8a4d-4e0f-9c3b-2d7a5e1f8b60')
+
+TEXT_PAGE_CHARS = 8000         # Pseudo-page size when streaming .txt files
+
+# Region codes stored in the 'region' payload; APAC = cross-jurisdiction document
+REGION_KEYWORDS = {
+    'HK': ('hong kong', 'hkma', 'hk'),
+    'SG': ('singapore', 'mas', 'sg'),
+    'JP': ('japan', 'tokyo', 'jfsa', 'jp'),
+}
+
+
+def _keyword_pattern(words) -> re.Pattern:
+    # Whole words only ('_' and '-' separate words too): 'mas' must not match 'christmas'
+    return re.compile(r'(?<![a-z0-9])(?:' + '|'.join(map(re.escape, words)) + r')(?![a-z0-9])')
+
+
+REGION_PATTERNS = {code: _keyword_pattern(words) for code, words in REGION_KEYWORDS.items()}
+APAC_PATTERN = _keyword_pattern(['apac'])
+QUARTER_PATTERN = re.compile(r'(?<![a-z0-9])q([1-4])[\s_-]*(20\d{2})(?!\d)', re.IGNORECASE)
+HEADER_CHARS = 1000            # How much of the first page to scan for metadata
+
+
+def content_hash(text: str) -> str:
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+
+def chunk_point_id(source: str, text: str) -> str:
+    """Deterministic point ID: re-uploading identical content upserts in place."""
+    return str(uuid.uuid5(CHUNK_ID_NAMESPACE, f'{source}:{content_hash(text)}'))
+
+
+def extract_document_metadata(filename: str, first_page: str) -> dict:
+    """
+    Derive region and quarter for a document from its filename, falling back
+    to the header of its first page. Unknown values are None.
+    Example: 'hk_audit_q3_2025.txt' -> {'region': 'HK', 'quarter': 'Q3 2025'}
+    """
+    name = filename.lower()
+    header = first_page[:HEADER_CHARS].lower()
+    region = None
+    for text in (name, header):
+        if APAC_PATTERN.search(text):
+            region = 'APAC'
+            break
+        found = [code for code, pattern in REGION_PATTERNS.items() if pattern.search(text)]
+        if found:
+            region = found[0] if len(found) == 1 else 'APAC'
+            break
+    quarter = None
+    for text in (filename, first_page[:HEADER_CHARS]):
+        match = QUARTER_PATTERN.search(text)
+        if match:
+            quarter = f'Q{match.group(1)} {match.group(2)}'
+            break
+    return {'region': region, 'quarter': quarter}
+
+
+def iter_text_pages(file_path: str, page_chars: int = TEXT_PAGE_CHARS) -> Iterator[Document]:
+    """
+    Stream a text file as pseudo-pages of roughly page_chars characters,
+    breaking on paragraph boundaries so only one page is held in memory.
+    (PyPDFLoader cannot read plain text files.)
+    """
+    buffer: List[str] = []
+    size, page = 0, 0
+    with open(file_path, encoding='utf-8', errors='replace') as f:
+        for line in f:
+            buffer.append(line)
+            size += len(line)
+            # Prefer paragraph breaks; force a break if none shows up in time
+            if size >= page_chars and (not line.strip() or size >= 2 * page_chars):
+                yield Document(page_content=''.join(buffer), metadata={'page': page})
+                buffer, size, page = [], 0, page + 1
+    if buffer:
+        yield Document(page_content=''.join(buffer), metadata={'page': page})
+
+
+def iter_pages(file_path: str) -> Iterator[Document]:
+    """Lazily yield pages: PDFs page-by-page, TXT via the streaming text reader."""
+    if file_path.lower().endswith('.txt'):
+        return iter_text_pages(file_path)
+    return PyPDFLoader(file_path).lazy_load()
+
+
+def iter_chunks(file_path: str, filename: str) -> Iterator[tuple]:
+    """
+    Split pages as they are parsed and yield (point_id, chunk).
+    chunk_index counts within a page, so an edit only shifts its own page.
+    Region/quarter metadata is taken from the filename and first page.
+    """
+    splitter = RecursiveCharacterTextSplitter(chunk_size=800, chunk_overlap=100)
+    doc_meta: Optional[dict] = None
+    for page_doc in iter_pages(file_path):
+        if doc_meta is None:
+            doc_meta = extract_document_metadata(filename, page_doc.page_content)
+        page = page_doc.metadata.get('page', 0)
+        for i, chunk in enumerate(splitter.split_documents([page_doc])):
+            chunk.metadata.update(doc_meta)
+            chunk.metadata['source'] = filename
+            chunk.metadata['page'] = page
+            chunk.metadata['chunk_index'] = i
+            yield chunk_point_id(filename, chunk.page_content), chunk
+
+
+def parse_document(file_path: str, filename: str) -> List[tuple]:
+    """
+    Parse and split a whole document, returning picklable
+    (point_id, page_content, metadata) tuples with in-document duplicates
+    dropped. Used by the bulk pipeline's process pool.
+    """
+    seen, out = set(), []
+    for point_id, chunk in iter_chunks(file_path, filename):
+        if point_id not in seen:
+            seen.add(point_id)
+            out.append((point_id, chunk.page_content, chunk.metadata))
+    return out
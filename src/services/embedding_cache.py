@@ -0,0 +1,94 @@
+"""
+In-process LRU cache in front of the embedding client.
+
+get_embeddings() returns one shared CachedEmbeddings, so text embedded once
+(repeated agent queries, re-ingested chunks, crew memory look-ups) is not
+sent to the embedding API again. Vectors are held as float32 arrays, about
+6 KB each at 1536 dimensions.
+"""
+from collections import OrderedDict
+from typing import Dict, List, Tuple
+from langchain_core.embeddings import Embeddings
+import hashlib
+import threading
+import numpy as np
+
+
+class CachedEmbeddings(Embeddings):
+    """Wraps an Embeddings client; query and document vectors are cached separately."""
+
+    def __init__(self, underlying: Embeddings, model: str, max_entries: int = 10000):
+        self.underlying = underlying
+        self.model = model
+        self.max_entries = max_entries
+        self._cache: 'OrderedDict[str, np.ndarray]' = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def _key(self, kind: str, text: str) -> str:
+        return hashlib.sha256(f'{self.model}\0{kind}\0{text}'.encode('utf-8')).hexdigest()
+
+    def _lookup(self, keys: List[str]) -> Dict[str, np.ndarray]:
+        found = {}
+        with self._lock:
+            for key in keys:
+                if key in self._cache:
+                    self._cache.move_to_end(key)
+                    found[key] = self._cache[key]
+            self.hits += len(found)
+            self.misses += len(set(keys)) - len(found)
+        return found
+
+    def _store(self, items: List[Tuple[str, List[float]]]):
+        with self._lock:
+            for key, vector in items:
+                self._cache[key] = np.asarray(vector, dtype=np.float32)
+                self._cache.move_to_end(key)
+            while len(self._cache) > self.max_entries:
+                self._cache.popitem(last=False)
+
+    def _missing(self, texts: List[str]) -> Tuple[List[str], Dict[str, np.ndarray], List[str]]:
+        keys = [self._key('doc', t) for t in texts]
+        found = self._lookup(keys)
+        todo = list(dict.fromkeys(t for t, k in zip(texts, keys) if k not in found))
+        return keys, found, todo
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        keys, found, todo = self._missing(texts)
+        if todo:
+            fresh = [(self._key('doc', t), v) for t, v in zip(todo, self.underlying.embed_documents(todo))]
+            self._store(fresh)
+            found.update((k, np.asarray(v, dtype=np.float32)) for k, v in fresh)
+        return [found[k].tolist() for k in keys]
+
+    async def aembed_documents(self, texts: List[str]) -> List[List[float]]:
+        keys, found, todo = self._missing(texts)
+        if todo:
+            vectors = await self.underlying.aembed_documents(todo)
+            fresh = [(self._key('doc', t), v) for t, v in zip(todo, vectors)]
+            self._store(fresh)
+            found.update((k, np.asarray(v, dtype=np.float32)) for k, v in fresh)
+        return [found[k].tolist() for k in keys]
+
+    def embed_query(self, text: str) -> List[float]:
+        key = self._key('query', text)
+        hit = self._lookup([key]).get(key)
+        if hit is not None:
+            return hit.tolist()
+        vector = self.underlying.embed_query(text)
+        self._store([(key, vector)])
+        return np.asarray(vector, dtype=np.float32).tolist()
+
+    async def aembed_query(self, text: str) -> List[float]:
+        key = self._key('query', text)
+        hit = self._lookup([key]).get(key)
+        if hit is not None:
+            return hit.tolist()
+        vector = await self.underlying.aembed_query(text)
+        self._store([(key, vector)])
+        return np.asarray(vector, dtype=np.float32).tolist()
+
+    def stats(self) -> dict:
+        return {'entries': len(self._cache), 'max_entries': self.max_entries,
+                'hits': self.hits, 'misses': self.misses}
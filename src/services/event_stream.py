@@ -0,0 +1,184 @@
+"""
+Resumable supervisor event streams (/supervisor/stream).
+
+A review runs on a bounded worker pool (STREAM_WORKERS), independent of any
+HTTP connection; runs beyond the pool size queue with status 'running'. It
+records delta-encoded events into a per-thread buffer:
+
+    step      {'node', 'steps'}        steps_taken entries added by the node
+    report    {'append'} / {'replace'} final_report text since the last event
+    state     {'needs_approval', 'requires_escalation'} when either changes
+    snapshot  the full accumulated state (sent on resume if the buffer has
+              already dropped events the client missed)
+    done      {'status', 'error'}
+
+Events carry increasing ids per thread. Clients reconnect with Last-Event-ID
+and receive only what they missed; nothing is re-run. Heartbeat events (no
+id) keep idle connections open through proxies during long crew runs.
+"""
+import asyncio
+import json
+import logging
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import AsyncIterator, Deque, Dict, Optional, Tuple
+from src.config import get_settings
+
+logger = logging.getLogger(__name__)
+
+
+class ThreadEventLog:
+    """Append-only, size-bounded event buffer for one thread's run."""
+
+    def __init__(self, thread_id: str, loop: asyncio.AbstractEventLoop, first_id: int = 1):
+        self.thread_id = thread_id
+        self.events: Deque[Tuple[int, str, str]] = deque(maxlen=get_settings().stream_buffer_events)
+        self.next_id = first_id
+        self.steps: list = []
+        self.report = ''
+        self.flags = {'needs_approval': False, 'requires_escalation': False}
+        self.status = 'running'            # running / completed / awaiting_approval / failed
+        self.finished_at: Optional[float] = None
+        # Reentrant: record_update/finish hold it across their own append() calls
+        self._lock = threading.RLock()
+        self._loop = loop
+        self._changed = asyncio.Event()
+
+    @property
+    def done(self) -> bool:
+        return self.status != 'running'
+
+    @property
+    def last_id(self) -> int:
+        return self.next_id - 1
+
+    def append(self, event: str, data: dict):
+        """Record an event (from any thread) and wake the connected streams."""
+        with self._lock:
+            self.events.append((self.next_id, event, json.dumps(data)))
+            self.next_id += 1
+        self._loop.call_soon_threadsafe(self._notify)
+
+    def _notify(self):
+        changed, self._changed = self._changed, asyncio.Event()
+        changed.set()
+
+    def since(self, last_id: int) -> Tuple[bool, list]:
+        """(gap, events after last_id); gap means older events were already dropped."""
+        with self._lock:
+            events = [e for e in self.events if e[0] > last_id]
+            gap = bool(self.events) and self.events[0][0] > last_id + 1 and last_id < self.last_id
+        return gap, events
+
+    def snapshot(self) -> dict:
+        """Copy of the accumulated state, consistent with the events recorded so far."""
+        with self._lock:
+            return {'steps': list(self.steps), 'report': self.report, 'status': self.status,
+                    **self.flags}
+
+    def record_update(self, node: str, output):
+        """Turn one graph 'updates' chunk into delta events."""
+        with self._lock:
+            if not isinstance(output, dict):   # '__interrupt__': paused at the approval gate
+                self.status = 'awaiting_approval'
+                return
+            steps = output.get('steps_taken')
+            new_steps = []
+            if steps is not None:
+                prefix = steps[:len(self.steps)] == self.steps
+                new_steps = list(steps[len(self.steps):] if prefix else steps)
+                self.steps = list(steps)
+            self.append('step', {'node': node, 'steps': new_steps})
+            report = output.get('final_report')
+            if report and report != self.report:
+                if report.startswith(self.report):
+                    self.append('report', {'append': report[len(self.report):]})
+                else:
+                    self.append('report', {'replace': report})
+                self.report = report
+            flags = {'needs_approval': output.get('needs_human_approval', self.flags['needs_approval']),
+                     'requires_escalation': output.get('requires_escalation',
+                                                       self.flags['requires_escalation'])}
+            if flags != self.flags:
+                self.flags = flags
+                self.append('state', dict(flags))
+
+    def finish(self, status: str, error: str = ''):
+        with self._lock:
+            if self.status == 'running' or status == 'failed':
+                self.status = status
+            self.finished_at = time.time()
+            self.append('done', {'status': self.status, 'error': error})
+
+
+# thread_id -> event log of its latest streamed run
+event_logs: Dict[str, ThreadEventLog] = {}
+_stream_executor = ThreadPoolExecutor(max_workers=get_settings().stream_workers,
+                                      thread_name_prefix='stream')
+
+
+def _prune():
+    ttl = get_settings().stream_buffer_ttl_seconds
+    now = time.time()
+    for thread_id, log in list(event_logs.items()):
+        if log.finished_at and now - log.finished_at > ttl:
+            event_logs.pop(thread_id, None)
+
+
+def start_stream(initial_state: dict, config: dict) -> ThreadEventLog:
+    """Queue the graph run on the stream pool; raises ValueError if one is already running."""
+    from src.supervisor.graph import get_supervisor_graph
+    _prune()
+    thread_id = config['configurable']['thread_id']
+    previous = event_logs.get(thread_id)
+    if previous is not None and not previous.done:
+        raise ValueError(f'A streamed run is already in progress for thread {thread_id}')
+    # Ids keep increasing across runs on the same thread
+    log = ThreadEventLog(thread_id, asyncio.get_running_loop(),
+                         first_id=previous.next_id if previous else 1)
+    event_logs[thread_id] = log
+
+    def run():
+        try:
+            for chunk in get_supervisor_graph().stream(initial_state, config, stream_mode='updates'):
+                for node_name, node_output in chunk.items():
+                    log.record_update(node_name, node_output)
+            log.finish('completed')
+        except Exception as e:
+            logger.error(f'Streamed run for thread {thread_id} failed: {e}')
+            log.finish('failed', str(e))
+
+    _stream_executor.submit(run)
+    return log
+
+
+def format_event(event_id: Optional[int], event: str, data: str) -> str:
+    head = f'id: {event_id}\n' if event_id is not None else ''
+    return f'{head}event: {event}\ndata: {data}\n\n'
+
+
+async def sse_events(log: ThreadEventLog, last_event_id: int = 0) -> AsyncIterator[str]:
+    """Replay events after last_event_id, then follow the run live until it ends."""
+    heartbeat = get_settings().stream_heartbeat_seconds
+    yield f'retry: {int(heartbeat * 1000)}\n\n'
+    last = last_event_id
+    while True:
+        changed = log._changed            # Taken before reading, so no wake-up is missed
+        gap, events = log.since(last)
+        if gap:
+            # The buffer dropped events this client never saw: resend full state instead
+            with log._lock:               # State and id taken together, so no delta repeats
+                last, snapshot = log.last_id, log.snapshot()
+            yield format_event(last, 'snapshot', json.dumps(snapshot))
+            events = [e for e in events if e[0] > last]
+        for event_id, event, data in events:
+            last = event_id
+            yield format_event(event_id, event, data)
+        if log.done and last >= log.last_id:
+            return
+        try:
+            await asyncio.wait_for(changed.wait(), timeout=heartbeat)
+        except asyncio.TimeoutError:
+            yield format_event(None, 'heartbeat', json.dumps({'ts': round(time.time(), 3)}))
@@ -0,0 +1,200 @@
+"""
+Run-scoped evidence pack: every chunk a review's scope/quarter can see,
+loaded once per flow run as a normalised NumPy matrix plus payloads. The
+flow holds a LazyEvidencePack, so the scroll only happens on the first agent
+search (runs answered entirely from the review cache never load it). Agent
+searches are exact cosine searches against the pack (one matrix-vector
+product, then MMR and adjacent-chunk merging as in retrieve_context);
+searches it cannot answer fall back to Qdrant.
+
+Chunk text is masked with Presidio the first time a search returns it and
+kept masked for the rest of the run; concurrent crews needing the same chunk
+wait for that one masking. Scopes larger than EVIDENCE_PACK_MAX_CHUNKS are
+not packed.
+"""
+from typing import Callable, Dict, List, Optional
+from src.config import get_settings
+from src.services.diversify import RetrievedChunk, mmr_select, merge_adjacent
+import logging
+import threading
+import time
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+class EvidencePack:
+    """
+    Vectors and payloads of one review's chunks. region/quarter are the
+    normalised filter the pack was built with (None = unfiltered); mask is
+    applied to chunk text once, on first use.
+    """
+
+    def __init__(self, region: Optional[str], quarter: Optional[str], vectors,
+                 payloads: List[dict], mask: Optional[Callable[[str], str]] = None):
+        self.region = region
+        self.quarter = quarter
+        matrix = np.asarray(vectors, dtype=np.float32)
+        if not payloads:
+            matrix = np.zeros((0, 1), dtype=np.float32)
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        self.matrix = matrix / np.where(norms == 0, 1, norms)
+        self.payloads = payloads
+        self._regions = np.array([p.get('region') or '' for p in payloads], dtype=object)
+        self._mask = mask
+        self._masked: Dict[int, str] = {}
+        self._masking: Dict[int, threading.Lock] = {}   # Rows being masked right now
+        self._lock = threading.Lock()
+        self.searches = 0
+        self.fallbacks = 0
+
+    def __len__(self) -> int:
+        return len(self.payloads)
+
+    def covers(self, region: Optional[str], quarter: Optional[str]) -> bool:
+        """Whether a search filtered to region/quarter sees only chunks in this pack."""
+        return quarter == self.quarter and self.region in (None, region)
+
+    def _rows(self, region: Optional[str]) -> np.ndarray:
+        """Row indices matching a region filter (same rule as retrieval.search_filter)."""
+        if region is None or region == self.region:
+            return np.arange(len(self.payloads))
+        return np.flatnonzero(np.isin(self._regions, [region, 'APAC', '']))
+
+    def _text(self, row: int) -> str:
+        """Masked text of a row; each row is masked once, other rows mask in parallel."""
+        with self._lock:
+            text = self._masked.get(row)
+            if text is not None:
+                return text
+            row_lock = self._masking.setdefault(row, threading.Lock())
+        with row_lock:
+            with self._lock:
+                text = self._masked.get(row)
+            if text is None:
+                text = self.payloads[row].get('page_content', '')
+                if self._mask is not None:
+                    text = self._mask(text)
+                with self._lock:
+                    self._masked[row] = text
+                    self._masking.pop(row, None)
+        return text
+
+    def search(self, query_vector, region: Optional[str], quarter: Optional[str],
+               k: int = 5, fetch_k: Optional[int] = None,
+               lambda_mult: Optional[float] = None) -> Optional[List[RetrievedChunk]]:
+        """
+        Top fetch_k by cosine similarity, MMR-select k, merge adjacent chunks;
+        texts already masked. None if the pack does not cover region/quarter.
+        """
+        covered = self.covers(region, quarter)
+        with self._lock:
+            if covered:
+                self.searches += 1
+            else:
+                self.fallbacks += 1
+        if not covered:
+            return None
+        settings = get_settings()
+        fetch_k = max(fetch_k or settings.rag_fetch_k, k)
+        lambda_mult = settings.rag_mmr_lambda if lambda_mult is None else lambda_mult
+        rows = self._rows(region)
+        if not len(rows):
+            return []
+        query = np.asarray(query_vector, dtype=np.float32)
+        query = query / (np.linalg.norm(query) or 1)
+        matrix = self.matrix if len(rows) == len(self) else self.matrix[rows]
+        scores = matrix @ query
+        top = np.argpartition(-scores, fetch_k - 1)[:fetch_k] if len(scores) > fetch_k \
+            else np.arange(len(scores))
+        top = top[np.argsort(-scores[top])]
+        picked = mmr_select(query, self.matrix[rows[top]], k, lambda_mult)
+        chunks = []
+        for i in picked:
+            row = int(rows[top[i]])
+            payload = self.payloads[row]
+            chunks.append(RetrievedChunk(
+                text=self._text(row),
+                source=payload.get('source', 'Unknown'),
+                score=float(scores[top[i]]),
+                page=payload.get('page', 0),
+                chunk_index=payload.get('chunk_index', -1),
+            ))
+        return merge_adjacent(chunks)
+
+    def stats(self) -> dict:
+        return {'chunks': len(self), 'searches': self.searches, 'fallbacks': self.fallbacks,
+                'masked_chunks': len(self._masked)}
+
+
+class LazyEvidencePack:
+    """
+    A run's evidence pack, built by build_evidence_pack on the first search.
+    Thread-safe: concurrent regional crews wait for the one build. Searches
+    return None (fall back to Qdrant) when no pack could be built.
+    """
+
+    def __init__(self, scope: Optional[str], quarter: Optional[str]):
+        self.scope = scope
+        self.quarter = quarter
+        self.loaded = False
+        self._pack: Optional[EvidencePack] = None
+        self._lock = threading.Lock()
+
+    def get(self) -> Optional[EvidencePack]:
+        if not self.loaded:
+            with self._lock:
+                if not self.loaded:
+                    self._pack = build_evidence_pack(self.scope, self.quarter)
+                    self.loaded = True
+        return self._pack
+
+    def search(self, query_vector, region: Optional[str], quarter: Optional[str],
+               **kwargs) -> Optional[List[RetrievedChunk]]:
+        pack = self.get()
+        return None if pack is None else pack.search(query_vector, region, quarter, **kwargs)
+
+    def stats(self) -> dict:
+        return {'loaded': self.loaded, **(self._pack.stats() if self._pack is not None else {})}
+
+
+def build_evidence_pack(scope: Optional[str], quarter: Optional[str]) -> Optional[EvidencePack]:
+    """
+    Load every chunk matching the review's scope/quarter filter. None when
+    disabled, when the scope exceeds EVIDENCE_PACK_MAX_CHUNKS, or on error
+    (agent searches then go to Qdrant as before).
+    """
+    settings = get_settings()
+    if not settings.evidence_pack_enabled:
+        return None
+    from src.config import get_qdrant_client
+    from src.security.presidio_service import presidio
+    from src.services.retrieval import normalise_quarter, scope_region, search_filter
+    start = time.perf_counter()
+    pages, payloads, offset = [], [], None
+    try:
+        while True:
+            points, offset = get_qdrant_client().scroll(
+                collection_name=settings.qdrant_collection,
+                scroll_filter=search_filter(scope, quarter),
+                limit=1000, offset=offset, with_payload=True, with_vectors=True,
+            )
+            if points:
+                # float32 per page, so the float lists are freed as the scroll goes
+                pages.append(np.asarray([p.vector for p in points], dtype=np.float32))
+                payloads.extend(p.payload or {} for p in points)
+            if len(payloads) > settings.evidence_pack_max_chunks:
+                logger.info(f'Evidence pack skipped: {scope} {quarter} has more than '
+                            f'{settings.evidence_pack_max_chunks} chunks')
+                return None
+            if offset is None:
+                break
+    except Exception as e:
+        logger.warning(f'Evidence pack prefetch failed, searching Qdrant instead: {e}')
+        return None
+    vectors = np.vstack(pages) if pages else np.zeros((0, 1), dtype=np.float32)
+    pack = EvidencePack(scope_region(scope), normalise_quarter(quarter), vectors, payloads,
+                        mask=presidio.anonymize)
+    logger.info(f'Evidence pack: {len(pack)} chunks for {scope} {quarter} '
+                f'in {time.perf_counter() - start:.2f}s')
+    return pack
@@ -0,0 +1,132 @@
+"""
+Deterministic offline stand-ins for the chat and embedding models
+(USE_FAKE_MODELS=true), for benchmarks and load tests.
+
+Replies depend only on the prompt: the classifier, quick-answer and crew task
+prompts each get a canned answer, and the crew's structured tasks get JSON
+that validates against their output models. Embeddings are signed,
+feature-hashed bags of words, so texts sharing words land close together and
+retrieval still ranks sensibly.
+"""
+from typing import Any, List, Optional
+from langchain_core.embeddings import Embeddings
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, BaseMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+import hashlib
+import json
+import re
+import time
+import numpy as np
+
+EMBEDDING_DIM = 1536                   # Matches the audit collection (text-embedding-3-small)
+
+FINDINGS = [
+    {'finding_id': 'HK-2024-001', 'severity': 'Critical', 'title': 'Trade reconciliation control gap',
+     'owner': 'Operations Head', 'deadline': '2026-03-15', 'status': 'In Progress'},
+    {'finding_id': 'HK-2024-007', 'severity': 'Significant', 'title': 'AML monitoring threshold review',
+     'owner': 'Chief Compliance Officer', 'deadline': '2026-02-28', 'status': 'Open'},
+    {'finding_id': 'SG-2024-003', 'severity': 'Significant', 'title': 'Access control annual review',
+     'owner': None, 'deadline': '2026-04-30', 'status': 'In Progress', 'gaps': ['owner missing']},
+]
+COMPLIANCE = {
+    'items': [
+        {'finding_id': 'HK-2024-001', 'regulation': 'HKMA SPM TM-G-1', 'section': '4.2',
+         'status': 'NON-COMPLIANT', 'required_action': 'Automate reconciliation', 'reportable': True},
+        {'finding_id': 'HK-2024-007', 'regulation': 'HKMA AML/CFT Guideline', 'section': '5.1',
+         'status': 'NEEDS REVIEW'},
+        {'finding_id': 'SG-2024-003', 'regulation': 'MAS TRMG', 'section': '9.1', 'status': 'NON-COMPLIANT',
+         'required_action': 'Complete annual access review'},
+    ],
+    'conclusions': 'Two non-compliant findings; one reportable to the HKMA.',
+}
+RISKS = [
+    {'finding_id': 'HK-2024-001', 'likelihood': 4, 'impact': 5, 'risk_score': 20,
+     'rating': 'Critical', 'priority_rank': 1, 'escalate': True},
+    {'finding_id': 'SG-2024-003', 'likelihood': 3, 'impact': 4, 'risk_score': 12,
+     'rating': 'High', 'priority_rank': 2},
+    {'finding_id': 'HK-2024-007', 'likelihood': 3, 'impact': 3, 'risk_score': 9,
+     'rating': 'Medium', 'priority_rank': 3},
+]
+REPORT = """# AUDIT COMPLIANCE REVIEW
+## Executive Summary
+Three open findings; HK-2024-001 is Critical and requires escalation.
+## Risk Register
+1. HK-2024-001 (20, Critical) 2. SG-2024-003 (12, High) 3. HK-2024-007 (9, Medium)
+## Conclusion
+Escalate HK-2024-001 to the Chief Audit Executive."""
+
+
+def fake_reply(prompt: str) -> str:
+    """Canned reply chosen by what the prompt asks for."""
+    lower = prompt.lower()
+    if 'classify this request' in lower:
+        request = lower.rsplit('request:', 1)[-1]
+        full = any(w in request for w in ('review', 'report', 'compliance analysis'))
+        return 'full_review' if full else 'quick_question'
+    if 'answer this question using only the provided context' in lower:
+        context = prompt.split('Context:', 1)[-1].strip()
+        sentence = re.split(r'(?<=[.!?])\s', context, maxsplit=1)[0].strip()
+        return sentence[:400] if sentence and not sentence.startswith('If not found') \
+            else 'Not found in the provided context.'
+    if 'structured table of all findings' in lower:
+        body = json.dumps({'findings': FINDINGS})
+    elif 'compliance mapping table' in lower:
+        body = json.dumps(COMPLIANCE)
+    elif 'risk register: finding id' in lower:
+        body = json.dumps({'risks': RISKS})
+    elif 'executive audit compliance report' in lower:
+        body = REPORT
+    else:
+        body = 'Acknowledged.'
+    if 'final answer:' in lower:          # CrewAI agent prompt (ReAct format)
+        return f'Thought: I now can give a great answer\nFinal Answer: {body}'
+    return body
+
+
+def count_words(text: str) -> int:
+    """Rough token count for usage reporting."""
+    return max(1, len(text.split()))
+
+
+def fake_embedding(text: str, dim: int = EMBEDDING_DIM) -> List[float]:
+    vector = np.zeros(dim, dtype=np.float32)
+    for token in re.findall(r'[a-z0-9]+', text.lower()):
+        h = int.from_bytes(hashlib.blake2b(token.encode('utf-8'), digest_size=8).digest(), 'little')
+        vector[h % dim] += 1.0 if h >> 63 else -1.0
+    norm = np.linalg.norm(vector)
+    if norm == 0:
+        vector[0], norm = 1.0, 1.0
+    return (vector / norm).tolist()
+
+
+class FakeEmbeddings(Embeddings):
+    def __init__(self, dim: int = EMBEDDING_DIM):
+        self.dim = dim
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        return [fake_embedding(t, self.dim) for t in texts]
+
+    def embed_query(self, text: str) -> List[float]:
+        return fake_embedding(text, self.dim)
+
+
+class FakeChatModel(BaseChatModel):
+    """Chat model returning fake_reply(prompt), after an optional simulated latency."""
+
+    latency_ms: float = 0.0
+
+    @property
+    def _llm_type(self) -> str:
+        return 'fake-chat'
+
+    def _generate(self, messages: List[BaseMessage], stop: Optional[List[str]] = None,
+                  run_manager: Any = None, **kwargs) -> ChatResult:
+        prompt = '\n'.join(str(m.content) for m in messages)
+        if self.latency_ms:
+            time.sleep(self.latency_ms / 1000)
+        text = fake_reply(prompt)
+        usage = {'input_tokens': count_words(prompt), 'output_tokens': count_words(text)}
+        usage['total_tokens'] = usage['input_tokens'] + usage['output_tokens']
+        return ChatResult(generations=[ChatGeneration(
+            message=AIMessage(content=text, usage_metadata=usage))])
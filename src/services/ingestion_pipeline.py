@@ -0,0 +1,267 @@
+"""
+Bulk ingestion pipeline: one job for a whole library of audit documents.
+
+    parse (process pool) -> mask (Presidio, batched) -> embed (bounded
+    concurrency) -> upsert (batched)
+
+Stages are connected by bounded asyncio queues, so a slow stage applies
+backpressure instead of letting parsed chunks pile up in memory.
+"""
+import asyncio
+import logging
+import multiprocessing
+import os
+import shutil
+import time
+import uuid
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field, asdict
+from typing import Dict, List, Optional
+from qdrant_client import QdrantClient
+from qdrant_client.models import PointStruct
+from src.config import get_settings, get_embeddings, get_qdrant_client
+from src.security.presidio_service import presidio
+from src.services.document_parser import parse_document
+from src.services.retrieval import clear_retrieval_cache
+from src.services.rag_service import (
+    ensure_collection, load_manifest, update_chunk_metadata, delete_stale_chunks,
+    tracked_metadata,
+)
+
+logger = logging.getLogger(__name__)
+
+_DONE = object()   # Queue sentinel: upstream stage finished
+COPY_BLOCK_BYTES = 1024 * 1024
+
+
+@dataclass
+class IngestionJob:
+    job_id: str
+    files_total: int
+    status: str = 'queued'             # queued / running / completed / failed
+    files_parsed: int = 0
+    chunks_parsed: int = 0
+    chunks_unchanged: int = 0
+    chunks_removed: int = 0
+    chunks_masked: int = 0
+    chunks_embedded: int = 0
+    chunks_upserted: int = 0
+    errors: List[str] = field(default_factory=list)
+    started_at: float = field(default_factory=time.time)
+    finished_at: Optional[float] = None
+
+    def snapshot(self) -> dict:
+        data = asdict(self)
+        end = self.finished_at or time.time()
+        data['elapsed_seconds'] = round(end - self.started_at, 2)
+        return data
+
+
+# In-process job registry (job_id -> IngestionJob)
+jobs: Dict[str, IngestionJob] = {}
+
+_process_pool: Optional[ProcessPoolExecutor] = None
+
+
+def _get_process_pool() -> ProcessPoolExecutor:
+    global _process_pool
+    if _process_pool is None:
+        settings = get_settings()
+        # spawn: never fork a process that is running the event loop and threads
+        _process_pool = ProcessPoolExecutor(
+            max_workers=settings.ingest_parse_workers,
+            mp_context=multiprocessing.get_context('spawn'),
+        )
+    return _process_pool
+
+
+def _prune_jobs():
+    ttl = get_settings().ingest_job_ttl_seconds
+    now = time.time()
+    for job_id, job in list(jobs.items()):
+        if job.finished_at and now - job.finished_at > ttl:
+            jobs.pop(job_id, None)
+
+
+def create_job(files_total: int) -> IngestionJob:
+    _prune_jobs()
+    job = IngestionJob(job_id=str(uuid.uuid4()), files_total=files_total)
+    jobs[job.job_id] = job
+    return job
+
+
+async def _parse_stage(job: IngestionJob, files: List[tuple], client: QdrantClient,
+                       mask_q: asyncio.Queue, stale: Dict[str, List[str]]):
+    """
+    Parse files in the process pool, diff against manifests, queue new chunks.
+    Chunks no longer in a file are collected in stale (filename -> point IDs).
+    """
+    settings = get_settings()
+    loop = asyncio.get_running_loop()
+    pool = _get_process_pool()
+    sem = asyncio.Semaphore(settings.ingest_parse_workers)
+
+    async def parse_one(path: str, filename: str):
+        async with sem:
+            try:
+                chunks = await loop.run_in_executor(pool, parse_document, path, filename)
+                manifest = await asyncio.to_thread(load_manifest, client, filename)
+            except Exception as e:
+                job.errors.append(f'{filename}: {e}')
+                logger.warning(f'Bulk ingestion failed to parse {filename}: {e}')
+                return
+            job.files_parsed += 1
+            job.chunks_parsed += len(chunks)
+            current = {pid for pid, _, _ in chunks}
+            changed = [(pid, tracked_metadata(meta)) for pid, _, meta in chunks
+                       if pid in manifest and manifest[pid] != tracked_metadata(meta)]
+            removed = [pid for pid in manifest if pid not in current]
+            await asyncio.to_thread(update_chunk_metadata, client, changed)
+            if removed:
+                stale[filename] = removed
+            job.chunks_unchanged += len(chunks) - sum(1 for pid in current if pid not in manifest)
+            new = [c for c in chunks if c[0] not in manifest]
+            for i in range(0, len(new), settings.ingest_mask_batch):
+                await mask_q.put(new[i:i + settings.ingest_mask_batch])
+
+    await asyncio.gather(*(parse_one(path, name) for path, name in files))
+    await mask_q.put(_DONE)
+
+
+async def _mask_stage(job: IngestionJob, mask_q: asyncio.Queue, embed_q: asyncio.Queue):
+    """Mask PII batch-by-batch off the event loop (across worker processes in PII_MODE=process)."""
+    while (batch := await mask_q.get()) is not _DONE:
+        texts = await presidio.anonymize_many_async([text for _, text, _ in batch])
+        masked = [(pid, text, meta) for (pid, _, meta), text in zip(batch, texts)]
+        job.chunks_masked += len(masked)
+        await embed_q.put(masked)
+    await embed_q.put(_DONE)
+
+
+async def _embed_stage(job: IngestionJob, embed_q: asyncio.Queue, upsert_q: asyncio.Queue):
+    """Embed batches with at most ingest_embed_concurrency requests in flight."""
+    settings = get_settings()
+    embeddings = get_embeddings()
+
+    async def worker():
+        while (batch := await embed_q.get()) is not _DONE:
+            vectors = await embeddings.aembed_documents([text for _, text, _ in batch])
+            job.chunks_embedded += len(batch)
+            await upsert_q.put([PointStruct(id=pid, vector=vector,
+                                            payload={**meta, 'page_content': text})
+                                for (pid, text, meta), vector in zip(batch, vectors)])
+        await embed_q.put(_DONE)   # Let sibling workers see the sentinel too
+
+    await asyncio.gather(*(worker() for _ in range(settings.ingest_embed_concurrency)))
+    await upsert_q.put(_DONE)
+
+
+async def _upsert_stage(job: IngestionJob, client: QdrantClient, upsert_q: asyncio.Queue):
+    """Accumulate points and upsert in batches of ingest_upsert_batch."""
+    settings = get_settings()
+    pending: List[PointStruct] = []
+
+    async def flush():
+        await asyncio.to_thread(client.upsert,
+                                collection_name=settings.qdrant_collection, points=pending)
+        job.chunks_upserted += len(pending)
+
+    while (points := await upsert_q.get()) is not _DONE:
+        pending.extend(points)
+        if len(pending) >= settings.ingest_upsert_batch:
+            await flush()
+            pending = []
+    if pending:
+        await flush()
+
+
+async def run_ingestion_job(job: IngestionJob, files: List[tuple], workdir: str):
+    """
+    Run the staged pipeline over (path, filename) pairs, then remove workdir.
+    Progress is reflected on the job as each stage advances.
+    """
+    settings = get_settings()
+    job.status = 'running'
+    client = get_qdrant_client()
+    mask_q = asyncio.Queue(maxsize=settings.ingest_queue_size)
+    embed_q = asyncio.Queue(maxsize=settings.ingest_queue_size)
+    upsert_q = asyncio.Queue(maxsize=settings.ingest_queue_size)
+    stale: Dict[str, List[str]] = {}
+    try:
+        await asyncio.to_thread(ensure_collection, client)
+        # TaskGroup cancels the other stages if one fails, so none stays blocked on a queue
+        async with asyncio.TaskGroup() as tg:
+            tg.create_task(_parse_stage(job, files, client, mask_q, stale))
+            tg.create_task(_mask_stage(job, mask_q, embed_q))
+            tg.create_task(_embed_stage(job, embed_q, upsert_q))
+            tg.create_task(_upsert_stage(job, client, upsert_q))
+        # Only once the new chunks are stored: a failed job leaves the old version searchable
+        for filename, removed in stale.items():
+            await asyncio.to_thread(delete_stale_chunks, client, filename, removed)
+            job.chunks_removed += len(removed)
+        job.status = 'completed'
+    except Exception as e:
+        errors = e.exceptions if isinstance(e, ExceptionGroup) else [e]
+        logger.error(f'Bulk ingestion job {job.job_id} failed: {errors}')
+        job.errors.extend(str(err) for err in errors)
+        job.status = 'failed'
+    finally:
+        job.finished_at = time.time()
+        clear_retrieval_cache()            # Even a failed job may have upserted chunks
+        shutil.rmtree(workdir, ignore_errors=True)
+        logger.info(f'Bulk ingestion job {job.job_id} {job.status}: '
+                    f'{job.chunks_upserted} upserted, {job.chunks_unchanged} unchanged, '
+                    f'{job.chunks_removed} removed in {job.snapshot()["elapsed_seconds"]}s')
+
+
+def safe_member_name(name: str) -> Optional[str]:
+    """Flatten an archive member to its basename; None if it isn't a PDF/TXT."""
+    base = os.path.basename(name.replace('\\', '/'))
+    if not base or base.startswith('.') or not base.lower().endswith(('.pdf', '.txt')):
+        return None
+    return base
+
+
+class UploadTooLarge(ValueError):
+    """A bulk upload exceeded INGEST_MAX_UPLOAD_BYTES or INGEST_MAX_FILES."""
+
+
+class UploadLimit:
+    """Running byte and file totals for one bulk upload (archive contents included)."""
+
+    def __init__(self, max_bytes: int, max_files: int):
+        self.max_bytes = max_bytes
+        self.max_files = max_files
+        self.bytes = 0
+        self.files = 0
+
+    def add_file(self):
+        self.files += 1
+        if self.files > self.max_files:
+            raise UploadTooLarge(f'More than {self.max_files} documents in one upload')
+
+    def add_bytes(self, n: int):
+        self.bytes += n
+        if self.bytes > self.max_bytes:
+            raise UploadTooLarge(f'Upload exceeds {self.max_bytes} bytes uncompressed')
+
+
+def extract_archive(archive: str, workdir: str, docs: Dict[str, str], limit: UploadLimit):
+    """
+    Extract an archive's PDF/TXT members into workdir (docs: filename -> path,
+    later duplicates win). Bytes are counted as they are written, not taken
+    from member headers, so a zip bomb stops at the limit.
+    """
+    with zipfile.ZipFile(archive) as zf:
+        for member in zf.infolist():
+            base = None if member.is_dir() else safe_member_name(member.filename)
+            if not base:
+                continue
+            limit.add_file()
+            path = os.path.join(workdir, f'{limit.files}_{base}')
+            with zf.open(member) as src, open(path, 'wb') as dst:
+                while block := src.read(COPY_BLOCK_BYTES):
+                    limit.add_bytes(len(block))
+                    dst.write(block)
+            docs[base] = path
@@ -0,0 +1,100 @@
+"""
+Event-loop lag monitor (LOOP_LAG_MONITOR=true), for load testing.
+
+A background task sleeps for LOOP_LAG_INTERVAL_MS and records how late it
+wakes up: anything running on the loop without yielding (synchronous graph
+calls, Presidio, parsing) shows up as lag. The ASGI middleware tracks which
+endpoints have requests in flight, so each lag sample is attributed to every
+endpoint that was active during it. GET /metrics/loop reports the result.
+"""
+import asyncio
+import itertools
+import time
+from collections import deque
+from typing import Deque, Dict, Optional
+import numpy as np
+
+MAX_SAMPLES = 10000                    # Per endpoint; oldest dropped first
+
+
+def summarise_lag(samples) -> dict:
+    if not samples:
+        return {'samples': 0}
+    values = np.asarray(samples)
+    return {
+        'samples': len(values),
+        'p50_ms': round(float(np.percentile(values, 50)), 2),
+        'p95_ms': round(float(np.percentile(values, 95)), 2),
+        'p99_ms': round(float(np.percentile(values, 99)), 2),
+        'max_ms': round(float(values.max()), 2),
+    }
+
+
+class LoopLagMonitor:
+    def __init__(self, interval_ms: float = 20):
+        self.interval = interval_ms / 1000
+        self._ids = itertools.count()
+        self._in_flight: Dict[int, str] = {}
+        self._window: set = set()      # Endpoints that started during the current tick
+        self._task: Optional[asyncio.Task] = None
+        self.reset()
+
+    def reset(self):
+        self.overall: Deque[float] = deque(maxlen=MAX_SAMPLES)
+        self.by_endpoint: Dict[str, Deque[float]] = {}
+        self.requests: Dict[str, int] = {}
+        self.max_in_flight = 0
+
+    def _ensure_running(self):
+        loop = asyncio.get_running_loop()
+        if self._task is None or self._task.done() or self._task.get_loop() is not loop:
+            self._task = loop.create_task(self._run())
+
+    async def _run(self):
+        while True:
+            start = time.perf_counter()
+            await asyncio.sleep(self.interval)
+            lag_ms = max(0.0, (time.perf_counter() - start - self.interval) * 1000)
+            self.overall.append(lag_ms)
+            for label in self._window | set(self._in_flight.values()):
+                self.by_endpoint.setdefault(label, deque(maxlen=MAX_SAMPLES)).append(lag_ms)
+            self._window = set()
+
+    def enter(self, label: str) -> int:
+        self._ensure_running()
+        token = next(self._ids)
+        self._in_flight[token] = label
+        self._window.add(label)
+        self.requests[label] = self.requests.get(label, 0) + 1
+        self.max_in_flight = max(self.max_in_flight, len(self._in_flight))
+        return token
+
+    def exit(self, token: int):
+        self._in_flight.pop(token, None)
+
+    def metrics(self) -> dict:
+        return {
+            'interval_ms': self.interval * 1000,
+            'in_flight': len(self._in_flight),
+            'max_in_flight': self.max_in_flight,
+            'overall': summarise_lag(self.overall),
+            'endpoints': {label: {'requests': self.requests.get(label, 0), **summarise_lag(samples)}
+                          for label, samples in sorted(self.by_endpoint.items())},
+        }
+
+
+class LoopLagMiddleware:
+    """Pure ASGI middleware: a request counts as in flight until its last body chunk is sent."""
+
+    def __init__(self, app, monitor: LoopLagMonitor):
+        self.app = app
+        self.monitor = monitor
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http' or scope['path'].startswith('/metrics/'):
+            return await self.app(scope, receive, send)
+        token = self.monitor.enter(f'{scope["method"]} {scope["path"]}')
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            self.monitor.exit(token)
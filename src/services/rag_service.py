@@ -1,36 +1,181 @@
-from langchain_community.document_loaders import PyPDFLoader
-from langchain_text_splitters import RecursiveCharacterTextSplitter
 from qdrant_client import QdrantClient
-from qdrant_client.models import Distance, VectorParams, PointStruct
-from src.config import get_settings, get_embeddings
+from qdrant_client.models import (
+    PointStruct, Filter, FieldCondition, MatchValue,
+    HasIdCondition, FilterSelector, PayloadSchemaType,
+)
+from dataclasses import dataclass
+from itertools import islice
+from typing import Dict, Iterable, List
+from src.config import get_settings, get_embeddings, get_qdrant_client
 from src.security.presidio_service import presidio
-import uuid
+from src.services.collection_profile import create_collection
+from src.services.document_parser import iter_chunks
+from src.services.retrieval import clear_retrieval_cache
+import asyncio
+import logging
 
+logger = logging.getLogger(__name__)
 
-async def index_document(file_path: str, filename: str) -> int:
+EMBED_BATCH_SIZE = 64          # Chunks masked/embedded/upserted per round trip
+
+# Payload fields refreshed in place when an unchanged chunk's metadata changes
+TRACKED_FIELDS = ('page', 'chunk_index', 'region', 'quarter')
+
+# Keyword payload indexes used by filtered retrieval and manifest lookups
+PAYLOAD_INDEX_FIELDS = ('source', 'region', 'quarter')
+
+
+@dataclass
+class IndexResult:
+    chunks_indexed: int        # Chunks currently stored for the source
+    chunks_added: int          # New or changed chunks embedded and upserted
+    chunks_removed: int        # Stale chunks deleted from the collection
+    chunks_unchanged: int      # Chunks skipped (already indexed)
+
+
+def source_filter(source: str) -> Filter:
+    return Filter(must=[FieldCondition(key='source', match=MatchValue(value=source))])
+
+
+def tracked_metadata(metadata: dict) -> tuple:
+    return tuple(metadata.get(f) for f in TRACKED_FIELDS)
+
+
+def load_manifest(client: QdrantClient, source: str) -> Dict[str, tuple]:
+    """
+    Return the chunk manifest for a source: point ID -> tracked_metadata().
+    Only IDs and positional/filter fields are fetched, never vectors or text.
+    """
     settings = get_settings()
-    loader = PyPDFLoader(file_path)
-    docs = loader.load()
-    splitter = RecursiveCharacterTextSplitter(chunk_size=800, chunk_overlap=100)
-    chunks = splitter.split_documents(docs)
-    for chunk in chunks:
-        chunk.metadata['source'] = filename
-        # Mask PII in document chunks before storing
-        chunk.page_content = presidio.anonymize(chunk.page_content)
-    embeddings = get_embeddings()
-    client = QdrantClient(host=settings.qdrant_host, port=settings.qdrant_port)
-    try:
-        client.get_collection(settings.qdrant_collection)
-    except Exception:
-        client.create_collection(
+    manifest, offset = {}, None
+    while True:
+        points, offset = client.scroll(
+            collection_name=settings.qdrant_collection,
+            scroll_filter=source_filter(source),
+            limit=1000, offset=offset,
+            with_payload=list(TRACKED_FIELDS), with_vectors=False,
+        )
+        for p in points:
+            manifest[str(p.id)] = tracked_metadata(p.payload)
+        if offset is None:
+            return manifest
+
+
+def update_chunk_metadata(client: QdrantClient, changed: Iterable[tuple]):
+    """
+    Refresh tracked payload fields of unchanged chunks (position moved, or
+    region/quarter newly extracted) — no re-embedding.
+    """
+    settings = get_settings()
+    for point_id, values in changed:
+        client.set_payload(
             collection_name=settings.qdrant_collection,
-            vectors_config=VectorParams(size=1536, distance=Distance.COSINE)
+            payload=dict(zip(TRACKED_FIELDS, values)),
+            points=[point_id],
         )
-    points = [PointStruct(
-        id=str(uuid.uuid4()),
-        vector=embeddings.embed_query(c.page_content),
-        payload={'page_content': c.page_content, **c.metadata}
-    ) for c in chunks]
-    if points:
-        client.upsert(collection_name=settings.qdrant_collection, points=points)
-    return len(points)
+
+
+def delete_stale_chunks(client: QdrantClient, source: str, point_ids: List[str]):
+    """Delete chunks that no longer appear in a source, scoped by its payload filter."""
+    if not point_ids:
+        return
+    settings = get_settings()
+    client.delete(
+        collection_name=settings.qdrant_collection,
+        points_selector=FilterSelector(filter=Filter(must=[
+            FieldCondition(key='source', match=MatchValue(value=source)),
+            HasIdCondition(has_id=point_ids),
+        ])),
+    )
+
+
+def ensure_collection(client: QdrantClient):
+    """Create the collection if missing and make sure the payload indexes exist."""
+    settings = get_settings()
+    try:
+        schema = client.get_collection(settings.qdrant_collection).payload_schema or {}
+    except Exception:
+        create_collection(client, settings.qdrant_collection)   # Configured profile
+        schema = {}
+    for field_name in PAYLOAD_INDEX_FIELDS:
+        if field_name not in schema:
+            client.create_payload_index(
+                collection_name=settings.qdrant_collection,
+                field_name=field_name,
+                field_schema=PayloadSchemaType.KEYWORD,
+            )
+
+
+def _embed_and_upsert(client: QdrantClient, embeddings, batch: List[tuple], texts: List[str]):
+    """Embed one batch of already-masked chunk texts and upsert it (blocking)."""
+    settings = get_settings()
+    vectors = embeddings.embed_documents(texts)
+    client.upsert(collection_name=settings.qdrant_collection, points=[PointStruct(
+        id=pid, vector=vector,
+        payload={**chunk.metadata, 'page_content': text}
+    ) for (pid, chunk), text, vector in zip(batch, texts, vectors)])
+
+
+async def _upsert_batch(client: QdrantClient, embeddings, batch: List[tuple]):
+    """Mask, embed and upsert one batch of (point_id, chunk) pairs off the event loop."""
+    # Mask PII before storing
+    texts = await presidio.anonymize_many_async([chunk.page_content for _, chunk in batch])
+    await asyncio.to_thread(_embed_and_upsert, client, embeddings, batch, texts)
+
+
+def _prepare(client: QdrantClient, filename: str) -> Dict[str, tuple]:
+    """Create the collection if needed and load the source's manifest (blocking)."""
+    ensure_collection(client)
+    return load_manifest(client, filename)   # IDs + tracked fields only
+
+
+async def index_document(file_path: str, filename: str) -> IndexResult:
+    """
+    Incrementally index a document with bounded memory. Pages are parsed
+    lazily and chunks flow split -> mask -> embed -> upsert in batches of
+    EMBED_BATCH_SIZE. Chunk IDs are content hashes, so unchanged chunks are
+    skipped and chunks that no longer appear in the source are deleted.
+    Parsing, Qdrant and embedding calls run in worker threads and masking
+    through anonymize_many_async, so the event loop is never blocked.
+    """
+    client = get_qdrant_client()
+    manifest = await asyncio.to_thread(_prepare, client, filename)
+    embeddings = get_embeddings()
+
+    seen = set()
+    batch: List[tuple] = []
+    added = 0
+    chunks = iter_chunks(file_path, filename)
+    while parsed := await asyncio.to_thread(lambda: list(islice(chunks, EMBED_BATCH_SIZE))):
+        changed = []
+        for point_id, chunk in parsed:
+            if point_id in seen:
+                continue   # Duplicate chunk within the same document
+            seen.add(point_id)
+            tracked = tracked_metadata(chunk.metadata)
+            if point_id not in manifest:
+                batch.append((point_id, chunk))
+            elif manifest[point_id] != tracked:
+                changed.append((point_id, tracked))
+        if changed:
+            await asyncio.to_thread(update_chunk_metadata, client, changed)
+        while len(batch) >= EMBED_BATCH_SIZE:
+            await _upsert_batch(client, embeddings, batch[:EMBED_BATCH_SIZE])
+            added += EMBED_BATCH_SIZE
+            batch = batch[EMBED_BATCH_SIZE:]
+    if batch:
+        await _upsert_batch(client, embeddings, batch)
+        added += len(batch)
+
+    removed_ids = [pid for pid in manifest if pid not in seen]
+    await asyncio.to_thread(delete_stale_chunks, client, filename, removed_ids)
+    if added or removed_ids:
+        clear_retrieval_cache()
+
+    logger.info(f'Indexed {filename}: +{added} -{len(removed_ids)} ={len(seen) - added}')
+    return IndexResult(
+        chunks_indexed=len(seen),
+        chunks_added=added,
+        chunks_removed=len(removed_ids),
+        chunks_unchanged=len(seen) - added,
+    )
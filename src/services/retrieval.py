@@ -0,0 +1,187 @@
+from qdrant_client.models import (
+    Filter, FieldCondition, MatchAny, MatchValue, IsEmptyCondition, PayloadField,
+)
+from collections import OrderedDict
+from dataclasses import replace
+from typing import List, Optional
+from src.config import get_settings, get_embeddings, get_qdrant_client
+from src.services.collection_profile import search_params
+from src.services.diversify import RetrievedChunk, mmr_select, merge_adjacent
+from src.services.document_parser import QUARTER_PATTERN
+import hashlib
+import threading
+import time
+import numpy as np
+
+# Review scopes (as offered by the UI / ReviewRequest) -> ingested region codes.
+# 'APAC' and unknown scopes search every region.
+SCOPE_REGIONS = {
+    'hong kong': 'HK', 'hk': 'HK',
+    'singapore': 'SG', 'sg': 'SG',
+    'japan': 'JP', 'jp': 'JP',
+}
+
+
+# Regional scopes a multi-jurisdiction ('APAC') review fans out into
+REGION_SCOPES = {'HK': 'Hong Kong', 'SG': 'Singapore', 'JP': 'Japan'}
+
+
+def split_scope(scope: Optional[str]) -> List[str]:
+    """Per-region scopes for 'APAC'; any other scope is reviewed as is."""
+    if (scope or '').strip().lower() == 'apac':
+        return list(REGION_SCOPES.values())
+    return [scope]
+
+
+def scope_region(scope: Optional[str]) -> Optional[str]:
+    return SCOPE_REGIONS.get((scope or '').strip().lower())
+
+
+def normalise_quarter(quarter: Optional[str]) -> Optional[str]:
+    """'q3-2025' / 'Q3 2025' -> 'Q3 2025'; None if it isn't a quarter."""
+    match = QUARTER_PATTERN.search(quarter or '')
+    return f'Q{match.group(1)} {match.group(2)}' if match else None
+
+
+def search_filter(scope: Optional[str] = None, quarter: Optional[str] = None) -> Optional[Filter]:
+    """
+    Build the Qdrant payload filter for a review scope and quarter.
+    Chunks with no extracted region/quarter are kept, as are APAC-wide
+    documents for any single-region scope.
+    """
+    must = []
+    region = scope_region(scope)
+    if region:
+        must.append(Filter(should=[
+            FieldCondition(key='region', match=MatchAny(any=[region, 'APAC'])),
+            IsEmptyCondition(is_empty=PayloadField(key='region')),
+        ]))
+    period = normalise_quarter(quarter)
+    if period:
+        must.append(Filter(should=[
+            FieldCondition(key='quarter', match=MatchValue(value=period)),
+            IsEmptyCondition(is_empty=PayloadField(key='quarter')),
+        ]))
+    return Filter(must=must) if must else None
+
+
+# corpus_version() per effective filter, until the next indexing (or the TTL,
+# for documents indexed by another process): (region, quarter) -> (expires, version)
+_corpus_versions: dict = {}
+_corpus_lock = threading.Lock()
+
+
+def corpus_version(scope: Optional[str] = None, quarter: Optional[str] = None) -> str:
+    """
+    Version of the corpus a review of scope/quarter can see: a hash of the
+    matching point IDs. IDs are content hashes, so any added, changed or
+    removed chunk changes the version.
+    """
+    settings = get_settings()
+    key = (scope_region(scope), normalise_quarter(quarter))
+    with _corpus_lock:
+        entry = _corpus_versions.get(key)
+    if entry is not None and entry[0] > time.time():
+        return entry[1]
+    client = get_qdrant_client()
+    ids, offset = [], None
+    while True:
+        points, offset = client.scroll(
+            collection_name=settings.qdrant_collection,
+            scroll_filter=search_filter(scope, quarter),
+            limit=1000, offset=offset, with_payload=False, with_vectors=False,
+        )
+        ids.extend(str(p.id) for p in points)
+        if offset is None:
+            break
+    version = hashlib.sha256('\n'.join(sorted(ids)).encode('utf-8')).hexdigest()[:16]
+    with _corpus_lock:
+        _corpus_versions[key] = (time.time() + settings.retrieval_cache_ttl_seconds, version)
+    return version
+
+
+def search_chunks(query: str, scope: Optional[str] = None, quarter: Optional[str] = None,
+                  limit: int = 5) -> list:
+    """Embed the query and run a scope/quarter-filtered search of the audit collection."""
+    settings = get_settings()
+    vector = get_embeddings().embed_query(query)
+    return get_qdrant_client().search(
+        collection_name=settings.qdrant_collection,
+        query_vector=vector,
+        query_filter=search_filter(scope, quarter),
+        search_params=search_params(),
+        limit=limit, with_payload=True,
+    )
+
+
+# retrieve_context() results shared across concurrent reviews (e.g. a batch),
+# keyed by query and effective filter; cleared whenever documents are indexed.
+_retrieval_cache: 'OrderedDict[tuple, tuple]' = OrderedDict()
+_retrieval_lock = threading.Lock()
+
+
+def clear_retrieval_cache():
+    """Called whenever documents are indexed: drops cached results and corpus versions."""
+    with _retrieval_lock:
+        _retrieval_cache.clear()
+    with _corpus_lock:
+        _corpus_versions.clear()
+
+
+def _cached_retrieval(key: tuple) -> Optional[List[RetrievedChunk]]:
+    with _retrieval_lock:
+        entry = _retrieval_cache.get(key)
+        if entry is None or entry[0] < time.time():
+            return None
+        _retrieval_cache.move_to_end(key)
+    return [replace(c) for c in entry[1]]      # Callers mask chunk text in place
+
+
+def _store_retrieval(key: tuple, chunks: List[RetrievedChunk]):
+    settings = get_settings()
+    with _retrieval_lock:
+        _retrieval_cache[key] = (time.time() + settings.retrieval_cache_ttl_seconds,
+                                 [replace(c) for c in chunks])
+        _retrieval_cache.move_to_end(key)
+        while len(_retrieval_cache) > settings.retrieval_cache_size:
+            _retrieval_cache.popitem(last=False)
+
+
+def retrieve_context(query: str, scope: Optional[str] = None, quarter: Optional[str] = None,
+                     k: int = 5, fetch_k: Optional[int] = None,
+                     lambda_mult: Optional[float] = None) -> List[RetrievedChunk]:
+    """
+    Filtered search for fetch_k candidates with vectors, MMR-select k of
+    them for diversity, then merge overlapping adjacent chunks so repeated
+    text is sent to the LLM once.
+    """
+    settings = get_settings()
+    fetch_k = max(fetch_k or settings.rag_fetch_k, k)
+    lambda_mult = settings.rag_mmr_lambda if lambda_mult is None else lambda_mult
+    key = (query, scope_region(scope), normalise_quarter(quarter), k, fetch_k, lambda_mult)
+    if settings.retrieval_cache_size > 0:
+        cached = _cached_retrieval(key)
+        if cached is not None:
+            return cached
+    query_vector = get_embeddings().embed_query(query)
+    hits = get_qdrant_client().search(
+        collection_name=settings.qdrant_collection,
+        query_vector=query_vector,
+        query_filter=search_filter(scope, quarter),
+        search_params=search_params(),
+        limit=fetch_k, with_payload=True, with_vectors=True,
+    )
+    if not hits:
+        return []
+    picked = mmr_select(np.asarray(query_vector),
+                        np.asarray([h.vector for h in hits]), k, lambda_mult)
+    chunks = merge_adjacent([RetrievedChunk(
+        text=hits[i].payload.get('page_content', ''),
+        source=hits[i].payload.get('source', 'Unknown'),
+        score=hits[i].score,
+        page=hits[i].payload.get('page', 0),
+        chunk_index=hits[i].payload.get('chunk_index', -1),
+    ) for i in picked])
+    if settings.retrieval_cache_size > 0:
+        _store_retrieval(key, chunks)
+    return chunks
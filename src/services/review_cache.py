@@ -0,0 +1,108 @@
+"""
+Cache for crew review results.
+
+Task outputs are keyed by scope, quarter, corpus version and a hash of the
+task/agent configuration (chained through upstream tasks), so a repeat
+review on an unchanged corpus is served from cache. Per-finding tool calls
+(regulatory checks, risk scoring) are cached by prompt and model, so when
+only some findings changed only their work is re-run.
+
+Backed by Redis when reachable, else an in-process dict.
+"""
+from typing import Callable, Optional
+from src.config import get_settings
+import hashlib
+import json
+import logging
+import re
+import threading
+
+logger = logging.getLogger(__name__)
+
+KEY_PREFIX = 'review_cache:'
+
+
+def stable_hash(*parts) -> str:
+    """sha256 over the JSON encoding of parts (order-sensitive)."""
+    blob = json.dumps(parts, sort_keys=True, default=str)
+    return hashlib.sha256(blob.encode('utf-8')).hexdigest()
+
+
+def normalise_prompt(text: str) -> str:
+    """Collapse whitespace/case so re-worded spacing still hits the cache."""
+    return re.sub(r'\s+', ' ', text).strip().lower()
+
+
+class ReviewCache:
+    """Get/set JSON values with a TTL; connects lazily on first use."""
+
+    def __init__(self):
+        self.settings = get_settings()
+        self.enabled = self.settings.review_cache_enabled
+        self.ttl = self.settings.review_cache_ttl_seconds
+        self._redis = None
+        self._connected = False
+        self._local: dict = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def _client(self):
+        if not self._connected:
+            with self._lock:
+                if not self._connected:
+                    try:
+                        import redis
+                        client = redis.Redis.from_url(self.settings.redis_url, socket_timeout=2)
+                        client.ping()
+                        self._redis = client
+                    except Exception as e:
+                        logger.warning(f'Review cache: Redis unavailable ({e}), using in-process cache')
+                    self._connected = True
+        return self._redis
+
+    def get(self, key: str) -> Optional[dict]:
+        if not self.enabled:
+            return None
+        client = self._client()
+        try:
+            raw = client.get(KEY_PREFIX + key) if client else self._local.get(key)
+        except Exception as e:
+            logger.warning(f'Review cache get failed: {e}')
+            raw = None
+        if raw is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return json.loads(raw)
+
+    def set(self, key: str, value: dict):
+        if not self.enabled:
+            return
+        raw = json.dumps(value, default=str)
+        client = self._client()
+        try:
+            if client:
+                client.set(KEY_PREFIX + key, raw, ex=self.ttl)
+            else:
+                self._local[key] = raw
+        except Exception as e:
+            logger.warning(f'Review cache set failed: {e}')
+
+    def cached_call(self, name: str, prompt: str, model: str, compute: Callable[[], str]) -> str:
+        """Return the cached result of an LLM-backed tool call, computing it on a miss."""
+        key = 'tool:' + stable_hash(name, model, normalise_prompt(prompt))
+        hit = self.get(key)
+        if hit is not None:
+            return hit['result']
+        result = compute()
+        self.set(key, {'result': result})
+        return result
+
+    def stats(self) -> dict:
+        return {'enabled': self.enabled, 'backend': 'redis' if self._redis else 'memory',
+                'hits': self.hits, 'misses': self.misses}
+
+
+# Module-level singleton, shared by the flow and the crew tools
+review_cache = ReviewCache()
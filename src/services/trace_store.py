@@ -0,0 +1,209 @@
+"""
+Per-thread agent trace: an append-only, size-bounded event log per thread,
+served paginated at /threads/{thread_id}/trace.
+
+Event kinds:
+    node   each LangGraph node (traced_node wrapper)
+    step   each CrewAI agent step: tool use or final answer (per-agent step_callback)
+    task   each completed crew task (Crew task_callback)
+    crew   each crew kickoff, with the tokens it spent
+
+A step's duration is the time since the previous event of the same crew run;
+crews run their tasks sequentially, so that is the LLM call plus any tool
+call of the step. Token counts are known per crew run and per node, not per
+step.
+"""
+from collections import OrderedDict, deque
+from dataclasses import dataclass, asdict
+from typing import Callable, Deque, List, Optional
+from src.config import get_settings
+import logging
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class TraceEvent:
+    seq: int
+    ts: float
+    kind: str                          # node / step / task / crew
+    agent: str
+    action: str
+    tool: Optional[str] = None
+    scope: Optional[str] = None
+    duration_ms: float = 0.0
+    tokens: Optional[int] = None
+    status: str = 'ok'                 # ok / error / interrupted
+    output_preview: str = ''
+
+
+class ThreadTrace:
+    def __init__(self, max_events: int):
+        self.events: Deque[TraceEvent] = deque(maxlen=max_events)
+        self.next_seq = 1
+
+    @property
+    def dropped(self) -> int:
+        return self.next_seq - 1 - len(self.events)
+
+
+class TraceStore:
+    def __init__(self):
+        self._threads: 'OrderedDict[str, ThreadTrace]' = OrderedDict()
+        self._lock = threading.Lock()
+
+    def record(self, thread_id: Optional[str], kind: str, agent: str, action: str,
+               output: str = '', **fields) -> int:
+        """Append an event; returns its sequence number (0 when there is no thread)."""
+        if not thread_id:
+            return 0
+        settings = get_settings()
+        preview = ' '.join(str(output or '').split())[:settings.trace_preview_chars]
+        with self._lock:
+            trace = self._threads.get(thread_id)
+            if trace is None:
+                trace = self._threads[thread_id] = ThreadTrace(settings.trace_max_events)
+                while len(self._threads) > settings.trace_max_threads:
+                    self._threads.popitem(last=False)       # Least recently written thread
+            self._threads.move_to_end(thread_id)
+            seq = trace.next_seq
+            trace.next_seq += 1
+            trace.events.append(TraceEvent(seq=seq, ts=time.time(), kind=kind, agent=agent,
+                                           action=action, output_preview=preview, **fields))
+        return seq
+
+    def page(self, thread_id: str, after: int = 0, limit: int = 100) -> Optional[dict]:
+        """Events with seq > after, oldest first; poll again with after=next_after."""
+        with self._lock:
+            trace = self._threads.get(thread_id)
+            if trace is None:
+                return None
+            newer = [e for e in trace.events if e.seq > after]
+            dropped = trace.dropped
+        events = newer[:limit]
+        return {
+            'thread_id': thread_id,
+            'events': [asdict(e) for e in events],
+            'next_after': events[-1].seq if events else after,
+            'has_more': len(newer) > limit,
+            'dropped': dropped,            # Oldest events evicted by TRACE_MAX_EVENTS
+        }
+
+    def agent_steps(self, thread_id: str, after: int = 0) -> List[dict]:
+        """Task and node events after seq `after`, in the AgentStep shape."""
+        from src.services.cost_tracker import estimate_cost
+        with self._lock:
+            trace = self._threads.get(thread_id)
+            events = [e for e in trace.events if e.seq > after and e.kind in ('task', 'node')] \
+                if trace else []
+        return [{
+            'agent': e.agent,
+            'action': e.action,
+            'output_preview': e.output_preview,
+            'duration_seconds': round(e.duration_ms / 1000, 2),
+            # Token split unknown here: priced as input tokens
+            'cost_usd': round(estimate_cost(e.tokens, 0), 6) if e.tokens else 0.0,
+        } for e in events]
+
+    def last_node_seq(self, thread_id: str) -> int:
+        """Seq of the thread's latest node event (0 if none)."""
+        with self._lock:
+            trace = self._threads.get(thread_id)
+            return next((e.seq for e in reversed(trace.events) if e.kind == 'node'), 0) \
+                if trace else 0
+
+    def crew_tracer(self, thread_id: Optional[str], scope: str) -> 'CrewTracer':
+        return CrewTracer(self, thread_id, scope)
+
+
+def describe_step(step) -> tuple:
+    """(action, tool, output) for a CrewAI step: AgentAction/ToolResult or AgentFinish."""
+    if isinstance(step, (list, tuple)) and step:    # Older CrewAI: [(AgentAction, observation)]
+        action, observation = step[0] if isinstance(step[0], tuple) else (step[0], None)
+        tool = getattr(action, 'tool', None)
+        return f'tool: {tool}', tool, observation or getattr(action, 'tool_input', '')
+    tool = getattr(step, 'tool', None)
+    if tool:
+        return f'tool: {tool}', tool, getattr(step, 'result', None) or getattr(step, 'tool_input', '')
+    if hasattr(step, 'output'):
+        return 'final answer', None, step.output
+    return 'step', None, getattr(step, 'text', None) or str(step)
+
+
+class CrewTracer:
+    """Step and task callbacks for one crew run, timing each event from the previous one."""
+
+    def __init__(self, store: TraceStore, thread_id: Optional[str], scope: str):
+        self.store = store
+        self.thread_id = thread_id
+        self.scope = scope
+        self._last = time.perf_counter()
+        self._lock = threading.Lock()
+
+    def _elapsed_ms(self) -> float:
+        with self._lock:
+            now = time.perf_counter()
+            elapsed, self._last = now - self._last, now
+        return round(elapsed * 1000, 2)
+
+    def step_callback(self, agent: str) -> Callable:
+        def on_step(step):
+            try:
+                action, tool, output = describe_step(step)
+                self.store.record(self.thread_id, 'step', agent, action, output, tool=tool,
+                                  scope=self.scope, duration_ms=self._elapsed_ms())
+            except Exception as e:         # Tracing must never break a review
+                logger.debug(f'Trace step callback failed: {e}')
+        return on_step
+
+    def task_callback(self, task_output):
+        try:
+            name = getattr(task_output, 'name', None) or (task_output.description or '')[:60]
+            self.store.record(self.thread_id, 'task', task_output.agent, f'task: {name}',
+                              task_output.raw, scope=self.scope, duration_ms=self._elapsed_ms())
+        except Exception as e:
+            logger.debug(f'Trace task callback failed: {e}')
+
+
+def traced_node(name: str, fn: Callable) -> Callable:
+    """
+    Wrap a LangGraph node: record a 'node' event (duration, tokens spent,
+    newest step) and add it, with the crew tasks finished since the previous
+    node, to agent_steps.
+    """
+    def node(state: dict) -> dict:
+        from langgraph.errors import GraphInterrupt
+        thread_id = state.get('thread_id')
+        # Includes crew tasks that finished between nodes (e.g. after an early escalation)
+        first_seq = trace_store.last_node_seq(thread_id) if thread_id else 0
+        start = time.perf_counter()
+        try:
+            output = fn(state)
+        except GraphInterrupt:
+            trace_store.record(thread_id, 'node', 'Supervisor', name, 'Paused for human approval',
+                               status='interrupted',
+                               duration_ms=round((time.perf_counter() - start) * 1000, 2))
+            raise
+        except Exception as e:
+            trace_store.record(thread_id, 'node', 'Supervisor', name, str(e), status='error',
+                               duration_ms=round((time.perf_counter() - start) * 1000, 2))
+            raise
+        tokens = output.get('total_tokens', state.get('total_tokens', 0)) - state.get('total_tokens', 0)
+        new_steps = output.get('steps_taken', [])[len(state.get('steps_taken', [])):]
+        trace_store.record(thread_id, 'node', 'Supervisor', name,
+                           new_steps[-1] if new_steps else '', tokens=tokens or None,
+                           duration_ms=round((time.perf_counter() - start) * 1000, 2))
+        if thread_id:
+            output = {**output, 'agent_steps': state.get('agent_steps', [])
+                      + trace_store.agent_steps(thread_id, after=first_seq)}
+        return output
+
+    node.__name__ = name
+    node.__doc__ = fn.__doc__
+    return node
+
+
+# Module-level singleton (in-process, like the checkpointer)
+trace_store = TraceStore()
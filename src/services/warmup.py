@@ -0,0 +1,82 @@
+"""
+Explicit warm-up of the heavy, lazily initialised components.
+
+Nothing heavy loads at import time: the Presidio engines (spaCy model), the
+compiled supervisor graph and CrewAI (agent pool, memory stores) each load on
+first use. warm_up() loads them deliberately, at API startup when
+STARTUP_WARMUP is set, and readiness() backs the /ready endpoint.
+"""
+from typing import Dict, List, Optional
+from src.config import get_settings
+import logging
+import sys
+import time
+
+logger = logging.getLogger(__name__)
+
+
+def _warm_presidio():
+    from src.security.presidio_service import presidio
+    presidio.warm()
+
+
+def _warm_supervisor_graph():
+    from src.supervisor.graph import get_supervisor_graph
+    get_supervisor_graph()
+
+
+def _warm_crew():
+    from src.crew.pool import crew_pool
+    crew_pool.warm()
+
+
+WARMERS = {
+    'presidio': _warm_presidio,
+    'supervisor_graph': _warm_supervisor_graph,
+    'crew': _warm_crew,
+}
+
+# component -> {'state': loading / ready / failed, 'seconds': ..., 'error': ...}
+warmup_status: Dict[str, dict] = {}
+
+
+def warm_up(components: Optional[List[str]] = None) -> Dict[str, dict]:
+    """Load components in order (default: STARTUP_WARMUP_COMPONENTS), timing each."""
+    for name in components or get_settings().startup_warmup_components:
+        if name not in WARMERS:
+            logger.warning(f'Unknown warm-up component {name!r}; expected one of {list(WARMERS)}')
+            continue
+        warmup_status[name] = {'state': 'loading'}
+        start = time.perf_counter()
+        try:
+            WARMERS[name]()
+            warmup_status[name] = {'state': 'ready', 'seconds': round(time.perf_counter() - start, 3)}
+            logger.info(f'Warm-up: {name} ready in {warmup_status[name]["seconds"]}s')
+        except Exception as e:
+            warmup_status[name] = {'state': 'failed', 'error': str(e)}
+            logger.error(f'Warm-up: {name} failed: {e}')
+    return warmup_status
+
+
+def loaded_components() -> Dict[str, bool]:
+    """Which heavy components are loaded; never triggers a load itself."""
+    presidio_mod = sys.modules.get('src.security.presidio_service')
+    graph_mod = sys.modules.get('src.supervisor.graph')
+    pool_mod = sys.modules.get('src.crew.pool')
+    return {
+        'presidio': bool(presidio_mod and presidio_mod.presidio.is_ready),
+        'supervisor_graph': bool(graph_mod and graph_mod.is_graph_built()),
+        'crew': bool(pool_mod and pool_mod.crew_pool.is_warm),
+    }
+
+
+def readiness() -> dict:
+    """Ready once every warm-up component is loaded (immediately if warm-up is off)."""
+    settings = get_settings()
+    loaded = loaded_components()
+    required = settings.startup_warmup_components if settings.startup_warmup else []
+    return {
+        'ready': all(loaded.get(name, False) for name in required),
+        'components': loaded,
+        'warmup': warmup_status,
+    }
@@ -4,40 +4,113 @@ from langgraph.checkpoint.memory import MemorySaver
 from langgraph.types import interrupt
 from langchain_core.messages import HumanMessage, AIMessage
 from src.supervisor.state import SupervisorState
-from src.config import get_llm, get_settings, get_embeddings
+from src.config import get_llm, get_settings, resolve_model
 from src.security.presidio_service import presidio
-from src.crew.flow import run_audit_flow
-from src.services.cost_tracker import CostTracker
-from qdrant_client import QdrantClient
+from src.services.cost_tracker import estimate_cost
+from src.services.retrieval import retrieve_context
+from src.services.context_packer import pack_context
+from src.crew.outputs import RiskRegister
+from src.services.trace_store import traced_node
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Dict, List, Optional, Tuple
+import httpx
+import threading
 import time
+import uuid
 
 logger = logging.getLogger(__name__)
 settings = get_settings()
-cost_tracker = CostTracker()
+
+# Crew runs execute off the graph thread so escalation can route early.
+# Runs escalated before the Report Writer finished wait here, by a per-run
+# report id kept in the graph state: report id -> (escalated at, future).
+_crew_executor = ThreadPoolExecutor(max_workers=settings.crew_review_workers,
+                                    thread_name_prefix='crew')
+_pending_reports: Dict[str, Tuple[float, Future]] = {}
+_pending_lock = threading.Lock()
+
+# Speculative quick-path retrieval started by classify_task:
+# thread_id -> (parked at, masked query, future)
+_retrieval_executor = ThreadPoolExecutor(max_workers=settings.speculative_retrieval_workers,
+                                         thread_name_prefix='retrieval')
+_speculative: Dict[str, Tuple[float, str, Future]] = {}
+_speculative_lock = threading.Lock()
+
+
+def park_speculative(thread_id: str, query: str, future: Future):
+    """Keep a speculative retrieval for quick_rag; drops ones no run claimed within the TTL."""
+    now = time.time()
+    with _speculative_lock:
+        for tid, (since, _, stale) in list(_speculative.items()):
+            # The run failed between classify_task and quick_rag
+            if now - since > settings.speculative_retrieval_ttl_seconds:
+                stale.cancel()
+                del _speculative[tid]
+        previous = _speculative.pop(thread_id, None)
+        if previous is not None:
+            previous[2].cancel()
+        _speculative[thread_id] = (now, query, future)
+
+
+def take_speculative(thread_id: str) -> Tuple[Optional[str], Optional[Future]]:
+    """(masked query, future) parked for thread_id, removing it; (None, None) if none."""
+    with _speculative_lock:
+        entry = _speculative.pop(thread_id, None)
+    return (entry[1], entry[2]) if entry else (None, None)
 
 
 # ─── NODES ──────────────────────────────────────────────────────────────────
 
+def _quick_context(safe_msg: str, scope: str, quarter: str) -> List:
+    """Quick-path retrieval: embed, search, then mask the retrieved chunks."""
+    results = retrieve_context(safe_msg, scope=scope, quarter=quarter, k=5)
+    for r in results:
+        r.text = presidio.anonymize(r.text)
+    return results
+
+
 def classify_task(state: SupervisorState) -> dict:
     """
     NODE 1: Classify the user's request.
     quick_question = a specific question about a finding or document
     full_review    = a request for a comprehensive compliance review
+    Pre-classified requests (e.g. batch reviews) skip the LLM call.
+    With SPECULATIVE_RETRIEVAL the quick-path retrieval runs alongside the
+    LLM call; quick_rag reuses it, full reviews discard it.
     """
+    if state.get('task_type') in ('quick_question', 'full_review'):
+        return {'steps_taken': state.get('steps_taken', []) + [
+            f'Task classified: {state["task_type"]} (preset)']}
     user_msg = state['messages'][-1].content
     # Mask PII in user input before sending to LLM
     safe_msg = presidio.anonymize(user_msg)
-    llm = get_llm(temperature=0)
+    thread_id = state.get('thread_id', 'default')
+    speculative = None
+    if settings.speculative_retrieval:
+        # Retrieval runs while the classifier's LLM call is in flight
+        speculative = _retrieval_executor.submit(_quick_context, safe_msg,
+                                                 state.get('scope'), state.get('quarter'))
+    llm = get_llm(temperature=0, route='classify_task')
     prompt = f"""Classify this request as 'quick_question' or 'full_review'.
     quick_question: asking about one specific finding, document, or fact.
     full_review: requesting a comprehensive audit review, compliance analysis,
                  or full report generation for a scope/quarter.
     Request: {safe_msg}
     Answer with only: quick_question or full_review"""
-    response = llm.invoke([HumanMessage(content=prompt)])
+    try:
+        response = llm.invoke([HumanMessage(content=prompt)])
+    except Exception:
+        if speculative is not None:
+            speculative.cancel()
+        raise
     t = response.content.strip().lower()
     if t not in ['quick_question', 'full_review']:
         t = 'quick_question'
+    if speculative is not None:
+        if t == 'quick_question':
+            park_speculative(thread_id, safe_msg, speculative)
+        else:
+            speculative.cancel()           # Discarded if it already started
     return {
         'task_type': t,
         'steps_taken': state.get('steps_taken', []) + [f'Task classified: {t}']
@@ -51,18 +124,21 @@ def quick_rag_answer(state: SupervisorState) -> dict:
     """
     user_msg = state['messages'][-1].content
     safe_msg = presidio.anonymize(user_msg)
-    embeddings = get_embeddings()
-    client = QdrantClient(host=settings.qdrant_host, port=settings.qdrant_port)
-    vector = embeddings.embed_query(safe_msg)
-    results = client.search(
-        collection_name=settings.qdrant_collection,
-        query_vector=vector, limit=5, with_payload=True
-    )
-    context = '\n'.join([
-        presidio.anonymize(r.payload.get('page_content', ''))[:600]
-        for r in results
-    ])
-    llm = get_llm(temperature=0)
+    query, speculative = take_speculative(state.get('thread_id', 'default'))
+    reused = speculative is not None and query == safe_msg and not speculative.cancelled()
+    if speculative is not None and not reused:
+        speculative.cancel()               # Retrieved for a different question
+    if reused:
+        try:
+            results = speculative.result()
+        except Exception as e:
+            logger.warning(f'Speculative retrieval failed, retrying: {e}')
+            reused = False
+    if not reused:
+        results = _quick_context(safe_msg, state.get('scope'), state.get('quarter'))
+    packed = pack_context(results, model=resolve_model('quick_rag')[2])
+    context = '\n'.join(text for _, text in packed.sections)
+    llm = get_llm(temperature=0, route='quick_rag')
     prompt = f"""Answer this question using only the provided context.
     Question: {safe_msg}
     Context: {context}
@@ -73,7 +149,81 @@ def quick_rag_answer(state: SupervisorState) -> dict:
         'quick_answer': answer,
         'final_report': answer,
         'needs_human_approval': False,
-        'steps_taken': state.get('steps_taken', []) + ['Quick RAG answer generated']
+        'steps_taken': state.get('steps_taken', []) + [
+            f'Context packed: {packed.summary()}'
+            + (' (speculative retrieval)' if reused else ''),
+            'Quick RAG answer generated',
+        ]
+    }
+
+
+def notify_reviewers(thread_id: str, escalation: dict):
+    """Alert reviewers that a review is waiting at the approval gate."""
+    logger.warning(f'Escalation for thread {thread_id}: {escalation["reason"]} '
+                   f'({escalation["scope"]} {escalation["quarter"]})')
+    if settings.escalation_webhook_url:
+        try:
+            httpx.post(settings.escalation_webhook_url,
+                       json={'thread_id': thread_id, **escalation}, timeout=5.0)
+        except Exception as e:
+            logger.warning(f'Escalation webhook failed: {e}')
+
+
+def park_report(future: Future) -> str:
+    """Hold an escalated run's report future until approval; returns its report id."""
+    report_id = str(uuid.uuid4())
+    now = time.time()
+    with _pending_lock:
+        for rid, (since, pending) in list(_pending_reports.items()):
+            # Finished long ago and never approved: the thread was abandoned
+            if pending.done() and now - since > settings.pending_report_ttl_seconds:
+                del _pending_reports[rid]
+        _pending_reports[report_id] = (now, future)
+    return report_id
+
+
+def collect_report(report_id: str) -> dict:
+    """
+    The crew result of a parked run, waiting up to PENDING_REPORT_TIMEOUT_SECONDS.
+    Raises if the report is unknown (expired, or parked by another process),
+    and TimeoutError, keeping it parked, if the Report Writer is still running.
+    """
+    with _pending_lock:
+        entry = _pending_reports.get(report_id)
+    if entry is None:
+        raise RuntimeError(f'Pending report {report_id} is no longer available '
+                           '(expired or the API restarted) — re-run the review')
+    result = entry[1].result(timeout=settings.pending_report_timeout_seconds)
+    with _pending_lock:
+        _pending_reports.pop(report_id, None)
+    return result
+
+
+def discard_report(report_id: str):
+    with _pending_lock:
+        _pending_reports.pop(report_id, None)
+
+
+def _crew_outcome(state: SupervisorState, result: dict, duration: float) -> dict:
+    report = result.get('report', 'Crew completed — no report generated')
+    report = presidio.anonymize(report)   # Mask PII in final report
+    usage = result.get('token_usage') or {}
+    prompt_tokens = usage.get('prompt_tokens', 0)
+    completion_tokens = usage.get('completion_tokens', 0)
+    return {
+        'crew_report': report,
+        'total_tokens': state.get('total_tokens', 0) + prompt_tokens + completion_tokens,
+        # Priced per agent model by the crew; default pricing for older results
+        'total_cost_usd': state.get('total_cost_usd', 0.0)
+                          + usage.get('cost_usd', estimate_cost(prompt_tokens, completion_tokens)),
+        'risk_register': result.get('risk_register'),
+        'requires_escalation': result.get('requires_escalation', False),
+        'needs_human_approval': result.get('requires_escalation', False),
+        'steps_taken': state.get('steps_taken', []) + [
+            f'CrewAI flow completed in {duration:.0f}s'
+            + (f' (cached: {", ".join(result["cached_tasks"])})' if result.get('cached_tasks') else ''),
+            f'Escalation required: {result.get("requires_escalation", False)}'
+        ]
     }
 
 
@@ -81,22 +231,41 @@ def run_crew_review(state: SupervisorState) -> dict:
     """
     NODE 3 (full review path): Launch the CrewAI Flow.
     This is the main work node — it can take 5-15 minutes.
+    The flow runs on a worker thread. If the risk register escalates, this
+    node returns straight away so the approval gate opens (and reviewers are
+    notified) while the Report Writer is still drafting; finalise_report
+    collects the report later.
     """
+    from src.crew.flow import run_audit_flow   # CrewAI loads on the first full review
     scope = state.get('scope', 'APAC')
     quarter = state.get('quarter', 'Q3 2025')
+    thread_id = state.get('thread_id', 'default')
     logger.info(f'Launching CrewAI flow: {scope} {quarter}')
     start = time.time()
-    result = run_audit_flow(scope=scope, quarter=quarter)
-    duration = time.time() - start
-    report = result.get('report', 'Crew completed — no report generated')
-    report = presidio.anonymize(report)   # Mask PII in final report
+    escalated = threading.Event()
+    escalation: dict = {}
+
+    def on_escalation(info: dict):
+        escalation.update(info)
+        escalated.set()
+        notify_reviewers(thread_id, info)
+
+    future = _crew_executor.submit(run_audit_flow, scope=scope, quarter=quarter,
+                                   on_escalation=on_escalation, trace_id=thread_id)
+    while not future.done() and not escalated.wait(timeout=0.5):
+        pass
+    if future.done():
+        return _crew_outcome(state, future.result(), time.time() - start)
+
     return {
-        'crew_report': report,
-        'requires_escalation': result.get('requires_escalation', False),
-        'needs_human_approval': result.get('requires_escalation', False),
+        'pending_report_id': park_report(future),
+        'crew_report': '',
+        'risk_register': escalation.get('risk_register'),
+        'requires_escalation': True,
+        'needs_human_approval': True,
         'steps_taken': state.get('steps_taken', []) + [
-            f'CrewAI flow completed in {duration:.0f}s',
-            f'Escalation required: {result.get("requires_escalation", False)}'
+            f'Risk register escalated after {time.time() - start:.0f}s: {escalation["reason"]}',
+            'Reviewers notified — Report Writer still drafting',
         ]
     }
 
@@ -106,7 +275,12 @@ def human_approval_gate(state: SupervisorState) -> dict:
     NODE 4: Pause for human approval when critical findings are detected.
     LangGraph interrupt() pauses execution; /supervisor/approve resumes it.
     """
-    report_preview = state['crew_report'][:300] + '...'
+    if state.get('crew_report'):
+        report_preview = state['crew_report'][:300] + '...'
+    elif state.get('risk_register'):
+        report_preview = RiskRegister(**state['risk_register']).compact()
+    else:
+        report_preview = 'Risk register unavailable — report still being drafted.'
     decision = interrupt(
         f'CRITICAL FINDINGS DETECTED — Human approval required before finalising report.\n'
         f'Report preview: {report_preview}'
@@ -126,9 +300,26 @@ def human_approval_gate(state: SupervisorState) -> dict:
 def finalise_report(state: SupervisorState) -> dict:
     """
     NODE 5: Set the final_report field. Only runs if approved or not requiring approval.
+    Waits for the Report Writer if the review was escalated before it finished.
     """
+    report_id = state.get('pending_report_id')
     if state.get('final_report'):   # Already set (quick answer or rejected)
+        if report_id:
+            discard_report(report_id)
+            return {'pending_report_id': ''}
         return {}
+    if report_id and not state.get('crew_report'):
+        outcome = _crew_outcome(state, collect_report(report_id), 0)
+        return {
+            'pending_report_id': '',
+            'crew_report': outcome['crew_report'],
+            'final_report': outcome['crew_report'],
+            'total_tokens': outcome['total_tokens'],
+            'total_cost_usd': outcome['total_cost_usd'],
+            'steps_taken': state.get('steps_taken', []) + ['Report Writer finished', 'Report finalised']
+        }
+    if not state.get('crew_report'):
+        raise RuntimeError('No crew report to finalise')
     return {
         'final_report': state['crew_report'],
         'steps_taken': state.get('steps_taken', []) + ['Report finalised']
@@ -150,11 +341,12 @@ def route_after_crew(state: SupervisorState) -> str:
 def build_supervisor_graph():
     builder = StateGraph(SupervisorState)
 
-    builder.add_node('classify_task',    classify_task)
-    builder.add_node('quick_rag',        quick_rag_answer)
-    builder.add_node('run_crew',         run_crew_review)
-    builder.add_node('human_gate',       human_approval_gate)
-    builder.add_node('finalise',         finalise_report)
+    # Every node is traced: /threads/{thread_id}/trace and state agent_steps
+    builder.add_node('classify_task',    traced_node('classify_task', classify_task))
+    builder.add_node('quick_rag',        traced_node('quick_rag', quick_rag_answer))
+    builder.add_node('run_crew',         traced_node('run_crew', run_crew_review))
+    builder.add_node('human_gate',       traced_node('human_gate', human_approval_gate))
+    builder.add_node('finalise',         traced_node('finalise', finalise_report))
 
     builder.add_edge(START, 'classify_task')
     builder.add_conditional_edges('classify_task', route_after_classify,
@@ -168,4 +360,29 @@ def build_supervisor_graph():
     return builder.compile(checkpointer=MemorySaver())
 
 
-supervisor_graph = build_supervisor_graph()
+_supervisor_graph = None
+_graph_lock = threading.Lock()
+
+
+def get_supervisor_graph():
+    """
+    The compiled supervisor graph, built on first use. Exactly one per
+    process: its MemorySaver holds the checkpoints approvals resume from.
+    """
+    global _supervisor_graph
+    if _supervisor_graph is None:
+        with _graph_lock:
+            if _supervisor_graph is None:
+                _supervisor_graph = build_supervisor_graph()
+    return _supervisor_graph
+
+
+def is_graph_built() -> bool:
+    return _supervisor_graph is not None
+
+
+def __getattr__(name: str):
+    # `from src.supervisor.graph import supervisor_graph` still works, lazily
+    if name == 'supervisor_graph':
+        return get_supervisor_graph()
+    raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
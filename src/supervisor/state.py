@@ -1,6 +1,6 @@
 from typing import TypedDict, Annotated, Optional, List
 from langgraph.graph.message import add_messages
-from langchain_core.messages import BaseMessage
+from langchain_core.messages import BaseMessage, HumanMessage
 
 
 class SupervisorState(TypedDict):
@@ -19,7 +19,9 @@ class SupervisorState(TypedDict):
 
     # Full crew output (for compliance reviews)
     crew_report: str
+    risk_register: Optional[dict]   # Structured RiskRegister from the Risk Analyst
     requires_escalation: bool
+    pending_report_id: str          # Escalated run whose Report Writer is still drafting
 
     # Approval gate
     needs_human_approval: bool
@@ -37,3 +39,17 @@ class SupervisorState(TypedDict):
     total_tokens: int
 
     thread_id: str
+
+
+def new_review_state(task: str, scope: str, quarter: str, thread_id: str,
+                     task_type: str = '') -> dict:
+    """Initial graph state for a review; pass task_type to skip classification."""
+    return {
+        'messages': [HumanMessage(content=task)],
+        'task_type': task_type, 'scope': scope, 'quarter': quarter,
+        'quick_answer': '', 'crew_report': '', 'risk_register': None,
+        'requires_escalation': False, 'pending_report_id': '',
+        'needs_human_approval': False, 'approval_granted': False,
+        'final_report': '', 'steps_taken': [], 'agent_steps': [],
+        'total_cost_usd': 0.0, 'total_tokens': 0, 'thread_id': thread_id,
+    }
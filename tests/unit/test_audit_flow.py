@@ -0,0 +1,79 @@
+import asyncio
+import pytest
+
+pytest.importorskip('crewai')
+pytest.importorskip('qdrant_client')
+pytest.importorskip('uvicorn')
+from benchmarks.offline_suite import write_corpus
+from benchmarks.stubs import free_port, make_openai_app, serve
+
+
+@pytest.fixture(scope='module')
+def offline_crew(tmp_path_factory):
+    """
+    CrewAI agents on the OpenAI stub (fake replies), Qdrant in :memory: with a
+    small synthetic corpus, Presidio masking replaced by a pass-through.
+    """
+    from src import config
+    port = free_port()
+    serve(make_openai_app(), port)
+    base = f'http://127.0.0.1:{port}/v1'
+    with pytest.MonkeyPatch.context() as mp:
+        for name, value in {'USE_FAKE_MODELS': 'true', 'QDRANT_LOCATION': ':memory:',
+                            'CREW_MEMORY': 'off', 'RETRIEVAL_CACHE_SIZE': '0',
+                            'OPENAI_API_KEY': 'sk-offline-test', 'OPENAI_BASE_URL': base,
+                            'OPENAI_API_BASE': base}.items():
+            mp.setenv(name, value)
+        for cached in (config.get_settings, config.get_embeddings, config.get_qdrant_client):
+            cached.cache_clear()
+        from src.security.presidio_service import presidio
+        from src.services.rag_service import index_document
+        from src.services.review_cache import review_cache
+        mp.setattr(review_cache, 'enabled', False)
+        mp.setattr(presidio, 'anonymize', lambda text: text)
+        for path, name in write_corpus(str(tmp_path_factory.mktemp('corpus')), 3, 8):
+            asyncio.run(index_document(path, name))
+        yield mp
+        for cached in (config.get_settings, config.get_embeddings, config.get_qdrant_client):
+            cached.cache_clear()
+
+
+def test_flow_runs_the_crew_and_escalates_early(offline_crew):
+    from src.crew.flow import run_audit_flow
+    escalations = []
+    result = run_audit_flow(scope='Hong Kong', quarter='Q3 2025', on_escalation=escalations.append)
+    assert result['report'].startswith('⚠️  ESCALATION REQUIRED')
+    assert '# AUDIT COMPLIANCE REVIEW' in result['report']
+    assert result['requires_escalation'] and result['token_usage']['prompt_tokens'] > 0
+    # Fired from the risk task callback (HK-2024-001: Critical, score 20)
+    assert len(escalations) == 1
+    assert escalations[0]['critical_risks'][0]['finding_id'] == 'HK-2024-001'
+
+
+def test_apac_review_fans_out_to_regional_crews_and_merges(offline_crew):
+    from src.crew.flow import run_audit_flow
+    from src.services.trace_store import trace_store
+    result = run_audit_flow(scope='APAC', quarter='Q3 2025', trace_id='flow-apac')
+    regions = ['Hong Kong', 'Singapore', 'Japan']
+    assert result['regions'] == regions
+    crews = [e for e in trace_store.page('flow-apac', limit=500)['events'] if e['kind'] == 'crew']
+    # Map: one findings/compliance/risk crew per region; reduce: one Report Writer run
+    assert sorted((e['scope'], e['action']) for e in crews) == sorted(
+        [(region, 'ran findings, compliance, risk') for region in regions] + [('APAC', 'ran report')])
+    assert '# AUDIT COMPLIANCE REVIEW' in result['report'] and result['requires_escalation']
+    assert {r['finding_id'] for r in result['risk_register']['risks']} >= {'HK-2024-001', 'SG-2024-003'}
+
+
+def test_agents_share_one_lazily_loaded_pack_and_mask_each_chunk_once(offline_crew, monkeypatch):
+    from collections import Counter
+    from src.crew.flow import AuditComplianceFlow
+    from src.security.presidio_service import presidio
+    masked = Counter()
+    monkeypatch.setattr(presidio, 'anonymize', lambda text: masked.update([text]) or text)
+    flow = AuditComplianceFlow(scope='APAC', quarter='Q3 2025')
+    flow.kickoff()
+    stats = flow.evidence.stats()
+    # Every searching agent of the three regional crews searched the same pack
+    assert stats['loaded'] and stats['chunks'] and stats['searches'] >= 9 and stats['fallbacks'] == 0
+    assert masked and set(masked.values()) == {1}
+    assert len(masked) == stats['masked_chunks']
@@ -0,0 +1,39 @@
+from src.services.context_packer import count_tokens, pack_context, split_sentences
+from src.services.diversify import RetrievedChunk
+
+FINDING = ('Finding HK-2024-001 concerns trade reconciliation. '
+           'Reconciliation is performed manually for over fifty trades per day. '
+           'Automated controls failed during the July 2025 system upgrade.\n'
+           'Owner: Head of Operations | Target Date: 2026-03-15')
+
+
+def test_split_sentences_preserves_text():
+    pieces = split_sentences(FINDING)
+    assert len(pieces) == 4
+    assert ''.join(pieces) == FINDING
+    assert split_sentences('Ref SPM TM-G-1 Section 4.2 applies.') == ['Ref SPM TM-G-1 Section 4.2 applies.']
+
+
+def test_pack_respects_budget_and_whole_sentences():
+    chunk = RetrievedChunk(FINDING, 'hk.txt', 0.9)
+    packed = pack_context([chunk], budget_tokens=40, model='gpt-4o-mini')
+    assert packed.tokens_used <= 40
+    assert len(packed.sections) == 1
+    text = packed.sections[0][1]
+    assert FINDING.startswith(text)
+    assert text.endswith('.')
+    assert packed.tokens_saved > 0
+
+
+def test_pack_prefers_higher_scores():
+    low = RetrievedChunk('Low relevance background text.', 'a.txt', 0.2)
+    high = RetrievedChunk('Finding SG-2024-003 is rated Significant.', 'b.txt', 0.8)
+    packed = pack_context([low, high], budget_tokens=30, model='gpt-4o-mini')
+    assert [c.source for c, _ in packed.sections] == ['b.txt']
+
+
+def test_pack_fits_everything_with_large_budget():
+    chunks = [RetrievedChunk(FINDING, 'hk.txt', 0.9), RetrievedChunk('Short note.', 'sg.txt', 0.5)]
+    packed = pack_context(chunks, budget_tokens=10_000, model='gpt-4o-mini')
+    assert [text for _, text in packed.sections] == [FINDING, 'Short note.']
+    assert packed.tokens_candidate >= count_tokens(FINDING, 'gpt-4o-mini')
@@ -0,0 +1,88 @@
+from types import SimpleNamespace
+from src.crew.outputs import (
+    ComplianceItem, ComplianceMap, Finding, FindingTable, RiskItem, RiskRegister, compact_handoff
+)
+
+
+def test_finding_table_compact():
+    table = FindingTable(findings=[
+        Finding(finding_id='HK-2024-001', severity='Critical', title='Trade reconciliation gap',
+                owner='Head of Operations', deadline='2026-03-15', status='In Progress'),
+        Finding(finding_id='SG-2024-011', severity='Moderate', title='PDPA retention',
+                gaps=['owner missing', 'no budget']),
+    ])
+    lines = table.compact().splitlines()
+    assert lines[0].startswith('FINDINGS:')
+    assert lines[1] == ('HK-2024-001 | Critical | Trade reconciliation gap | Head of Operations'
+                        ' | 2026-03-15 | In Progress | no | -')
+    assert lines[2].endswith('owner missing; no budget')
+
+
+def test_risk_register_compact_sorted_by_rank():
+    register = RiskRegister(risks=[
+        RiskItem(finding_id='SG-2024-003', likelihood=3, impact=3, risk_score=9,
+                 rating='Medium', priority_rank=2),
+        RiskItem(finding_id='HK-2024-001', likelihood=4, impact=5, risk_score=20,
+                 rating='Critical', priority_rank=1, escalate=True),
+    ])
+    rows = register.compact().splitlines()[1:]
+    assert rows[0] == 'HK-2024-001 | 4 | 5 | 20 | Critical | 1 | yes'
+    assert rows[1].startswith('SG-2024-003')
+
+
+def test_compact_handoff_replaces_raw_text():
+    mapping = ComplianceMap(items=[ComplianceItem(
+        finding_id='HK-2024-007', regulation='HKMA AML/CFT Guideline', section='5.3',
+        status='NON-COMPLIANT', reportable=True)])
+    output = SimpleNamespace(raw='A very long transcript ' * 100, pydantic=mapping)
+    compact_handoff(output)
+    assert output.raw == mapping.compact()
+    untouched = SimpleNamespace(raw='free text', pydantic=None)
+    compact_handoff(untouched)
+    assert untouched.raw == 'free text'
+
+
+def test_escalation_from_critical_band_only():
+    register = RiskRegister(risks=[
+        RiskItem(finding_id='SG-2024-003', likelihood=3, impact=3, risk_score=9,
+                 rating='Medium', priority_rank=2, escalate=True),
+        RiskItem(finding_id='JP-2024-002', likelihood=4, impact=4, risk_score=16,
+                 rating='High', priority_rank=1),
+    ])
+    assert not register.requires_escalation()
+    register.risks.append(RiskItem(finding_id='HK-2024-001', likelihood=4, impact=5,
+                                   risk_score=20, rating='High', priority_rank=3))
+    assert [r.finding_id for r in register.escalations()] == ['HK-2024-001']
+
+
+def test_risk_register_merge_keeps_highest_score_and_reranks():
+    hk = RiskRegister(risks=[
+        RiskItem(finding_id='HK-2024-001', likelihood=4, impact=4, risk_score=16,
+                 rating='High', priority_rank=1),
+        RiskItem(finding_id='APAC-2024-002', likelihood=2, impact=3, risk_score=6,
+                 rating='Medium', priority_rank=2),
+    ])
+    sg = RiskRegister(risks=[
+        RiskItem(finding_id='SG-2024-003', likelihood=4, impact=5, risk_score=20,
+                 rating='Critical', priority_rank=1),
+        RiskItem(finding_id='APAC-2024-002', likelihood=3, impact=3, risk_score=9,
+                 rating='Medium', priority_rank=2),
+    ])
+    merged = RiskRegister.merge([hk, sg])
+    assert [(r.finding_id, r.risk_score, r.priority_rank) for r in merged.risks] == [
+        ('SG-2024-003', 20, 1), ('HK-2024-001', 16, 2), ('APAC-2024-002', 9, 3)]
+    assert merged.requires_escalation()
+
+
+def test_finding_and_compliance_merge_deduplicate():
+    shared = Finding(finding_id='APAC-2024-002', severity='Moderate', title='Vendor review')
+    tables = [FindingTable(findings=[shared, Finding(finding_id='HK-2024-001', severity='Critical',
+                                                     title='Trade reconciliation gap')]),
+              FindingTable(findings=[shared])]
+    assert [f.finding_id for f in FindingTable.merge(tables).findings] == ['APAC-2024-002', 'HK-2024-001']
+
+    item = ComplianceItem(finding_id='APAC-2024-002', regulation='HKMA SPM TM-G-1', status='NEEDS REVIEW')
+    merged = ComplianceMap.merge([ComplianceMap(items=[item], conclusions='HK ok.'),
+                                  ComplianceMap(items=[item], conclusions='SG gaps.')])
+    assert len(merged.items) == 1
+    assert merged.conclusions == 'HK ok. SG gaps.'
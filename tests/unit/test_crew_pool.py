@@ -0,0 +1,66 @@
+import sys
+import pytest
+
+pytest.importorskip('crewai')
+from crewai import Agent
+from src.crew.pool import CrewPool
+
+
+@pytest.fixture
+def pool(monkeypatch):
+    monkeypatch.setenv('OPENAI_API_KEY', 'sk-test')
+    pool = CrewPool()
+    pool._templates = {'auditor': Agent(role='Auditor', goal='Review', backstory='Auditor',
+                                        llm='openai/gpt-4o-mini', max_rpm=10)}
+    return pool
+
+
+def test_clones_do_not_share_llm_or_usage_state(pool):
+    first, second = pool.agents()['auditor'], pool.agents()['auditor']
+    template = pool.templates()['auditor']
+    assert first.llm is not second.llm and first.llm is not template.llm
+    assert first._token_process is not second._token_process
+    assert first._rpm_controller is not second._rpm_controller
+    usage = getattr(template.llm, '_token_usage', None)
+    if usage is not None:
+        first.llm._token_usage['prompt_tokens'] += 100
+        assert second.llm._token_usage['prompt_tokens'] == 0
+        assert template.llm._token_usage['prompt_tokens'] == 0
+    assert (first.role, first.llm.model) == (template.role, template.llm.model)
+
+
+def test_crew_usage_is_priced_per_agent_model(monkeypatch):
+    from types import SimpleNamespace
+    from src.crew.crew import add_token_usage
+    from src.services.cost_tracker import cost_tracker, estimate_cost
+    monkeypatch.setenv('OPENAI_API_KEY', 'sk-test')
+    strong = Agent(role='Writer', goal='Write', backstory='Writer', llm='openai/gpt-4o')
+    standard = Agent(role='Auditor', goal='Review', backstory='Auditor', llm='openai/gpt-4o-mini')
+    for agent in (strong, standard):
+        if isinstance(getattr(agent.llm, '_token_usage', None), dict):
+            agent.llm._token_usage.update(prompt_tokens=1000, completion_tokens=1000,
+                                          successful_requests=2)
+        else:
+            agent._token_process.sum_prompt_tokens(1000)
+            agent._token_process.sum_completion_tokens(1000)
+            agent._token_process.sum_successful_requests(2)
+    cost_tracker.reset()
+    usage = {}
+    result = SimpleNamespace(token_usage=SimpleNamespace(prompt_tokens=2000, completion_tokens=2000))
+    add_token_usage(usage, SimpleNamespace(agents=[strong, standard]), result)
+    assert usage['prompt_tokens'] == 2000
+    assert usage['cost_usd'] == pytest.approx(estimate_cost(1000, 1000, 'gpt-4o')
+                                              + estimate_cost(1000, 1000, 'gpt-4o-mini'))
+    tiers = cost_tracker.get_summary()['cost_by_tier']
+    assert tiers['strong']['calls'] == 2 and tiers['strong']['latency_p95_ms'] == 0.0
+    assert tiers['standard']['cost_usd'] == round(estimate_cost(1000, 1000, 'gpt-4o-mini'), 6)
+    cost_tracker.reset()
+
+
+def test_pool_warms_without_litellm(monkeypatch):
+    monkeypatch.setenv('OPENAI_API_KEY', 'sk-test')
+    monkeypatch.setitem(sys.modules, 'litellm', None)    # import litellm raises ImportError
+    pool = CrewPool()
+    agents = pool.agents()
+    assert set(agents) == {'auditor', 'compliance_officer', 'risk_analyst', 'report_writer'}
+    assert isinstance(agents['auditor'].goal, str)
@@ -0,0 +1,44 @@
+import numpy as np
+from src.services.diversify import RetrievedChunk, merge_adjacent, mmr_select, overlap_length
+
+
+def test_mmr_skips_near_duplicates():
+    query = np.array([1.0, 0.0, 0.0])
+    candidates = np.array([
+        [1.0, 0.0, 0.0],
+        [0.99, 0.01, 0.0],     # Near-duplicate of the first
+        [0.6, 0.8, 0.0],
+    ])
+    assert mmr_select(query, candidates, k=2, lambda_mult=0.3) == [0, 2]
+    assert mmr_select(query, candidates, k=2, lambda_mult=1.0) == [0, 1]
+
+
+def test_mmr_pure_relevance_when_lambda_is_one():
+    query = np.array([1.0, 0.0])
+    candidates = np.array([[0.0, 1.0], [1.0, 0.1], [1.0, 0.0]])
+    assert mmr_select(query, candidates, k=3, lambda_mult=1.0) == [2, 1, 0]
+
+
+def test_mmr_handles_empty_and_small_candidate_sets():
+    assert mmr_select(np.ones(3), np.zeros((0, 3)), k=5) == []
+    assert len(mmr_select(np.ones(3), np.eye(3), k=5)) == 3
+
+
+def test_overlap_length():
+    left = 'The reconciliation is performed manually for fifty trades per day.'
+    right = 'manually for fifty trades per day. Risk: undetected discrepancies.'
+    assert overlap_length(left, right) == len('manually for fifty trades per day.')
+    assert overlap_length('no shared text here', 'completely different') == 0
+
+
+def test_merge_adjacent_strips_overlap_and_keeps_rank_order():
+    a = RetrievedChunk('Finding HK-2024-001 covers trade reconciliation controls.', 'hk.txt', 0.8, 0, 0)
+    b = RetrievedChunk('trade reconciliation controls. Owner: Head of Operations.', 'hk.txt', 0.9, 0, 1)
+    other = RetrievedChunk('SG-2024-003 access control review.', 'sg.txt', 0.85, 0, 4)
+    dup = RetrievedChunk(other.text, 'sg_copy.txt', 0.7, 0, 2)
+    merged = merge_adjacent([b, other, a, dup])
+    assert [m.source for m in merged] == ['hk.txt', 'sg.txt']
+    assert merged[0].text == ('Finding HK-2024-001 covers trade reconciliation controls.'
+                              ' Owner: Head of Operations.')
+    assert merged[0].score == 0.9
+    assert merged[0].chunk_index == 0
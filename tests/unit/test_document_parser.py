@@ -0,0 +1,45 @@
+from pathlib import Path
+from src.services.document_parser import (
+    chunk_point_id, extract_document_metadata, iter_chunks, iter_text_pages
+)
+
+SAMPLE_DOCS = Path(__file__).resolve().parent.parent / 'sample_docs'
+
+
+def test_point_id_is_deterministic():
+    assert chunk_point_id('a.pdf', 'text') == chunk_point_id('a.pdf', 'text')
+    assert chunk_point_id('a.pdf', 'text') != chunk_point_id('b.pdf', 'text')
+    assert chunk_point_id('a.pdf', 'text') != chunk_point_id('a.pdf', 'text!')
+
+
+def test_metadata_from_filename_and_header():
+    hk = SAMPLE_DOCS / 'hk_audit_q3_2025.txt'
+    assert extract_document_metadata(hk.name, hk.read_text()) == {'region': 'HK', 'quarter': 'Q3 2025'}
+    apac = SAMPLE_DOCS / 'apac_risk_matrix.txt'
+    assert extract_document_metadata(apac.name, apac.read_text()) == {'region': 'APAC', 'quarter': 'Q3 2025'}
+    assert extract_document_metadata('report.pdf', 'SINGAPORE BRANCH\nQ1-2026') == {'region': 'SG', 'quarter': 'Q1 2026'}
+
+
+def test_region_keywords_match_whole_words():
+    assert extract_document_metadata('sg-controls.pdf', '')['region'] == 'SG'
+    assert extract_document_metadata('notes.txt', 'Per MAS Notice 626')['region'] == 'SG'
+    assert extract_document_metadata('christmas_check_in.txt', 'Thomas did a check-in')['region'] is None
+
+
+def test_text_pages_break_on_paragraphs(tmp_path):
+    path = tmp_path / 'doc.txt'
+    path.write_text('line one\n\n' * 50)
+    pages = list(iter_text_pages(str(path), page_chars=100))
+    assert len(pages) > 1
+    assert ''.join(p.page_content for p in pages) == path.read_text()
+    assert [p.metadata['page'] for p in pages] == list(range(len(pages)))
+
+
+def test_chunks_carry_source_and_region():
+    path = SAMPLE_DOCS / 'sg_regulatory_q3_2025.txt'
+    chunks = list(iter_chunks(str(path), path.name))
+    assert chunks
+    for point_id, chunk in chunks:
+        assert point_id == chunk_point_id(path.name, chunk.page_content)
+        assert chunk.metadata['source'] == path.name
+        assert chunk.metadata['region'] == 'SG'
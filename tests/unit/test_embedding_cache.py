@@ -0,0 +1,56 @@
+import asyncio
+from langchain_core.embeddings import Embeddings
+from src.services.embedding_cache import CachedEmbeddings
+
+
+class CountingEmbeddings(Embeddings):
+    def __init__(self):
+        self.documents = []
+        self.queries = []
+
+    def embed_documents(self, texts):
+        self.documents.extend(texts)
+        return [[float(len(t)), 1.0] for t in texts]
+
+    def embed_query(self, text):
+        self.queries.append(text)
+        return [float(len(text)), 2.0]
+
+    async def aembed_documents(self, texts):
+        return self.embed_documents(texts)
+
+
+def test_documents_embedded_once_and_order_preserved():
+    underlying = CountingEmbeddings()
+    cache = CachedEmbeddings(underlying, 'test-model')
+    assert cache.embed_documents(['aa', 'b', 'aa']) == [[2.0, 1.0], [1.0, 1.0], [2.0, 1.0]]
+    assert cache.embed_documents(['b', 'ccc']) == [[1.0, 1.0], [3.0, 1.0]]
+    assert underlying.documents == ['aa', 'b', 'ccc']
+
+
+def test_query_and_document_vectors_cached_separately():
+    underlying = CountingEmbeddings()
+    cache = CachedEmbeddings(underlying, 'test-model')
+    cache.embed_documents(['aml'])
+    assert cache.embed_query('aml') == [3.0, 2.0]
+    assert cache.embed_query('aml') == [3.0, 2.0]
+    assert underlying.queries == ['aml']
+
+
+def test_lru_eviction():
+    underlying = CountingEmbeddings()
+    cache = CachedEmbeddings(underlying, 'test-model', max_entries=2)
+    cache.embed_documents(['a', 'b'])
+    cache.embed_documents(['a'])          # Refresh 'a'
+    cache.embed_documents(['c'])          # Evicts 'b'
+    cache.embed_documents(['a', 'b'])
+    assert underlying.documents == ['a', 'b', 'c', 'b']
+
+
+def test_async_documents_share_the_cache():
+    underlying = CountingEmbeddings()
+    cache = CachedEmbeddings(underlying, 'test-model')
+    asyncio.run(cache.aembed_documents(['x', 'yy']))
+    cache.embed_documents(['yy'])
+    assert underlying.documents == ['x', 'yy']
+    assert cache.stats()['hits'] == 1
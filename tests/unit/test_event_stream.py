@@ -0,0 +1,99 @@
+import asyncio
+import json
+from src.services.event_stream import ThreadEventLog, sse_events
+
+
+def parse(chunks):
+    events = []
+    for chunk in chunks:
+        fields = dict(line.split(': ', 1) for line in chunk.strip().split('\n') if ': ' in line)
+        if 'event' in fields:
+            events.append((fields.get('id'), fields['event'], json.loads(fields['data'])))
+    return events
+
+
+async def collect(log, last_event_id=0):
+    return parse([chunk async for chunk in sse_events(log, last_event_id)])
+
+
+def test_updates_become_deltas():
+    async def run():
+        log = ThreadEventLog('t1', asyncio.get_running_loop())
+        log.record_update('classify_task', {'steps_taken': ['classified']})
+        log.record_update('quick_rag', {'steps_taken': ['classified', 'answered'],
+                                        'final_report': 'Answer'})
+        log.record_update('finalise', {'steps_taken': ['classified', 'answered', 'finalised'],
+                                       'final_report': 'Answer, extended'})
+        log.finish('completed')
+        return await collect(log)
+
+    events = asyncio.run(run())
+    assert [e[1] for e in events] == ['step', 'step', 'report', 'step', 'report', 'done']
+    assert [int(e[0]) for e in events] == [1, 2, 3, 4, 5, 6]
+    assert events[1][2] == {'node': 'quick_rag', 'steps': ['answered']}
+    assert events[4][2] == {'append': ', extended'}
+
+
+def test_resume_after_last_event_id_and_snapshot_on_gap():
+    async def run():
+        log = ThreadEventLog('t2', asyncio.get_running_loop())
+        for i in range(5):
+            log.record_update(f'n{i}', {'steps_taken': [f's{j}' for j in range(i + 1)]})
+        log.finish('completed')
+        resumed = await collect(log, last_event_id=3)
+        log.events.popleft()                  # Simulate buffer eviction
+        gapped = await collect(log, last_event_id=0)
+        return resumed, gapped
+
+    resumed, gapped = asyncio.run(run())
+    assert [e[0] for e in resumed] == ['4', '5', '6']
+    assert gapped[0][1] == 'snapshot' and gapped[0][2]['steps'] == ['s0', 's1', 's2', 's3', 's4']
+    assert len(gapped) == 1
+
+
+def test_heartbeat_while_idle(monkeypatch):
+    from src.config import get_settings
+    monkeypatch.setattr(get_settings(), 'stream_heartbeat_seconds', 0.01)
+
+    async def run():
+        log = ThreadEventLog('t3', asyncio.get_running_loop())
+        stream = sse_events(log)
+        await stream.__anext__()              # retry: field
+        heartbeat = await stream.__anext__()
+        log.finish('completed')
+        done = await stream.__anext__()
+        return heartbeat, done
+
+    heartbeat, done = asyncio.run(run())
+    assert 'event: heartbeat' in heartbeat and 'id:' not in heartbeat
+    assert 'event: done' in done
+
+
+def test_snapshot_is_a_copy_and_updates_are_serialised():
+    import threading
+
+    async def run():
+        log = ThreadEventLog('t4', asyncio.get_running_loop())
+
+        def writer(name):
+            for i in range(200):
+                log.record_update(name, {'steps_taken': [f'{name}{i}'],
+                                         'requires_escalation': bool(i % 2)})
+
+        threads = [threading.Thread(target=writer, args=(f'w{n}',)) for n in range(4)]
+        for t in threads:
+            t.start()
+        snapshots = []
+        while any(t.is_alive() for t in threads):
+            snapshots.append(log.snapshot())
+        for t in threads:
+            t.join()
+        return log, snapshots
+
+    log, snapshots = asyncio.run(run())
+    ids = [e[0] for e in log.events]
+    assert ids == list(range(ids[0], log.next_id))
+    assert all(len(s['steps']) <= 1 for s in snapshots)
+    snap = log.snapshot()
+    snap['steps'].append('tampered')
+    assert log.snapshot()['steps'] != snap['steps']
@@ -0,0 +1,81 @@
+from concurrent.futures import ThreadPoolExecutor
+from types import SimpleNamespace
+import time
+import numpy as np
+import pytest
+from src.services import evidence_pack
+from src.services.evidence_pack import EvidencePack, LazyEvidencePack
+
+
+def make_pack(region=None, quarter='Q3 2025', mask=None):
+    vectors = np.eye(4)
+    payloads = [
+        {'page_content': 'HK finding', 'source': 'hk.pdf', 'region': 'HK', 'chunk_index': 0},
+        {'page_content': 'SG finding', 'source': 'sg.pdf', 'region': 'SG', 'chunk_index': 0},
+        {'page_content': 'APAC policy', 'source': 'apac.pdf', 'region': 'APAC', 'chunk_index': 0},
+        {'page_content': 'Untagged memo', 'source': 'memo.txt', 'chunk_index': 0},
+    ]
+    return EvidencePack(region, quarter, vectors, payloads, mask=mask)
+
+
+def test_search_ranks_by_cosine():
+    pack = make_pack()
+    results = pack.search([0.1, 0.9, 0.0, 0.0], region=None, quarter='Q3 2025', k=2, lambda_mult=1.0)
+    assert [r.source for r in results] == ['sg.pdf', 'hk.pdf']
+    assert results[0].score > results[1].score
+
+
+def test_regional_search_filters_like_qdrant():
+    pack = make_pack()
+    results = pack.search([0.2, 1.0, 0.1, 0.1], region='HK', quarter='Q3 2025', k=4)
+    assert {r.source for r in results} == {'hk.pdf', 'apac.pdf', 'memo.txt'}
+
+
+def test_uncovered_search_falls_back():
+    pack = make_pack(region='HK')
+    assert pack.search([1, 0, 0, 0], region='SG', quarter='Q3 2025') is None
+    assert pack.search([1, 0, 0, 0], region='HK', quarter='Q4 2025') is None
+    assert pack.stats()['fallbacks'] == 2
+
+
+def test_text_masked_once():
+    calls = []
+    pack = make_pack(mask=lambda text: calls.append(text) or text.upper())
+    for _ in range(3):
+        results = pack.search([1, 0, 0, 0], region=None, quarter='Q3 2025', k=1)
+    assert results[0].text == 'HK FINDING'
+    assert calls == ['HK finding']
+
+
+def test_concurrent_searches_mask_each_chunk_once():
+    calls = []
+    pack = make_pack(mask=lambda text: calls.append(text) or time.sleep(0.05) or text.upper())
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        list(pool.map(lambda _: pack.search([1, 0, 0, 0], region=None, quarter='Q3 2025', k=1),
+                      range(4)))
+    assert calls == ['HK finding']
+
+
+def test_lazy_pack_builds_once_on_first_search(monkeypatch):
+    builds = []
+    monkeypatch.setattr(evidence_pack, 'build_evidence_pack',
+                        lambda scope, quarter: builds.append(scope) or time.sleep(0.05) or make_pack())
+    lazy = LazyEvidencePack('APAC', 'Q3 2025')
+    assert lazy.stats() == {'loaded': False} and not builds
+    with ThreadPoolExecutor(max_workers=3) as pool:
+        results = list(pool.map(lambda _: lazy.search([1, 0, 0, 0], None, 'Q3 2025', k=1), range(3)))
+    assert builds == ['APAC']
+    assert all(r[0].source == 'hk.pdf' for r in results)
+    assert lazy.stats()['searches'] == 3
+
+
+def test_build_converts_scroll_pages_to_float32(monkeypatch):
+    pytest.importorskip('qdrant_client')
+    import src.config
+    pages = {None: ([SimpleNamespace(vector=[1.0, 0.0], payload={'page_content': 'a'})], 'next'),
+             'next': ([SimpleNamespace(vector=[0.0, 2.0], payload={'page_content': 'b'})], None)}
+    client = SimpleNamespace(scroll=lambda offset=None, **kwargs: pages[offset])
+    monkeypatch.setattr(src.config, 'get_qdrant_client', lambda: client)
+    pack = evidence_pack.build_evidence_pack('HK', 'Q3 2025')
+    assert pack.matrix.dtype == np.float32 and pack.matrix.shape == (2, 2)
+    assert [p['page_content'] for p in pack.payloads] == ['a', 'b']
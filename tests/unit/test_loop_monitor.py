@@ -0,0 +1,35 @@
+import asyncio
+import time
+from src.services.loop_monitor import LoopLagMiddleware, LoopLagMonitor
+
+
+def test_blocking_handler_lag_attributed_to_its_endpoint():
+    monitor = LoopLagMonitor(interval_ms=5)
+
+    async def app(scope, receive, send):
+        if scope['path'] == '/slow':
+            time.sleep(0.2)                  # Blocks the loop
+        await asyncio.sleep(0.02)
+
+    middleware = LoopLagMiddleware(app, monitor)
+
+    async def run():
+        await middleware({'type': 'http', 'method': 'GET', 'path': '/fast'}, None, None)  # Starts the monitor
+        await middleware({'type': 'http', 'method': 'POST', 'path': '/slow'}, None, None)
+        await asyncio.sleep(0.02)
+
+    asyncio.run(run())
+    metrics = monitor.metrics()
+    slow, fast = metrics['endpoints']['POST /slow'], metrics['endpoints']['GET /fast']
+    # Lower bound only: a loaded runner can add lag, never remove the 200 ms block
+    assert slow['max_ms'] >= 150
+    assert slow['max_ms'] > fast['max_ms']
+    assert slow['requests'] == 1
+    assert metrics['in_flight'] == 0
+
+
+def test_reset_clears_samples():
+    monitor = LoopLagMonitor()
+    monitor.overall.append(1.0)
+    monitor.reset()
+    assert monitor.metrics()['overall'] == {'samples': 0}
@@ -0,0 +1,46 @@
+import pytest
+from langchain_core.messages import HumanMessage
+from src.config import crew_model, get_llm, get_settings, resolve_model, tier_for_model
+from src.services.cost_tracker import CostTracker, cost_tracker, estimate_cost
+
+
+@pytest.fixture
+def settings(monkeypatch):
+    monkeypatch.setenv('MODEL_ROUTES', '{"classify_task": "local", "report_writer": "strong"}')
+    get_settings.cache_clear()
+    yield get_settings()
+    get_settings.cache_clear()
+
+
+def test_routes_resolve_to_tiers(settings):
+    assert resolve_model('classify_task') == ('local', 'ollama', 'llama3.2')
+    assert resolve_model('quick_rag') == ('standard', 'openai', 'gpt-4o-mini')   # Default tier
+    assert crew_model('report_writer') == 'openai/gpt-4o'
+    assert tier_for_model('gpt-4o') == 'strong'
+    assert tier_for_model('claude-x') == 'unrouted'
+
+
+def test_local_models_flag_overrides_routes(settings, monkeypatch):
+    monkeypatch.setenv('USE_LOCAL_MODELS', 'true')
+    get_settings.cache_clear()
+    assert resolve_model('report_writer')[0] == 'local'
+
+
+def test_cost_by_tier_uses_model_pricing():
+    tracker = CostTracker()
+    tracker.record('', 'report_writer', 1000, 1000, model='gpt-4o', tier='strong', latency_ms=900)
+    tracker.record('', 'classify_task', 1000, 10, model='llama3.2', tier='local', latency_ms=40)
+    tiers = tracker.get_summary()['cost_by_tier']
+    assert tiers['strong']['cost_usd'] == round(estimate_cost(1000, 1000, 'gpt-4o'), 6) == 0.0125
+    assert tiers['local']['cost_usd'] == 0.0
+    assert tiers['local']['latency_p95_ms'] == 40.0
+
+
+def test_get_llm_records_each_call(settings, monkeypatch):
+    monkeypatch.setenv('USE_FAKE_MODELS', 'true')
+    get_settings.cache_clear()
+    cost_tracker.reset()
+    get_llm(route='classify_task').invoke([HumanMessage(content='Classify this request ...')])
+    tier = cost_tracker.get_summary()['cost_by_tier']['local']
+    assert tier['calls'] == 1 and tier['input_tokens'] > 0
+    cost_tracker.reset()
@@ -27,3 +27,12 @@ def test_has_pii_flag():
     svc = PresidioService()
     assert svc.has_pii('Contact john@bnpp.com') == True
     assert svc.has_pii('Finding HK-2024-001 is critical') == False
+
+
+def test_anonymize_async_matches_sync():
+    import asyncio
+    svc = PresidioService(mode='inline')
+    texts = ['Call the auditor at +852-9876-5432', 'Finding HK-2024-001 is critical']
+    assert asyncio.run(svc.anonymize_async(texts[0])) == svc.anonymize(texts[0])
+    assert asyncio.run(svc.anonymize_many_async(texts)) == [svc.anonymize(t) for t in texts]
+    assert svc.metrics()['mode'] == 'inline'
@@ -0,0 +1,32 @@
+import numpy as np
+from evaluation.retrieval_eval import relevance_tensor, retrieval_metrics
+
+QUESTIONS = [
+    {'question': 'q1', 'relevant_sources': ['hk.txt'], 'relevant_findings': ['HK-1']},
+    {'question': 'q2', 'relevant_sources': ['sg.txt']},
+    {'question': 'q3', 'relevant_sources': ['hk.txt'], 'relevant_findings': ['HK-1', 'HK-2']},
+]
+HITS = [
+    [{'source': 'sg.txt', 'text': 'HK-1 cited'}, {'source': 'hk.txt', 'text': 'Finding HK-1'}],
+    [{'source': 'sg.txt', 'text': 'anything'}, {'source': 'hk.txt', 'text': ''}],
+    [{'source': 'hk.txt', 'text': 'HK-9'}, {'source': 'jp.txt', 'text': 'HK-2'}],
+]
+
+
+def test_finding_labels_require_relevant_source():
+    coverage, mask = relevance_tensor(QUESTIONS, HITS, k=2)
+    assert coverage.shape == (3, 2, 2)
+    assert not coverage[0, 0].any()           # Mentions HK-1 but wrong source
+    assert coverage[0, 1, 0] and coverage[1, 0, 0]
+    assert not coverage[2].any()
+    assert mask.tolist() == [[True, False], [True, False], [True, True]]
+
+
+def test_metrics():
+    metrics = retrieval_metrics(*relevance_tensor(QUESTIONS, HITS, k=2))
+    assert metrics['per_question']['recall'] == [1.0, 1.0, 0.0]
+    assert metrics['per_question']['mrr'] == [0.5, 1.0, 0.0]
+    assert metrics['per_question']['ndcg'][0] == round(1 / np.log2(3), 4)
+    assert metrics['per_question']['ndcg'][1] == 1.0
+    assert metrics['recall_at_k'] == round(2 / 3, 4)
+    assert metrics['questions_labelled'] == 3
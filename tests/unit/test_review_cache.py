@@ -0,0 +1,41 @@
+from src.services.review_cache import ReviewCache, normalise_prompt, stable_hash
+
+
+def make_cache() -> ReviewCache:
+    cache = ReviewCache()
+    cache.enabled = True
+    cache._connected = True        # Skip Redis; exercise the in-process backend
+    return cache
+
+
+def test_stable_hash_is_order_sensitive():
+    assert stable_hash('APAC', 'Q3 2025') == stable_hash('APAC', 'Q3 2025')
+    assert stable_hash('APAC', 'Q3 2025') != stable_hash('Q3 2025', 'APAC')
+
+
+def test_normalise_prompt():
+    assert normalise_prompt('  Finding\n   HK-2024-001 ') == normalise_prompt('finding hk-2024-001')
+
+
+def test_cached_call_computes_once_per_prompt_and_model():
+    cache = make_cache()
+    calls = []
+
+    def compute():
+        calls.append(1)
+        return 'NON-COMPLIANT'
+
+    assert cache.cached_call('check_hkma_compliance', 'Finding A', 'gpt-4o-mini', compute) == 'NON-COMPLIANT'
+    assert cache.cached_call('check_hkma_compliance', 'finding  a', 'gpt-4o-mini', compute) == 'NON-COMPLIANT'
+    assert len(calls) == 1
+    cache.cached_call('check_hkma_compliance', 'Finding A', 'llama3.2', compute)
+    assert len(calls) == 2
+    assert cache.stats()['hits'] == 1
+
+
+def test_get_set_roundtrip_and_disabled():
+    cache = make_cache()
+    cache.set('k', {'raw': 'report'})
+    assert cache.get('k') == {'raw': 'report'}
+    cache.enabled = False
+    assert cache.get('k') is None
@@ -0,0 +1,97 @@
+from concurrent.futures import Future
+from types import SimpleNamespace
+import pytest
+
+pytest.importorskip('langgraph')
+from langchain_core.messages import HumanMessage
+from src.supervisor import graph
+
+
+def finished(result) -> Future:
+    future = Future()
+    future.set_result(result)
+    return future
+
+
+def test_parked_reports_are_per_run():
+    first = graph.park_report(finished({'report': 'A'}))
+    second = graph.park_report(finished({'report': 'B'}))
+    assert graph.collect_report(second)['report'] == 'B'
+    assert graph.collect_report(first)['report'] == 'A'
+
+
+def test_missing_report_fails_loudly():
+    state = {'thread_id': 't', 'pending_report_id': 'unknown', 'crew_report': '', 'final_report': ''}
+    with pytest.raises(RuntimeError, match='no longer available'):
+        graph.finalise_report(state)
+
+
+def test_collect_times_out_and_keeps_report(monkeypatch):
+    monkeypatch.setattr(graph.settings, 'pending_report_timeout_seconds', 0.01)
+    future = Future()
+    report_id = graph.park_report(future)
+    with pytest.raises(TimeoutError):
+        graph.collect_report(report_id)
+    future.set_result({'report': 'late'})
+    assert graph.collect_report(report_id)['report'] == 'late'
+
+
+def test_abandoned_reports_are_evicted(monkeypatch):
+    monkeypatch.setattr(graph.settings, 'pending_report_ttl_seconds', -1)
+    stale = graph.park_report(finished({'report': 'old'}))
+    graph.park_report(finished({'report': 'new'}))
+    assert stale not in graph._pending_reports
+
+
+@pytest.fixture
+def quick_path(monkeypatch):
+    """Fake classifier/answer LLM, retrieval and masking; records retrieval calls."""
+    calls, answers = [], {'classify_task': 'quick_question', 'quick_rag': 'Answer'}
+    llm = lambda route: SimpleNamespace(invoke=lambda messages: SimpleNamespace(content=answers[route]))
+    monkeypatch.setattr(graph.settings, 'speculative_retrieval', True)
+    monkeypatch.setattr(graph, 'get_llm', lambda temperature=0, route=None: llm(route))
+    monkeypatch.setattr(graph, 'retrieve_context', lambda query, **kw: calls.append(query) or [])
+    monkeypatch.setattr(graph.presidio, 'anonymize', lambda text: text)
+    return calls, answers
+
+
+def review_state(thread_id: str, question: str) -> dict:
+    return {'messages': [HumanMessage(content=question)], 'thread_id': thread_id,
+            'scope': 'HK', 'quarter': 'Q3 2025', 'steps_taken': []}
+
+
+def test_quick_rag_reuses_speculative_retrieval(quick_path):
+    calls, _ = quick_path
+    state = review_state('spec-reuse', 'Which HK findings are overdue?')
+    state.update(graph.classify_task(state))
+    result = graph.quick_rag_answer(state)
+    assert calls == ['Which HK findings are overdue?']
+    assert '(speculative retrieval)' in result['steps_taken'][-2]
+    assert 'spec-reuse' not in graph._speculative
+
+
+def test_quick_rag_retrieves_again_on_query_mismatch(quick_path):
+    calls, _ = quick_path
+    state = review_state('spec-mismatch', 'Which HK findings are overdue?')
+    state.update(graph.classify_task(state))
+    state['messages'] = [HumanMessage(content='Which SG findings are overdue?')]
+    result = graph.quick_rag_answer(state)
+    assert calls[-1] == 'Which SG findings are overdue?'
+    assert '(speculative retrieval)' not in result['steps_taken'][-2]
+
+
+def test_full_review_discards_speculative_retrieval(quick_path):
+    _, answers = quick_path
+    answers['classify_task'] = 'full_review'
+    state = review_state('spec-cancel', 'Full HK review please')
+    assert graph.classify_task(state)['task_type'] == 'full_review'
+    assert 'spec-cancel' not in graph._speculative
+
+
+def test_unclaimed_speculative_retrievals_expire(monkeypatch):
+    monkeypatch.setattr(graph.settings, 'speculative_retrieval_ttl_seconds', -1)
+    abandoned = Future()
+    graph.park_speculative('spec-failed-run', 'q', abandoned)
+    graph.park_speculative('spec-next-run', 'q', Future())
+    assert 'spec-failed-run' not in graph._speculative and abandoned.cancelled()
+    assert graph.take_speculative('spec-next-run')[0] == 'q'
@@ -0,0 +1,38 @@
+from types import SimpleNamespace
+from src.services.trace_store import TraceStore, describe_step
+
+
+def test_pagination_and_bounds(monkeypatch):
+    from src.config import get_settings
+    monkeypatch.setattr(get_settings(), 'trace_max_events', 5)
+    store = TraceStore()
+    for i in range(8):
+        store.record('t1', 'step', 'Risk Analyst', f'step {i}', 'x' * 500)
+    first = store.page('t1', after=0, limit=2)
+    assert [e['seq'] for e in first['events']] == [4, 5]
+    assert first['has_more'] and first['dropped'] == 3
+    rest = store.page('t1', after=first['next_after'], limit=10)
+    assert [e['seq'] for e in rest['events']] == [6, 7, 8] and not rest['has_more']
+    assert len(rest['events'][0]['output_preview']) == get_settings().trace_preview_chars
+    assert store.page('unknown') is None
+
+
+def test_agent_steps_and_crew_tracer():
+    store = TraceStore()
+    tracer = store.crew_tracer('t2', 'Hong Kong')
+    on_step = tracer.step_callback('Senior Internal Auditor')
+    on_step(SimpleNamespace(tool='search_audit_findings', tool_input='HK', result='HK-2024-001'))
+    on_step(SimpleNamespace(output='Final table'))
+    tracer.task_callback(SimpleNamespace(name='findings', description='Review', agent='Senior Internal Auditor',
+                                         raw='table'))
+    events = store.page('t2')['events']
+    assert [e['kind'] for e in events] == ['step', 'step', 'task']
+    assert events[0]['tool'] == 'search_audit_findings' and events[0]['scope'] == 'Hong Kong'
+    steps = store.agent_steps('t2')
+    assert steps == [{'agent': 'Senior Internal Auditor', 'action': 'task: findings',
+                      'output_preview': 'table', 'duration_seconds': steps[0]['duration_seconds'],
+                      'cost_usd': 0.0}]
+
+
+def test_describe_final_answer():
+    assert describe_step(SimpleNamespace(output='done')) == ('final answer', None, 'done')